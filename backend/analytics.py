@@ -0,0 +1,142 @@
+import itertools
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .change_feed import fetch_changed, poll_since
+
+DIMENSIONS = ("graduation_year", "degree", "major", "location", "company", "role", "created_month")
+PROFILE_COLUMNS = "id, graduation_year, degree, major, location, company, role, created_at, updated_at"
+UNKNOWN = "Unknown"
+
+
+class AlumniRollups:
+    """Columnar snapshot of alumni profiles with precomputed count cubes.
+
+    Every single dimension and every pair of dimensions is kept as a count
+    cube (a pandas Series indexed by dimension values). Refreshes pull only
+    profiles whose updated_at moved past the watermark and apply the
+    difference between their new and previous versions to each cube, so the
+    cubes never have to be recomputed from the full snapshot. Deleted
+    profiles are only reflected by a periodic full rebuild.
+    """
+
+    def __init__(self, max_age: float = 300, full_rebuild_interval: float = 3600):
+        self.max_age = max_age
+        self.full_rebuild_interval = full_rebuild_interval
+        self.snapshot: pd.DataFrame = self._normalize(pd.DataFrame())
+        self.cubes: Dict[Tuple[str, ...], pd.Series] = {}
+        self.watermark: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+        self.rebuilt_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _fetch(self, since: Optional[str]) -> pd.DataFrame:
+        """Profiles changed at or after `since` (all profiles when None)"""
+        return self._normalize(pd.DataFrame(fetch_changed("profiles", PROFILE_COLUMNS, since)))
+
+    @staticmethod
+    def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+        for column in ("id", "graduation_year", "degree", "major", "location", "company", "role", "created_at", "updated_at"):
+            if column not in frame:
+                frame[column] = pd.Series(dtype=object)
+        created_at = pd.to_datetime(frame["created_at"], utc=True, errors="coerce")
+        frame["created_month"] = created_at.dt.strftime("%Y-%m")
+        frame["graduation_year"] = pd.to_numeric(frame["graduation_year"], errors="coerce").astype("Int64").astype(str)
+        for dimension in DIMENSIONS:
+            frame[dimension] = (
+                frame[dimension].astype(object)
+                .where(frame[dimension].notna() & ~frame[dimension].isin(["", "<NA>", "NaT"]), UNKNOWN)
+                .astype(str)
+            )
+        return frame.set_index("id", drop=False) if len(frame) else frame
+
+    @staticmethod
+    def _count(frame: pd.DataFrame, dims: Tuple[str, ...]) -> pd.Series:
+        if frame.empty:
+            return pd.Series(dtype=np.int64)
+        return frame.groupby(list(dims), sort=False).size()
+
+    @staticmethod
+    def _cube_keys() -> List[Tuple[str, ...]]:
+        return [(d,) for d in DIMENSIONS] + list(itertools.combinations(DIMENSIONS, 2))
+
+    def rebuild(self) -> None:
+        """Replace the snapshot and recompute every cube from scratch"""
+        snapshot = self._fetch(None)
+        self.cubes = {dims: self._count(snapshot, dims) for dims in self._cube_keys()}
+        self.snapshot = snapshot
+        self.watermark = snapshot["updated_at"].max() if len(snapshot) else None
+        self.refreshed_at = self.rebuilt_at = time.time()
+
+    def apply_delta(self, changed: pd.DataFrame) -> None:
+        """Fold changed profiles into the cubes: add new versions, subtract old ones"""
+        changed = changed[~changed.index.duplicated(keep="last")]
+        previous = self.snapshot.loc[self.snapshot.index.intersection(changed.index)]
+        for dims in self._cube_keys():
+            cube = self.cubes.get(dims, pd.Series(dtype=np.int64))
+            cube = cube.add(self._count(changed, dims), fill_value=0).sub(self._count(previous, dims), fill_value=0)
+            self.cubes[dims] = cube[cube > 0].astype(np.int64)
+        self.snapshot = pd.concat([self.snapshot.drop(previous.index), changed])
+
+    def refresh(self, full: bool = False) -> None:
+        with self._lock:
+            due_for_rebuild = self.rebuilt_at is None or time.time() - self.rebuilt_at > self.full_rebuild_interval
+            if full or due_for_rebuild:
+                self.rebuild()
+                return
+            changed = self._fetch(poll_since(self.watermark))
+            if len(changed):
+                self.apply_delta(changed)
+                self.watermark = max(self.watermark or "", changed["updated_at"].max())
+            self.refreshed_at = time.time()
+
+    def ensure_fresh(self) -> None:
+        if self.refreshed_at is None or time.time() - self.refreshed_at > self.max_age:
+            self.refresh()
+
+    def counts(self, dimension: str, limit: Optional[int] = None) -> Dict[str, int]:
+        cube = self.cubes.get((dimension,), pd.Series(dtype=np.int64))
+        cube = cube.sort_index() if dimension in ("graduation_year", "created_month") else cube.sort_values(ascending=False)
+        if limit:
+            cube = cube.head(limit)
+        return {str(key): int(value) for key, value in cube.items()}
+
+    def growth(self) -> List[Dict[str, Any]]:
+        monthly = self.cubes.get(("created_month",), pd.Series(dtype=np.int64)).drop(UNKNOWN, errors="ignore").sort_index()
+        cumulative = np.cumsum(monthly.to_numpy())
+        return [
+            {"month": month, "new_profiles": int(count), "total_profiles": int(total)}
+            for month, count, total in zip(monthly.index, monthly.to_numpy(), cumulative)
+        ]
+
+    def crosstab(self, rows: str, cols: str) -> Dict[str, Any]:
+        key = tuple(sorted((rows, cols), key=DIMENSIONS.index))
+        cube = self.cubes.get(key, pd.Series(dtype=np.int64))
+        if cube.empty:
+            return {"rows": rows, "cols": cols, "row_labels": [], "col_labels": [], "matrix": []}
+        table = cube.unstack(fill_value=0)
+        if key[0] != rows:
+            table = table.T
+        table = table.sort_index().sort_index(axis=1)
+        return {
+            "rows": rows,
+            "cols": cols,
+            "row_labels": [str(label) for label in table.index],
+            "col_labels": [str(label) for label in table.columns],
+            "matrix": table.to_numpy(dtype=np.int64).tolist(),
+        }
+
+    def summary(self, limit: int = 20) -> Dict[str, Any]:
+        return {
+            "total_profiles": int(len(self.snapshot)),
+            "dimensions": {d: self.counts(d, limit) for d in DIMENSIONS if d != "created_month"},
+            "growth": self.growth(),
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+alumni_rollups = AlumniRollups()
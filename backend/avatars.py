@@ -0,0 +1,130 @@
+import asyncio
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+# Square variant edge lengths in pixels, and the formats each is encoded in.
+VARIANT_SIZES = (64, 256)
+VARIANT_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+THUMBNAIL_VARIANT = "64.webp"
+DISPLAY_VARIANT = "256.webp"
+
+
+def variant_names():
+    return [f"{size}.{ext}" for size in VARIANT_SIZES for ext in VARIANT_FORMATS]
+
+
+def variant_key(digest: str, variant: str) -> str:
+    return f"avatars/{digest}/{variant}"
+
+
+def render_variants(source_path: str) -> Dict[str, bytes]:
+    """Decode an uploaded image and encode every avatar variant.
+
+    Runs in a worker process: decoding and resampling are CPU bound and
+    would otherwise stall the event loop for every request on this worker.
+    """
+    from io import BytesIO
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        variants = {}
+        for size in VARIANT_SIZES:
+            square = ImageOps.fit(image, (size, size), method=Image.LANCZOS)
+            for ext, fmt in VARIANT_FORMATS.items():
+                buffer = BytesIO()
+                square.save(buffer, format=fmt, quality=85, optimize=True)
+                variants[f"{size}.{ext}"] = buffer.getvalue()
+    return variants
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=int(os.environ.get("AVATAR_PROCESS_WORKERS", "2")))
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+async def generate_variants(source_path: str) -> Dict[str, bytes]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), render_variants, source_path)
+
+
+class DiskLRUCache:
+    """Size-bounded cache of immutable blobs on local disk.
+
+    Recency is tracked in memory; the least recently used files are deleted
+    once the cache grows past `max_bytes`. Entries are content-addressed and
+    never change, so there is no invalidation.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        existing = sorted(
+            (path for path in self.root.rglob("*") if path.is_file()),
+            key=lambda path: path.stat().st_mtime,
+        )
+        for path in existing:
+            size = path.stat().st_size
+            self._entries[str(path.relative_to(self.root))] = size
+            self._size += size
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.root / key
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        return path if path.exists() else None
+
+    def put(self, key: str, data: bytes) -> Path:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        temp.write_bytes(data)
+        os.replace(temp, path)
+        with self._lock:
+            self._size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                evicted, size = self._entries.popitem(last=False)
+                self._size -= size
+                (self.root / evicted).unlink(missing_ok=True)
+        return path
+
+
+_cache: Optional[DiskLRUCache] = None
+
+
+def get_variant_cache() -> DiskLRUCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskLRUCache(
+            root=Path(os.environ.get("AVATAR_CACHE_PATH", Path(tempfile.gettempdir()) / "amet-avatar-cache")),
+            max_bytes=int(os.environ.get("AVATAR_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        )
+    return _cache
@@ -0,0 +1,95 @@
+import html
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from .dependencies import supabase_admin
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+# A broadcast whose row hasn't moved for this long lost its runner and is resumed by the scheduler
+STALLED_AFTER = timedelta(minutes=2)
+UNFINISHED_STATUSES = ("queued", "running")
+
+
+def notification_email(subject: Optional[str], content: str) -> str:
+    """Email body for a broadcast's notification; the same for every recipient"""
+    paragraphs = "".join(f"<p>{html.escape(line)}</p>" for line in content.splitlines() if line.strip())
+    heading = f"<h2>{html.escape(subject)}</h2>" if subject else ""
+    return f"{heading}{paragraphs}<p>You can reply from your inbox in the alumni portal.</p>"
+
+
+def create_broadcast(sender_id: str, subject: Optional[str], content: str, filters: Dict[str, Any],
+                     notify: bool) -> Dict[str, Any]:
+    """Record a broadcast and count its recipients; run_broadcast sends it"""
+    whatsapp_template = os.environ.get("WATI_BROADCAST_TEMPLATE") if notify else None
+    response = supabase_admin.rpc("create_message_broadcast", {
+        "p_sender_id": sender_id,
+        "p_subject": subject,
+        "p_content": content,
+        "p_filters": filters,
+        "p_email_html": notification_email(subject, content) if notify else None,
+        "p_whatsapp_template": whatsapp_template,
+    }).execute()
+    return response.data[0]
+
+
+def count_recipients(sender_id: str, filters: Dict[str, Any]) -> int:
+    response = supabase_admin.rpc("count_broadcast_recipients", {
+        "p_filters": filters, "p_sender_id": sender_id,
+    }).execute()
+    return response.data
+
+
+def run_broadcast(broadcast_id: str) -> Dict[str, Any]:
+    """Send a broadcast chunk by chunk until it completes (blocking).
+
+    Each chunk is one database call that writes CHUNK_SIZE recipients'
+    messages and notifications and records progress in the same
+    transaction, so stopping anywhere loses nothing: the resume job picks
+    the broadcast up where the last chunk left off.
+    """
+    while True:
+        try:
+            broadcast = supabase_admin.rpc("send_message_broadcast_chunk", {
+                "p_broadcast_id": broadcast_id, "p_limit": CHUNK_SIZE,
+            }).execute().data[0]
+        except Exception as e:
+            logger.exception("Broadcast %s failed; it will be resumed", broadcast_id)
+            supabase_admin.table("message_broadcasts").update({"last_error": str(e)}).eq("id", broadcast_id).execute()
+            raise
+        if broadcast["status"] not in UNFINISHED_STATUSES:
+            logger.info(
+                "Broadcast %s %s: %s messages, %s notifications",
+                broadcast_id, broadcast["status"], broadcast["messages_sent"], broadcast["notifications_queued"],
+            )
+            return broadcast
+
+
+def resume_stalled_broadcasts() -> int:
+    """Finish broadcasts whose runner died (a restarted or crashed worker)"""
+    stalled_before = (datetime.now(timezone.utc) - STALLED_AFTER).isoformat()
+    stalled = (
+        supabase_admin.table("message_broadcasts").select("id")
+        .in_("status", list(UNFINISHED_STATUSES))
+        .lt("updated_at", stalled_before)
+        .order("updated_at")
+        .execute().data or []
+    )
+    for row in stalled:
+        try:
+            run_broadcast(row["id"])
+        except Exception:
+            continue  # logged and recorded on the broadcast by run_broadcast
+    return len(stalled)
+
+
+def progress(broadcast: Dict[str, Any]) -> Dict[str, Any]:
+    """A broadcast row for the admin API: internals dropped, completion percentage added"""
+    total = broadcast["total_recipients"]
+    done = broadcast["messages_sent"]
+    percent = 100.0 if broadcast["status"] == "completed" else round(100.0 * done / total, 1) if total else 0.0
+    shown = {key: value for key, value in broadcast.items() if key not in ("email_html", "last_recipient_id")}
+    return {**shown, "percent_complete": min(percent, 100.0)}
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dependencies import supabase_admin
+
+PAGE_SIZE = 1000
+# Rows committed by a transaction that started before the last poll can carry an
+# older updated_at than the watermark (NOW() is the transaction start), so each
+# poll re-reads this much history
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def fetch_changed(table: str, columns: str = "*", since: Optional[str] = None,
+                  equals: Optional[Dict[str, Any]] = None, changed_at: str = "updated_at") -> List[Dict[str, Any]]:
+    """Page through the rows of `table` changed at or after `since` (all rows when None).
+
+    Pages continue after the last (changed_at, id) read rather than at an
+    offset: a row updated while we page moves behind the cursor and is read
+    again, where an offset would shift the rows after it and skip one.
+    `columns` must include `changed_at` and id.
+    """
+    rows: List[Dict[str, Any]] = []
+    after: Optional[Tuple[str, str]] = None
+    while True:
+        query = supabase_admin.table(table).select(columns)
+        if after:
+            position, row_id = after
+            query = query.or_(f'{changed_at}.gt."{position}",and({changed_at}.eq."{position}",id.gt.{row_id})')
+        elif since:
+            query = query.gte(changed_at, since)
+        for column, value in (equals or {}).items():
+            query = query.eq(column, value)
+        page = query.order(changed_at).order("id").limit(PAGE_SIZE).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        after = (page[-1][changed_at], page[-1]["id"])
+    return rows
+
+
+def fetch_deleted(table: str, since: Optional[str]) -> List[Dict[str, Any]]:
+    """Tombstones (id, deleted_at) of rows of `table` deleted at or after `since`
+    (see 20261020000000_job_change_feed.sql)"""
+    return fetch_changed("row_tombstones", "id, deleted_at", since, equals={"table_name": table}, changed_at="deleted_at")
+
+
+def poll_since(watermark: Optional[str]) -> Optional[str]:
+    """Where a delta poll starts: SYNC_OVERLAP before the watermark (everything when None)"""
+    if not watermark:
+        return None
+    return (datetime.fromisoformat(watermark) - SYNC_OVERLAP).isoformat()
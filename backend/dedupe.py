@@ -0,0 +1,225 @@
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .change_feed import fetch_changed, poll_since
+from .dependencies import supabase_admin
+
+PROFILE_COLUMNS = "id, full_name, email, graduation_year, company, updated_at"
+UPSERT_CHUNK_SIZE = 500
+NUM_PERM = 128
+# 32 bands of 4 rows put the LSH threshold, (1/BANDS) ** (1/ROWS), near 0.42: a pair
+# shares a bucket with probability ~0.99 at Jaccard 0.6 and ~0.9998 at MIN_SCORE.
+# (16 x 8 would sit at 0.71 and miss ~40% of pairs right at MIN_SCORE.)
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+MIN_SCORE = 0.7
+# Buckets larger than this (e.g. a very common name) are skipped so candidate
+# generation stays near-linear; such profiles still meet through other bands.
+MAX_BUCKET_SIZE = 100
+COMPANY_SUFFIXES = re.compile(r"\b(pvt|private|ltd|limited|inc|llc|llp|corp|corporation|co)\b")
+NAME_PREFIXES = re.compile(r"\b(mr|mrs|ms|dr|capt|prof)\b")
+
+# Fixed seed: signatures must be comparable across workers and runs
+_rng = np.random.default_rng(20261019)
+_PERM_A = _rng.integers(0, np.iinfo(np.uint64).max, NUM_PERM, dtype=np.uint64, endpoint=True) | np.uint64(1)
+_PERM_B = _rng.integers(0, np.iinfo(np.uint64).max, NUM_PERM, dtype=np.uint64, endpoint=True)
+_BAND_MIX = _rng.integers(1, np.iinfo(np.uint64).max, ROWS, dtype=np.uint64, endpoint=True)
+_BAND_SALT = _rng.integers(0, np.iinfo(np.uint64).max, BANDS, dtype=np.uint64, endpoint=True)
+MINHASH_CHUNK_SIZE = 2000
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"[^a-z0-9 ]+", " ", str(value or "").lower()).strip()
+
+
+def _grams(text: str, prefix: str, n: int = 3) -> Set[str]:
+    text = text.replace(" ", "")
+    return {f"{prefix}{text[i:i + n]}" for i in range(max(len(text) - n + 1, 1))} if text else set()
+
+
+def _email_local_part(profile: Dict[str, Any]) -> str:
+    return str(profile.get("email") or "").lower().split("@")[0].split("+")[0]
+
+
+# Normalized fields; shingles() and _match_keys() both use these, so the
+# reported matched_fields agree with what the score compared
+def _name_key(profile: Dict[str, Any]) -> str:
+    # Token order is ignored so "Kumar Ravi" matches "Ravi Kumar"
+    return " ".join(sorted(NAME_PREFIXES.sub(" ", _normalize(profile.get("full_name"))).split()))
+
+
+def _email_key(profile: Dict[str, Any]) -> str:
+    return re.sub(r"[^a-z]", "", _email_local_part(profile))
+
+
+def _company_key(profile: Dict[str, Any]) -> str:
+    return " ".join(COMPANY_SUFFIXES.sub(" ", _normalize(profile.get("company"))).split())
+
+
+def shingles(profile: Dict[str, Any]) -> Set[str]:
+    """Character 3-grams of name and email local-part, plus year and company tokens"""
+    result = _grams(_name_key(profile), "n:") | _grams(_email_key(profile), "e:")
+    if profile.get("graduation_year"):
+        result.add(f"y:{profile['graduation_year']}")
+    result.update(f"c:{token}" for token in _company_key(profile).split())
+    return result
+
+
+def minhash(feature_sets: List[Set[str]]) -> np.ndarray:
+    """MinHash signatures, one row per feature set; empty sets get all-max rows"""
+    sizes = np.fromiter(map(len, feature_sets), dtype=np.int64, count=len(feature_sets))
+    signatures = np.full((len(feature_sets), NUM_PERM), np.iinfo(np.uint64).max, dtype=np.uint64)
+    hashes = np.fromiter(
+        (zlib.crc32(f.encode()) for features in feature_sets for f in features), dtype=np.uint64, count=int(sizes.sum()),
+    )
+    if hashes.size:
+        # Multiply-shift hashing: the high 32 bits of (a*x + b) mod 2^64
+        hashed = (hashes[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)
+        starts = (np.cumsum(sizes) - sizes)[sizes > 0]
+        signatures[sizes > 0] = np.minimum.reduceat(hashed, starts, axis=0)
+    return signatures
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """One 64-bit LSH bucket key per band (salted by band) for each signature row"""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS)
+    return (bands * _BAND_MIX).sum(axis=2) + _BAND_SALT
+
+
+def _match_keys(profile: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Normalized field values used to report which fields of a pair agree"""
+    return (_name_key(profile), _email_key(profile), profile.get("graduation_year"), _company_key(profile))
+
+
+MATCH_FIELDS = ("full_name", "email", "graduation_year", "company")
+
+
+class DuplicateDetector:
+    """MinHash/LSH index over profiles for finding likely duplicate records.
+
+    Each profile's shingles are reduced to a NUM_PERM MinHash signature and
+    the signature is split into BANDS bands; profiles sharing any band
+    bucket become candidate pairs, scored by estimated Jaccard similarity.
+    Full scans index every profile; incremental scans re-index only profiles
+    changed since the updated_at watermark and look up their candidates.
+    """
+
+    def __init__(self):
+        self._reset()
+        self.watermark: Optional[str] = None
+        self.scanned_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _reset(self) -> None:
+        # Signatures live in one matrix so a profile is scored against all of its candidates at once
+        self.profiles: List[Dict[str, Any]] = []
+        self.match_keys: List[Tuple[Any, ...]] = []
+        self.rows: Dict[str, int] = {}
+        self.signatures = np.zeros((0, NUM_PERM), dtype=np.uint64)
+        self.band_keys = np.zeros((0, BANDS), dtype=np.uint64)
+        self.indexed: List[bool] = []
+        self.buckets: Dict[int, Set[int]] = defaultdict(set)
+
+    def _fetch(self, since: Optional[str]) -> List[Dict[str, Any]]:
+        return fetch_changed("profiles", PROFILE_COLUMNS, since)
+
+    def _index(self, profiles: List[Dict[str, Any]]) -> List[int]:
+        """Add or replace profiles in the index and return their rows"""
+        signatures = np.vstack([np.zeros((0, NUM_PERM), dtype=np.uint64)] + [
+            minhash([shingles(profile) for profile in profiles[start:start + MINHASH_CHUNK_SIZE]])
+            for start in range(0, len(profiles), MINHASH_CHUNK_SIZE)
+        ])
+        keys = band_keys(signatures)
+        new_ids = {profile["id"] for profile in profiles} - self.rows.keys()
+        if new_ids:
+            self.signatures = np.vstack([self.signatures, np.zeros((len(new_ids), NUM_PERM), dtype=np.uint64)])
+            self.band_keys = np.vstack([self.band_keys, np.zeros((len(new_ids), BANDS), dtype=np.uint64)])
+        changed = []
+        for profile, signature, row_keys in zip(profiles, signatures, keys):
+            row = self.rows.get(profile["id"])
+            if row is None:
+                row = self.rows[profile["id"]] = len(self.profiles)
+                self.profiles.append(profile)
+                self.match_keys.append(())
+                self.indexed.append(False)
+            elif self.indexed[row]:
+                for key in self.band_keys[row].tolist():
+                    self.buckets[key].discard(row)
+            self.profiles[row] = profile
+            self.match_keys[row] = _match_keys(profile)
+            self.signatures[row] = signature
+            self.band_keys[row] = row_keys
+            # Profiles without any shingles keep the all-max signature and are never bucketed
+            self.indexed[row] = bool(signature[0] != np.iinfo(np.uint64).max)
+            if self.indexed[row]:
+                for key in row_keys.tolist():
+                    self.buckets[key].add(row)
+            changed.append(row)
+        return changed
+
+    def _candidates(self, rows: List[int]) -> List[Dict[str, Any]]:
+        checked = set(rows)
+        pairs: List[Dict[str, Any]] = []
+        for row in checked:
+            if not self.indexed[row]:
+                continue
+            signature = self.signatures[row]
+            others: Set[int] = set()
+            for key in self.band_keys[row].tolist():
+                bucket = self.buckets.get(key, ())
+                if 1 < len(bucket) <= MAX_BUCKET_SIZE:
+                    others.update(bucket)
+            # Pairs of two checked profiles are scored once, from the lower row
+            others = [other for other in others if other > row or other not in checked]
+            if not others:
+                continue
+            others = np.array(others, dtype=np.int64)
+            scores = (self.signatures[others] == signature).mean(axis=1)
+            for other, score in zip(others[scores >= MIN_SCORE], scores[scores >= MIN_SCORE]):
+                first, second = sorted((self.profiles[row]["id"], self.profiles[other]["id"]))
+                pairs.append({
+                    "profile_id": first,
+                    "duplicate_id": second,
+                    "score": round(float(score), 4),
+                    "matched_fields": [
+                        field for field, mine, theirs in zip(MATCH_FIELDS, self.match_keys[row], self.match_keys[other])
+                        if mine and mine == theirs
+                    ],
+                })
+        return pairs
+
+    def scan(self, full: bool = False) -> List[Dict[str, Any]]:
+        """Re-index profiles and return scored candidate pairs.
+
+        A full scan (also the first one in a process) checks every profile;
+        otherwise only profiles created or changed since the last scan.
+        """
+        with self._lock:
+            if full or self.scanned_at is None:
+                self._reset()
+                changed = self._fetch(None)
+            else:
+                changed = self._fetch(poll_since(self.watermark))
+            rows = self._index(changed)
+            if changed:
+                self.watermark = max([self.watermark or ""] + [p["updated_at"] for p in changed if p.get("updated_at")])
+            self.scanned_at = time.time()
+            return self._candidates(rows)
+
+    def scan_and_store(self, full: bool = False) -> int:
+        """Scan and upsert candidates; reviewed pairs keep their review status"""
+        candidates = self.scan(full)
+        for start in range(0, len(candidates), UPSERT_CHUNK_SIZE):
+            supabase_admin.table("profile_duplicate_candidates").upsert(
+                candidates[start:start + UPSERT_CHUNK_SIZE], on_conflict="profile_id,duplicate_id",
+            ).execute()
+        return len(candidates)
+
+
+duplicate_detector = DuplicateDetector()
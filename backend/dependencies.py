@@ -1,27 +1,157 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from pydantic import BaseModel, Field
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 import os
+import threading
+from contextvars import ContextVar
 from datetime import datetime
-from supabase import create_client, Client
+from functools import lru_cache
+import httpx
 from dotenv import load_dotenv
 from pathlib import Path
 
+from .resilience import CircuitOpenError, ResilientTransport, get_breaker
+
+if TYPE_CHECKING:
+    from supabase import Client
+
 ROOT_DIR = Path(__file__).parent.parent
-load_dotenv(ROOT_DIR / '.env')
 
-# Supabase configuration
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-SUPABASE_SERVICE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
+class Settings(BaseModel):
+    supabase_url: Optional[str] = None
+    supabase_key: Optional[str] = None
+    supabase_service_key: Optional[str] = None
+    http_pool_size: int = 20
+    health_probe_interval: float = 15.0
+    profiling_secret: Optional[str] = None
+    presence_ttl: float = 60.0
+    presence_redis_url: Optional[str] = None
+    read_replica_url: Optional[str] = None
+    read_replica_pin_seconds: float = 10.0
+    directory_sync_interval: float = 5.0
+    scheduler_enabled: bool = True
+    scheduler_lease_file: Optional[str] = None
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load .env once per process and return the backend configuration"""
+    load_dotenv(ROOT_DIR / '.env')
+    return Settings(
+        supabase_url=os.environ.get("SUPABASE_URL"),
+        supabase_key=os.environ.get("SUPABASE_KEY"),
+        supabase_service_key=os.environ.get("SUPABASE_SERVICE_KEY"),
+        http_pool_size=int(os.environ.get("SUPABASE_HTTP_POOL_SIZE", "20")),
+        health_probe_interval=float(os.environ.get("HEALTH_PROBE_INTERVAL", "15")),
+        profiling_secret=os.environ.get("PROFILING_SECRET") or None,
+        presence_ttl=float(os.environ.get("PRESENCE_TTL", "60")),
+        presence_redis_url=os.environ.get("PRESENCE_REDIS_URL") or None,
+        read_replica_url=os.environ.get("SUPABASE_READ_REPLICA_URL") or None,
+        read_replica_pin_seconds=float(os.environ.get("READ_REPLICA_PIN_SECONDS", "10")),
+        directory_sync_interval=float(os.environ.get("DIRECTORY_SYNC_INTERVAL", "5")),
+        scheduler_enabled=os.environ.get("SCHEDULER_ENABLED", "1") == "1",
+        scheduler_lease_file=os.environ.get("SCHEDULER_LEASE_FILE") or None,
+    )
+
+# Supabase clients are created lazily, once per worker process. Building them
+# at import time would slow cold starts and, under a preforking server, share
+# connection pools across forked workers.
+_clients: Dict[str, "Client"] = {}
+_clients_pid: Optional[int] = None
+_http_client: Optional[httpx.Client] = None
+_clients_lock = threading.Lock()
+
+def get_supabase_client(admin: bool = False, replica: bool = False) -> "Client":
+    """Return this worker's Supabase client, creating it on first use.
+
+    replica=True returns the read-replica client when one is configured and
+    the primary's otherwise.
+    """
+    global _clients_pid, _http_client
+    if _clients_pid != os.getpid():
+        with _clients_lock:
+            if _clients_pid != os.getpid():
+                # Deferred: importing supabase dominates module import time
+                from supabase import create_client, ClientOptions
+
+                settings = get_settings()
+                if not all([settings.supabase_url, settings.supabase_key, settings.supabase_service_key]):
+                    raise ValueError("Missing required Supabase environment variables")
+
+                # One keep-alive pool per worker, shared by both clients
+                # Timeouts, circuit breakers and hedged reads are applied per Supabase service
+                replica_url = settings.read_replica_url
+                _http_client = httpx.Client(
+                    transport=ResilientTransport(
+                        limits=httpx.Limits(
+                            max_connections=settings.http_pool_size,
+                            max_keepalive_connections=settings.http_pool_size,
+                        ),
+                        replica_host=httpx.URL(replica_url).host if replica_url else None,
+                    ),
+                )
+                options = ClientOptions(httpx_client=_http_client)
+                _clients.clear()
+                _clients["anon"] = create_client(settings.supabase_url, settings.supabase_key, options=options)
+                _clients["admin"] = create_client(settings.supabase_url, settings.supabase_service_key, options=options)
+                if replica_url:
+                    # Replicas serve the data API only and accept the primary's keys
+                    _clients["anon_replica"] = create_client(replica_url, settings.supabase_key, options=options)
+                    _clients["admin_replica"] = create_client(replica_url, settings.supabase_service_key, options=options)
+                _clients_pid = os.getpid()
+    name = "admin" if admin else "anon"
+    return _clients.get(name + "_replica" if replica else name) or _clients[name]
 
-if not all([SUPABASE_URL, SUPABASE_KEY, SUPABASE_SERVICE_KEY]):
-    raise ValueError("Missing required Supabase environment variables")
+def warm_clients() -> None:
+    """Create this worker's clients and open a pooled connection to Supabase"""
+    settings = get_settings()
+    get_supabase_client()
+    for client in list(_clients.values()):
+        # Build the PostgREST sub-client, which supabase-py creates on first query
+        client.postgrest
+    try:
+        _http_client.get(f"{settings.supabase_url}/auth/v1/health", headers={"apikey": settings.supabase_key}, timeout=5)
+    except httpx.HTTPError:
+        # Warming is best effort; requests will connect on demand
+        pass
+
+def close_clients() -> None:
+    """Close this worker's connection pool and drop its clients"""
+    global _clients_pid, _http_client
+    with _clients_lock:
+        if _http_client is not None and _clients_pid == os.getpid():
+            _http_client.close()
+        _http_client = None
+        _clients.clear()
+        _clients_pid = None
+
+class ReadRouting:
+    """Where the current request's data-API queries go; set per request by ReadRoutingMiddleware"""
+    def __init__(self, replica: bool):
+        self.replica = replica
+        self.used_primary = False
+
+read_routing: ContextVar[Optional[ReadRouting]] = ContextVar("read_routing", default=None)
 
-# Create Supabase clients
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-supabase_admin: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Attributes that reach PostgREST; auth and storage always go to the primary project
+DATA_API_ATTRS = ("table", "from_", "rpc", "postgrest", "schema")
+
+class _LazyClient:
+    """Module-level stand-in that resolves to the worker's client on attribute access"""
+    def __init__(self, admin: bool):
+        self._admin = admin
+
+    def __getattr__(self, name):
+        routing = read_routing.get()
+        if routing is not None and name in DATA_API_ATTRS:
+            # A replica with an open circuit is skipped until its breaker allows a trial call
+            if routing.replica and not get_breaker("postgrest_replica").is_open():
+                return getattr(get_supabase_client(self._admin, replica=True), name)
+            routing.used_primary = True
+        return getattr(get_supabase_client(self._admin), name)
+
+supabase: "Client" = _LazyClient(admin=False)
+supabase_admin: "Client" = _LazyClient(admin=True)
 
 # Security
 security = HTTPBearer()
@@ -92,14 +222,26 @@ class Group(BaseModel):
     description: Optional[str] = None
     created_by: str
     is_private: bool = False
+    member_count: int = 0
+    post_count: int = 0
+    last_post_at: Optional[datetime] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
+class GroupPage(BaseModel):
+    items: List[Group]
+    sort: str
+    limit: int
+    offset: int
+    has_more: bool
+
 class GroupMember(BaseModel):
     id: str
     group_id: str
     user_id: str
     role: str = 'member'
+    notify_mode: str = 'daily'
+    notify_channel: str = 'email'
     joined_at: Optional[datetime] = None
 
 class GroupPost(BaseModel):
@@ -118,9 +260,54 @@ class GroupCreate(BaseModel):
 class GroupPostCreate(BaseModel):
     content: str
 
+class GroupNotificationSettings(BaseModel):
+    notify_mode: str  # immediate, hourly, daily or off
+    notify_channel: str = 'email'  # email or whatsapp
+
+class EventFeedbackCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    would_recommend: Optional[str] = None
+    comments: Optional[str] = None
+
+class ThreadReadRequest(BaseModel):
+    up_to: Optional[datetime] = None
+    up_to_id: Optional[str] = None
+
+class DuplicateReview(BaseModel):
+    status: str  # pending, dismissed, merged
+
+class CheckInScan(BaseModel):
+    attendee_id: str
+    scanned_at: Optional[datetime] = None  # client clock; defaults to server time
+
+class CheckInBatch(BaseModel):
+    scans: List[CheckInScan] = Field(..., min_length=1, max_length=1000)
+
+class ApplicationStatusUpdate(BaseModel):
+    application_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    status: str  # submitted, reviewed, interview, accepted, rejected
+
+class BroadcastCreate(BaseModel):
+    subject: Optional[str] = None
+    content: str = Field(..., min_length=1)
+    # Recipient filter, as on the directory; at least one is required
+    graduation_year: Optional[int] = None
+    company: Optional[str] = None
+    degree: Optional[str] = None
+    major: Optional[str] = None
+    location: Optional[str] = None
+    is_mentor: Optional[bool] = None
+    notify: bool = False  # also email/WhatsApp each recipient
+
 # Authentication helper functions
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """Verify JWT token and return user data"""
+    # Sub-requests dispatched by /api/batch carry the user already verified
+    # for the whole batch, so the token is only checked once per batch.
+    batch_user = request.scope.get("batch_user")
+    if batch_user is not None:
+        return batch_user
+
     try:
         token = credentials.credentials
         
@@ -136,9 +323,24 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         
         return user_response.user.model_dump()
     
+    except CircuitOpenError:
+        # Auth is down, the token isn't necessarily bad: surface a 503, not a 401
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+ADMIN_ROLES = ("admin", "super_admin")
+
+async def get_current_admin(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
+    """Require the current user's profile to have an admin role"""
+    response = supabase_admin.table("profiles").select("role").eq("id", current_user["id"]).execute()
+    if not response.data or response.data[0].get("role") not in ADMIN_ROLES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
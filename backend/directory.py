@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import threading
+import time
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .change_feed import fetch_changed, fetch_deleted, poll_since
+from .dependencies import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Columns whose values repeat across many alumni; each distinct value is stored once
+INTERNED_COLUMNS = frozenset((
+    "company", "job_title", "degree", "major", "department", "location", "role", "current_position",
+))
+DIRECTORY_FILTERS = ("graduation_year", "company", "degree", "major", "location", "is_mentor")
+
+
+def _directory_order(names: Optional[List[Optional[str]]], ids: List[str]) -> Tuple[List[int], List[int]]:
+    """Row positions sorted by name (case-insensitive, unnamed last, then id) and each row's rank"""
+    names = names or [None] * len(ids)
+    order = sorted(
+        range(len(ids)),
+        key=lambda position: (names[position] is None, (names[position] or "").casefold(), ids[position]),
+    )
+    rank = [0] * len(ids)
+    for position_rank, position in enumerate(order):
+        rank[position] = position_rank
+    return order, rank
+
+
+class CompactDirectory:
+    """Replica of the profiles table held in this worker's memory.
+
+    Rows are stored column-wise: one list per column and an id -> row
+    position index, so a profile costs a list slot per column rather than a
+    dict. Values of INTERNED_COLUMNS are shared between rows. Directory
+    pages, lookups by id and filters are answered without a round trip.
+
+    Changes are pulled by polling profiles.updated_at (see
+    20261019220000_profile_change_feed.sql) and deletions by polling the
+    profile tombstones (20261020010000_profile_tombstones.sql); the periodic
+    full resync catches anything a poll missed.
+    """
+
+    def __init__(self, full_resync_interval: float = 3600):
+        self.full_resync_interval = full_resync_interval
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+        self.watermark: Optional[str] = None
+        self.deleted_watermark: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.resynced_at: Optional[float] = None
+        self.last_sync: Dict[str, Any] = {}
+
+    def _reset(self) -> None:
+        self.columns: Dict[str, List[Any]] = {}
+        self.index: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.strings: Dict[str, str] = {}
+        self._order: Optional[List[int]] = None
+        self._rank: List[int] = []
+        # Bumped whenever the order goes stale, so a rebuild can tell it raced with a change
+        self._order_version = 0
+
+    def _order_changed(self) -> None:
+        self._order = None
+        self._order_version += 1
+
+    @property
+    def ready(self) -> bool:
+        return self.resynced_at is not None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _fetch(self, since: Optional[str]) -> List[Dict[str, Any]]:
+        """Profiles changed at or after `since` (all rows when None)"""
+        return fetch_changed("profiles", "*", since)
+
+    def _fetch_deleted(self, since: Optional[str]) -> List[Dict[str, Any]]:
+        """Tombstones of profiles deleted at or after `since`"""
+        return fetch_deleted("profiles", since)
+
+    def _intern(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.strings.setdefault(value, value)
+        return value
+
+    def apply(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert or overwrite rows by id; returns how many were new"""
+        added = 0
+        reordered = False
+        with self._lock:
+            for row in rows:
+                position = self.index.get(row["id"])
+                if position is None:
+                    position = self.index[row["id"]] = len(self.ids)
+                    self.ids.append(row["id"])
+                    for values in self.columns.values():
+                        values.append(None)
+                    added += 1
+                    reordered = True
+                elif "full_name" in row:
+                    names = self.columns.get("full_name")
+                    reordered = reordered or row["full_name"] != (names[position] if names is not None else None)
+                for column, value in row.items():
+                    values = self.columns.get(column)
+                    if values is None:
+                        values = self.columns[column] = [None] * len(self.ids)
+                    values[position] = self._intern(value) if column in INTERNED_COLUMNS else value
+            # Most polls only re-read rows already seen: keep the order unless a row joined or was renamed
+            if reordered:
+                self._order_changed()
+        return added
+
+    def remove(self, profile_ids: List[str]) -> int:
+        """Drop profiles by id; returns how many were held"""
+        removed = 0
+        with self._lock:
+            for profile_id in profile_ids:
+                position = self.index.pop(profile_id, None)
+                if position is None:
+                    continue
+                # Move the last row into the gap so positions stay dense
+                last = len(self.ids) - 1
+                if position != last:
+                    self.ids[position] = self.ids[last]
+                    self.index[self.ids[position]] = position
+                    for values in self.columns.values():
+                        values[position] = values[last]
+                self.ids.pop()
+                for values in self.columns.values():
+                    values.pop()
+                removed += 1
+            if removed:
+                self._order_changed()
+        return removed
+
+    def _resync(self) -> Tuple[int, str]:
+        rows = self._fetch(None)
+        replica = CompactDirectory()
+        replica.apply(rows)
+        with self._lock:
+            self.columns, self.index, self.ids, self.strings = replica.columns, replica.index, replica.ids, replica.strings
+            self._order_changed()
+        self.watermark = max((row["updated_at"] for row in rows if row.get("updated_at")), default=None)
+        # Profiles deleted after they were read here were deleted after this point
+        self.deleted_watermark = self.watermark
+        self.resynced_at = time.time()
+        return len(rows), "full"
+
+    def _poll(self) -> Tuple[int, str]:
+        rows = self._fetch(poll_since(self.watermark))
+        self.apply(rows)
+        self.watermark = max([self.watermark or ""] + [row["updated_at"] for row in rows if row.get("updated_at")]) or None
+        deleted = self._fetch_deleted(poll_since(self.deleted_watermark))
+        self.remove([row["id"] for row in deleted])
+        self.deleted_watermark = max([self.deleted_watermark or ""] + [row["deleted_at"] for row in deleted]) or None
+        return len(rows), "delta"
+
+    def sync(self, full: bool = False) -> Dict[str, Any]:
+        """Pull changes since the watermark, or everything on a full resync (blocking)"""
+        with self._sync_lock:
+            started = time.time()
+            due = self.resynced_at is None or started - self.resynced_at > self.full_resync_interval
+            rows, kind = self._resync() if full or due else self._poll()
+            self._refresh_order()
+            self.synced_at = time.time()
+            self.last_sync = {"kind": kind, "rows": rows, "seconds": round(self.synced_at - started, 4)}
+            return self.last_sync
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "profiles": len(self.ids),
+            "columns": len(self.columns),
+            "interned_values": len(self.strings),
+            "watermark": self.watermark,
+            "staleness_seconds": round(time.time() - self.synced_at, 3) if self.synced_at else None,
+            "last_sync": self.last_sync,
+        }
+
+    def _row(self, position: int) -> Dict[str, Any]:
+        return {column: values[position] for column, values in self.columns.items()}
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            position = self.index.get(profile_id)
+            return self._row(position) if position is not None else None
+
+    def get_many(self, profile_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {pid: self._row(self.index[pid]) for pid in profile_ids if pid in self.index}
+
+    def _sorted(self) -> Tuple[List[int], List[int]]:
+        """Row positions in directory order and each row's rank in it; built here only if a
+        page comes in before the sync thread has rebuilt them"""
+        if self._order is None:
+            self._order, self._rank = _directory_order(self.columns.get("full_name"), self.ids)
+        return self._order, self._rank
+
+    def _refresh_order(self) -> None:
+        """Rebuild a stale directory order from the sync thread, so pages don't pay for the sort"""
+        with self._lock:
+            if self._order is not None:
+                return
+            version = self._order_version
+            names = list(self.columns.get("full_name") or [])
+            ids = list(self.ids)
+        order, rank = _directory_order(names, ids)
+        with self._lock:
+            # Dropped if rows changed meanwhile; the next sync rebuilds it
+            if self._order_version == version:
+                self._order, self._rank = order, rank
+
+    def _matching(self, column: str, wanted: Any, positions: Optional[List[int]]) -> List[int]:
+        values = self.columns.get(column)
+        if values is None:
+            return []
+        candidates = range(len(values)) if positions is None else positions
+        if not isinstance(wanted, str):
+            return [p for p in candidates if values[p] == wanted]
+        wanted = wanted.casefold()
+        if column in INTERNED_COLUMNS:
+            # Compare each distinct value once, then match rows by membership
+            accepted = {value for value in self.strings if value.casefold() == wanted}
+            return [p for p in candidates if values[p] in accepted]
+        return [p for p in candidates if isinstance(values[p], str) and values[p].casefold() == wanted]
+
+    def page(self, limit: int, offset: int = 0, search: Optional[str] = None,
+             **filters: Any) -> List[Dict[str, Any]]:
+        """One page of the directory in name order, narrowed by equality filters and a name search"""
+        with self._lock:
+            order, rank = self._sorted()
+            positions: Optional[List[int]] = None
+            for column, wanted in filters.items():
+                if wanted is not None:
+                    positions = self._matching(column, wanted, positions)
+            if search:
+                names = self.columns.get("full_name") or [None] * len(self.ids)
+                needle = search.casefold()
+                if positions is None:
+                    # Walk in directory order and stop as soon as the page is full
+                    found = (p for p in order if names[p] is not None and needle in names[p].casefold())
+                    return [self._row(position) for position in islice(found, offset, offset + limit)]
+                positions = [p for p in positions if names[p] is not None and needle in names[p].casefold()]
+            if positions is None:
+                return [self._row(position) for position in order[offset:offset + limit]]
+            positions.sort(key=rank.__getitem__)
+            return [self._row(position) for position in positions[offset:offset + limit]]
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                await run_in_threadpool(self.sync)
+            except Exception:
+                logger.exception("Directory sync failed")
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        interval = get_settings().directory_sync_interval
+        if self._task is None and interval > 0:
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+directory = CompactDirectory()
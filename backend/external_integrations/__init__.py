@@ -0,0 +1,16 @@
+from typing import Optional
+
+# Client errors worth retrying: request timeout, conflict, rate limited
+RETRYABLE_CLIENT_ERRORS = (408, 409, 429)
+
+
+class ProviderError(Exception):
+    """A notification provider refused or failed a message; the message says why"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, permanent: Optional[bool] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        # Other 4xx responses fail the same way however often they are retried
+        self.permanent = permanent if permanent is not None else (
+            status_code is not None and 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS
+        )
@@ -1,15 +1,22 @@
 import os
+from python_http_client.exceptions import HTTPError
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
+from . import ProviderError
+from ..resilience import get_breaker, is_server_error, timeout_for
 
-SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY')
-SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
+def send_email(to_email: str, subject: str, html_content: str) -> int:
+    """Sends an email using SendGrid and returns the response status code.
 
-def send_email(to_email: str, subject: str, html_content: str):
-    """Sends an email using SendGrid."""
+    Raises ProviderError with SendGrid's status code and response body when
+    the message is refused, and CircuitOpenError while SendGrid is known to
+    be down.
+    """
+    # Read at call time so values loaded from .env after import are picked up
+    SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY')
+    SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
     if not all([SENDGRID_API_KEY, SENDER_EMAIL]):
-        print("SendGrid credentials not configured.")
-        return None
+        raise ProviderError("SendGrid credentials not configured")
 
     message = Mail(
         from_email=SENDER_EMAIL,
@@ -17,10 +24,12 @@ def send_email(to_email: str, subject: str, html_content: str):
         subject=subject,
         html_content=html_content
     )
+    sg = SendGridAPIClient(SENDGRID_API_KEY)
+    sg.client.timeout = timeout_for("sendgrid")
     try:
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
-        return response.status_code
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        return None
+        with get_breaker("sendgrid").guard(is_failure=is_server_error):
+            response = sg.send(message)
+    except HTTPError as e:
+        body = e.body.decode("utf-8", "replace") if isinstance(e.body, bytes) else str(e.body)
+        raise ProviderError(f"SendGrid returned {e.status_code}: {body[:500]}", e.status_code) from e
+    return response.status_code
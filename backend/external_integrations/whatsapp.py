@@ -1,15 +1,20 @@
 import os
 import requests
 import json
+from . import ProviderError
+from ..resilience import get_breaker, is_server_error, timeout_for
 
-WATI_API_ENDPOINT = os.environ.get('WATI_API_ENDPOINT')
-WATI_ACCESS_TOKEN = os.environ.get('WATI_ACCESS_TOKEN')
+def send_whatsapp_template_message(to_number: str, template_name: str, parameters: dict) -> str:
+    """Sends a WhatsApp template message using Wati and returns its ticket id.
 
-def send_whatsapp_template_message(to_number: str, template_name: str, parameters: dict):
-    """Sends a WhatsApp template message using Wati."""
+    Raises ProviderError with Wati's status code and response when the
+    message is refused, and CircuitOpenError while Wati is known to be down.
+    """
+    # Read at call time so values loaded from .env after import are picked up
+    WATI_API_ENDPOINT = os.environ.get('WATI_API_ENDPOINT')
+    WATI_ACCESS_TOKEN = os.environ.get('WATI_ACCESS_TOKEN')
     if not all([WATI_API_ENDPOINT, WATI_ACCESS_TOKEN]):
-        print("Wati credentials not configured.")
-        return None
+        raise ProviderError("Wati credentials not configured")
 
     url = f"{WATI_API_ENDPOINT}/api/v1/sendTemplateMessage"
     headers = {
@@ -32,17 +37,17 @@ def send_whatsapp_template_message(to_number: str, template_name: str, parameter
     }
 
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
-        response.raise_for_status()
-        response_json = response.json()
-        
-        # Check for a successful response from Wati
-        if response_json.get('result', False) is True or response_json.get('status') == 'success':
-             return response_json.get('ticket_id', 'success')
-        else:
-            print(f"Error from Wati API: {response_json}")
-            return None
-            
-    except requests.exceptions.RequestException as e:
-        print(f"Error sending Wati template message: {e}")
-        return None
+        with get_breaker("wati").guard(is_failure=is_server_error):
+            response = requests.post(url, headers=headers, data=json.dumps(payload), timeout=timeout_for("wati"))
+            response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        raise ProviderError(
+            f"Wati returned {e.response.status_code}: {e.response.text[:500]}", e.response.status_code,
+        ) from e
+    response_json = response.json()
+
+    # Check for a successful response from Wati
+    if response_json.get('result', False) is True or response_json.get('status') == 'success':
+        return response_json.get('ticket_id', 'success')
+    # A refusal in a 200 response (unknown template, invalid number) comes back the same on a retry
+    raise ProviderError(f"Wati rejected the message: {json.dumps(response_json)[:500]}", response.status_code, permanent=True)
@@ -0,0 +1,129 @@
+import html
+import logging
+import os
+from typing import Any, Dict, List, Tuple
+
+from .dependencies import supabase_admin
+from .outbox import enqueue_notifications
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_MODES = ("immediate", "hourly", "daily", "off")
+NOTIFY_CHANNELS = ("email", "whatsapp")
+FANOUT_BATCH = 200
+DIGEST_BATCH = 500
+# Caps one run at DIGEST_BATCH * MAX_DIGEST_BATCHES digests; the rest wait for the next run
+MAX_DIGEST_BATCHES = 10
+DIGEST_LEASE_SECONDS = 300
+# Posts listed in one digest; older ones are summarised as a count
+DIGEST_POSTS_SHOWN = 10
+
+
+def fan_out_posts() -> Dict[str, int]:
+    """File a pending delivery per member for every queued post (see the
+    group_post_fanout migration); members are resolved in the database, a
+    batch of posts per call."""
+    totals = {"posts": 0, "deliveries": 0}
+    while True:
+        batch = supabase_admin.rpc("fan_out_group_posts", {"p_limit": FANOUT_BATCH}).execute().data[0]
+        totals["posts"] += batch["posts"]
+        totals["deliveries"] += batch["deliveries"]
+        if batch["posts"] < FANOUT_BATCH:
+            return totals
+
+
+def _group_digests(rows: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    digests: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        digests.setdefault(row["digest_key"], []).append(row)
+    return digests
+
+
+def _email(posts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    recipient = posts[0]
+    groups = sorted({post["group_name"] for post in posts})
+    subject = (
+        f"{posts[0]['author_name'] or 'Someone'} posted in {groups[0]}" if len(posts) == 1
+        else f"{len(posts)} new posts in {', '.join(groups[:3])}{' and more' if len(groups) > 3 else ''}"
+    )
+    items = "".join(
+        f"<li><strong>{html.escape(post['author_name'] or 'A member')}</strong> in "
+        f"{html.escape(post['group_name'])}: {html.escape(post['content'])}</li>"
+        for post in posts[:DIGEST_POSTS_SHOWN]
+    )
+    more = len(posts) - DIGEST_POSTS_SHOWN
+    return {
+        "to_email": recipient["email"],
+        "subject": subject,
+        "html_content": (
+            f"<p>Hi {html.escape(recipient['full_name'] or 'there')},</p>"
+            f"<p>New in your groups:</p><ul>{items}</ul>"
+            f"{f'<p>and {more} more.</p>' if more > 0 else ''}"
+        ),
+    }
+
+
+def _whatsapp(posts: List[Dict[str, Any]], template: str) -> Dict[str, Any]:
+    return {
+        "to_number": posts[0]["phone"],
+        "template_name": template,
+        "parameters": {
+            "name": posts[0]["full_name"] or "there",
+            "count": str(len(posts)),
+            "groups": ", ".join(sorted({post["group_name"] for post in posts})),
+        },
+    }
+
+
+def _messages(digests: Dict[str, List[Dict[str, Any]]]) -> Tuple[list, list]:
+    whatsapp_template = os.environ.get("WATI_GROUP_DIGEST_TEMPLATE")
+    emails, whatsapps = [], []
+    for digest_key, posts in digests.items():
+        key = f"group-digest:{digest_key}"
+        recipient = posts[0]
+        if recipient["channel"] == "whatsapp" and whatsapp_template and recipient.get("phone"):
+            whatsapps.append((_whatsapp(posts, whatsapp_template), key))
+        elif recipient.get("email"):
+            # Also the fallback for WhatsApp members without a number or before the template exists
+            emails.append((_email(posts), key))
+    return emails, whatsapps
+
+
+def deliver_digests() -> Dict[str, int]:
+    """Turn due deliveries into one outbox message per recipient and channel.
+
+    Claimed in batches of DIGEST_BATCH recipients, at most MAX_DIGEST_BATCHES
+    per run, so a burst of posts in large groups becomes a steady, bounded
+    stream of outbox rows; the outbox worker then sends them at its own
+    per-channel concurrency.
+    """
+    totals = {"digests": 0, "posts": 0}
+    for _ in range(MAX_DIGEST_BATCHES):
+        rows = supabase_admin.rpc("claim_group_post_digests", {
+            "p_recipients": DIGEST_BATCH, "p_lease_seconds": DIGEST_LEASE_SECONDS,
+        }).execute().data or []
+        if not rows:
+            break
+        digests = _group_digests(rows)
+        emails, whatsapps = _messages(digests)
+        enqueue_notifications("email", emails)
+        enqueue_notifications("whatsapp", whatsapps)
+        # Only once the outbox has them; a crash before this re-claims them under the same keys
+        supabase_admin.rpc("complete_group_post_digests", {"p_digest_keys": list(digests)}).execute()
+        totals["digests"] += len(digests)
+        totals["posts"] += len(rows)
+        if len({(row["recipient_id"], row["channel"]) for row in rows}) < DIGEST_BATCH:
+            break
+    return totals
+
+
+def send_group_post_notifications() -> Dict[str, int]:
+    """Fan out new group posts and send the digests that have come due"""
+    fanned = fan_out_posts()
+    delivered = deliver_digests()
+    if fanned["posts"] or delivered["digests"]:
+        logger.info(
+            "Group posts: %s fanned out to %s deliveries; %s digests covering %s posts queued",
+            fanned["posts"], fanned["deliveries"], delivered["digests"], delivered["posts"],
+        )
+    return {**fanned, **{f"digest_{name}": count for name, count in delivered.items()}}
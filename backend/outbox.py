@@ -0,0 +1,48 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from .dependencies import supabase_admin
+
+CHANNELS = ("email", "whatsapp")
+ENQUEUE_CHUNK_SIZE = 500
+
+
+def enqueue_notification(channel: str, payload: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """Queue a notification for the outbox worker and return its outbox row.
+
+    With an idempotency key, enqueueing the same message again returns the
+    existing row instead of queueing a second delivery.
+    """
+    if channel not in CHANNELS:
+        raise ValueError(f"Unknown notification channel: {channel}")
+    row = {"channel": channel, "payload": payload, "idempotency_key": idempotency_key}
+    if idempotency_key is None:
+        return supabase_admin.table("notification_outbox").insert(row).execute().data[0]
+
+    response = supabase_admin.table("notification_outbox").upsert(
+        row, on_conflict="idempotency_key", ignore_duplicates=True,
+    ).execute()
+    if response.data:
+        return response.data[0]
+    existing = supabase_admin.table("notification_outbox").select("*").eq("idempotency_key", idempotency_key).execute()
+    return existing.data[0]
+
+
+def enqueue_notifications(channel: str, messages: List[Tuple[Dict[str, Any], str]]) -> List[Dict[str, Any]]:
+    """Queue many (payload, idempotency_key) messages with one insert per chunk.
+
+    Keys already in the outbox are skipped, so re-running a batch only
+    queues the messages that are missing. Returns the newly queued rows.
+    """
+    if channel not in CHANNELS:
+        raise ValueError(f"Unknown notification channel: {channel}")
+    queued: List[Dict[str, Any]] = []
+    for start in range(0, len(messages), ENQUEUE_CHUNK_SIZE):
+        rows = [
+            {"channel": channel, "payload": payload, "idempotency_key": key}
+            for payload, key in messages[start:start + ENQUEUE_CHUNK_SIZE]
+        ]
+        response = supabase_admin.table("notification_outbox").upsert(
+            rows, on_conflict="idempotency_key", ignore_duplicates=True,
+        ).execute()
+        queued.extend(response.data or [])
+    return queued
@@ -0,0 +1,187 @@
+"""Notification outbox worker.
+
+Runs as its own process next to the API:
+
+    python -m backend.outbox_worker [--concurrency 16] [--once]
+
+It claims due rows from notification_outbox (see the claim_notification_outbox
+migration), delivers them through SendGrid or Wati with a per-channel
+concurrency limit, and records the outcome. Failed deliveries are retried
+with exponential backoff and jitter; after max_attempts, or at once when
+the provider refuses it for good (a 4xx), a message is dead-lettered
+(status 'dead') and kept for inspection. While a provider's circuit breaker
+is open, messages are put back until it may close, without using an attempt.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import signal
+import socket
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Set
+
+from .dependencies import supabase_admin
+from .external_integrations import ProviderError
+from .external_integrations.email import send_email
+from .external_integrations.whatsapp import send_whatsapp_template_message
+from .resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 6 * 3600
+LEASE_SECONDS = 120
+# Per-channel in-flight limits, to stay under provider rate limits
+CHANNEL_CONCURRENCY = {"email": 8, "whatsapp": 4}
+
+
+# Senders return the provider's result and raise when the message wasn't accepted
+def _deliver_email(payload: Dict[str, Any]) -> str:
+    return str(send_email(payload["to_email"], payload["subject"], payload["html_content"]))
+
+
+def _deliver_whatsapp(payload: Dict[str, Any]) -> str:
+    return send_whatsapp_template_message(payload["to_number"], payload["template_name"], payload["parameters"])
+
+
+SENDERS = {"email": _deliver_email, "whatsapp": _deliver_whatsapp}
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff, jittered down by up to half so retries spread out"""
+    delay = min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxWorker:
+    def __init__(self, concurrency: int = 16, batch_size: int = 50, poll_interval: float = 1.0):
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.channel_limits = {channel: asyncio.Semaphore(limit) for channel, limit in CHANNEL_CONCURRENCY.items()}
+        self.inflight: Set[asyncio.Task] = set()
+        # Provider clients are blocking; size the pool so it never caps concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency + 2, thread_name_prefix="outbox")
+        self.stats = {"sent": 0, "retried": 0, "deferred": 0, "dead": 0}
+
+    async def _in_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _claim(self, limit: int):
+        response = supabase_admin.rpc("claim_notification_outbox", {
+            "p_worker": self.worker_id, "p_limit": limit, "p_lease_seconds": LEASE_SECONDS,
+        }).execute()
+        return response.data or []
+
+    def _record(self, message_id: str, update: Dict[str, Any]) -> None:
+        update["locked_by"] = None
+        update["locked_until"] = None
+        update["updated_at"] = datetime.now(timezone.utc).isoformat()
+        # Only the lease holder may record an outcome; an expired lease may have been reclaimed
+        supabase_admin.table("notification_outbox").update(update).eq("id", message_id).eq("locked_by", self.worker_id).execute()
+
+    async def deliver(self, message: Dict[str, Any]) -> None:
+        channel = message["channel"]
+        ok, result, error, permanent, retry_after = False, None, None, False, None
+        async with self.channel_limits[channel]:
+            try:
+                result = await self._in_thread(SENDERS[channel], message["payload"])
+                ok = True
+            except CircuitOpenError as e:
+                error, retry_after = str(e), e.retry_after
+            except ProviderError as e:
+                error, permanent = str(e), e.permanent
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+        now = datetime.now(timezone.utc)
+        if ok:
+            update = {"status": "sent", "sent_at": now.isoformat(), "provider_result": result, "last_error": None}
+            self.stats["sent"] += 1
+        elif retry_after is not None:
+            # Never reached the provider: hand the claimed attempt back and wait for the breaker
+            next_attempt = now + timedelta(seconds=retry_after + random.uniform(0, RETRY_BASE_SECONDS))
+            update = {"status": "pending", "next_attempt_at": next_attempt.isoformat(),
+                      "attempts": message["attempts"] - 1, "last_error": error}
+            self.stats["deferred"] += 1
+        elif permanent or message["attempts"] >= message["max_attempts"]:
+            update = {"status": "dead", "last_error": error}
+            self.stats["dead"] += 1
+            logger.warning("Dead-lettered %s message %s after %s attempts: %s",
+                           channel, message["id"], message["attempts"], error)
+        else:
+            next_attempt = now + timedelta(seconds=retry_delay(message["attempts"]))
+            update = {"status": "pending", "next_attempt_at": next_attempt.isoformat(), "last_error": error}
+            self.stats["retried"] += 1
+        await self._in_thread(self._record, message["id"], update)
+
+    async def _run_delivery(self, message: Dict[str, Any]) -> None:
+        try:
+            await self.deliver(message)
+        except Exception:
+            # The lease expires and another claim retries the message
+            logger.exception("Failed to record outcome of outbox message %s", message["id"])
+
+    async def poll_once(self) -> int:
+        """Claim as many due messages as there are free slots and start delivering them"""
+        free = self.concurrency - len(self.inflight)
+        if free <= 0:
+            return 0
+        messages = await self._in_thread(self._claim, min(free, self.batch_size))
+        for message in messages:
+            task = asyncio.create_task(self._run_delivery(message))
+            self.inflight.add(task)
+            task.add_done_callback(self.inflight.discard)
+        return len(messages)
+
+    async def run(self, stop: asyncio.Event, once: bool = False) -> None:
+        logger.info("Outbox worker %s started", self.worker_id)
+        while not stop.is_set():
+            try:
+                claimed = await self.poll_once()
+            except Exception:
+                logger.exception("Outbox claim failed")
+                claimed = 0
+            if once and not claimed and not self.inflight:
+                break
+            if self.inflight and len(self.inflight) >= self.concurrency:
+                await asyncio.wait(self.inflight, return_when=asyncio.FIRST_COMPLETED)
+            elif not claimed:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        # Let in-flight deliveries finish so their outcome is recorded
+        if self.inflight:
+            await asyncio.wait(self.inflight)
+        self.executor.shutdown()
+        logger.info("Outbox worker %s stopped: %s", self.worker_id, self.stats)
+
+
+async def main_async(args) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    worker = OutboxWorker(concurrency=args.concurrency, batch_size=args.batch_size, poll_interval=args.poll_interval)
+    await worker.run(stop, once=args.once)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver queued notifications from the outbox")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("OUTBOX_CONCURRENCY", "16")))
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds to wait when the outbox is empty")
+    parser.add_argument("--once", action="store_true", help="drain due messages and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
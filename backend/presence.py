@@ -0,0 +1,148 @@
+import logging
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60.0
+WHEEL_TICK = 1.0
+REDIS_KEY_PREFIX = "presence:"
+
+
+class TimingWheelTTLMap:
+    """user id -> last heartbeat, with entries expiring `ttl` seconds after
+    their last touch.
+
+    Expiry uses a timing wheel: one slot per tick, each entry lives in the
+    slot of the tick it expires on, and advancing the wheel drops whole
+    slots. Touch, lookup and expiry are O(1) per entry, there is no heap or
+    full sweep, and the wheel is advanced lazily by the calls themselves,
+    so no background task is needed.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, tick: float = WHEEL_TICK):
+        self.ttl = ttl
+        self.tick = tick
+        self.slots: List[Set[str]] = [set() for _ in range(math.ceil(ttl / tick) + 1)]
+        self.last_seen: Dict[str, float] = {}
+        self.slot_of: Dict[str, int] = {}
+        self.current_tick: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _advance(self, now: float) -> None:
+        now_tick = int(now // self.tick)
+        if self.current_tick is None:
+            self.current_tick = now_tick
+            return
+        # Only one lap of the wheel can ever hold live entries
+        for tick in range(max(self.current_tick + 1, now_tick - len(self.slots) + 1), now_tick + 1):
+            slot = self.slots[tick % len(self.slots)]
+            for user_id in slot:
+                del self.last_seen[user_id]
+                del self.slot_of[user_id]
+            slot.clear()
+        self.current_tick = max(self.current_tick, now_tick)
+
+    def touch(self, user_id: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._advance(now)
+            # An entry is dropped once the wheel reaches the tick after its expiry
+            slot = int((now + self.ttl) // self.tick + 1) % len(self.slots)
+            previous = self.slot_of.get(user_id)
+            if previous is not None and previous != slot:
+                self.slots[previous].discard(user_id)
+            self.slots[slot].add(user_id)
+            self.slot_of[user_id] = slot
+            self.last_seen[user_id] = now
+
+    def lookup(self, user_ids: Iterable[str], now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """Last heartbeat per user id, or None if not seen within the TTL"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._advance(now)
+            result = {}
+            for user_id in user_ids:
+                seen = self.last_seen.get(user_id)
+                result[user_id] = seen if seen is not None and now - seen < self.ttl else None
+            return result
+
+    def __len__(self) -> int:
+        return len(self.last_seen)
+
+
+class LocalPresenceStore:
+    """Presence held in this worker's memory only (single-worker deployments)"""
+
+    blocking = False
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self.entries = TimingWheelTTLMap(ttl)
+
+    def touch(self, user_id: str) -> None:
+        self.entries.touch(user_id)
+
+    def lookup(self, user_ids: List[str]) -> Dict[str, Optional[float]]:
+        return self.entries.lookup(user_ids)
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "memory", "online": len(self.entries), "ttl": self.ttl}
+
+
+class RedisPresenceStore:
+    """Presence shared by all workers through Redis keys with a TTL.
+
+    Each worker keeps its own timing-wheel map in front of Redis: a
+    heartbeat is only forwarded when this worker last wrote the user's key
+    more than a third of the TTL ago, so frequent pings cost one Redis
+    write per user per interval. Lookups are a single MGET.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str, ttl: float = DEFAULT_TTL):
+        import redis  # optional dependency, only needed for shared presence
+
+        self.ttl = ttl
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.written = TimingWheelTTLMap(ttl / 3)
+
+    def touch(self, user_id: str) -> None:
+        if self.written.lookup([user_id])[user_id] is not None:
+            return
+        now = time.time()
+        self.client.set(REDIS_KEY_PREFIX + user_id, repr(now), ex=max(1, math.ceil(self.ttl)))
+        self.written.touch(user_id, now)
+
+    def lookup(self, user_ids: List[str]) -> Dict[str, Optional[float]]:
+        if not user_ids:
+            return {}
+        values = self.client.mget([REDIS_KEY_PREFIX + user_id for user_id in user_ids])
+        return {user_id: float(value) if value is not None else None for user_id, value in zip(user_ids, values)}
+
+    def stats(self) -> Dict[str, object]:
+        return {"backend": "redis", "forwarded_recently": len(self.written), "ttl": self.ttl}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_presence_store():
+    """The process-wide presence store: Redis when PRESENCE_REDIS_URL is set, else memory"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from .dependencies import get_settings
+
+                settings = get_settings()
+                if settings.presence_redis_url:
+                    _store = RedisPresenceStore(settings.presence_redis_url, settings.presence_ttl)
+                else:
+                    _store = LocalPresenceStore(settings.presence_ttl)
+                logger.info("Presence backend: %s", _store.stats()["backend"])
+    return _store
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple
+import httpx
+from pydantic import BaseModel
+
+from .dependencies import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upstreams the API cannot serve traffic without; the others only degrade it.
+REQUIRED_UPSTREAMS = ("supabase_auth", "postgrest")
+
+
+class ProbeResult(BaseModel):
+    name: str
+    status: str  # up, down, not_configured
+    required: bool
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class UpstreamProber:
+    """Periodically probes upstream dependencies in the background.
+
+    Health endpoints read the cached results, so probe traffic is bounded by
+    the refresh interval rather than by how often the orchestrator polls.
+    """
+
+    def __init__(self, timeout: float = 3.0):
+        self.timeout = timeout
+        self.results: Dict[str, ProbeResult] = {}
+        self.started_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def interval(self) -> float:
+        return get_settings().health_probe_interval
+
+    def _targets(self) -> Dict[str, Optional[Tuple[str, str, Dict[str, str]]]]:
+        """Map each upstream to (method, url, headers), or None when not configured"""
+        settings = get_settings()
+        supabase_headers = {"apikey": settings.supabase_key or ""}
+        sendgrid_key = os.environ.get("SENDGRID_API_KEY")
+        wati_endpoint = os.environ.get("WATI_API_ENDPOINT")
+        wati_token = os.environ.get("WATI_ACCESS_TOKEN")
+        return {
+            "supabase_auth": ("GET", f"{settings.supabase_url}/auth/v1/health", supabase_headers)
+            if settings.supabase_url else None,
+            # A one-row primary-key read; never a count over the table
+            "postgrest": ("HEAD", f"{settings.supabase_url}/rest/v1/profiles?select=id&limit=1", supabase_headers)
+            if settings.supabase_url else None,
+            "sendgrid": ("GET", "https://api.sendgrid.com/v3/scopes", {"Authorization": f"Bearer {sendgrid_key}"})
+            if sendgrid_key else None,
+            "wati": ("HEAD", wati_endpoint, {"Authorization": f"Bearer {wati_token}"})
+            if wati_endpoint else None,
+        }
+
+    async def _probe(self, client: httpx.AsyncClient, name: str, target) -> ProbeResult:
+        required = name in REQUIRED_UPSTREAMS
+        if target is None:
+            return ProbeResult(name=name, status="not_configured", required=required,
+                               checked_at=datetime.now(timezone.utc))
+        method, url, headers = target
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, headers=headers)
+            latency_ms = round((time.perf_counter() - start) * 1000, 2)
+            if response.status_code >= 500:
+                return ProbeResult(name=name, status="down", required=required, latency_ms=latency_ms,
+                                   checked_at=datetime.now(timezone.utc), error=f"HTTP {response.status_code}")
+            return ProbeResult(name=name, status="up", required=required, latency_ms=latency_ms,
+                               checked_at=datetime.now(timezone.utc))
+        except httpx.HTTPError as e:
+            return ProbeResult(name=name, status="down", required=required,
+                               latency_ms=round((time.perf_counter() - start) * 1000, 2),
+                               checked_at=datetime.now(timezone.utc), error=str(e) or type(e).__name__)
+
+    async def probe_once(self) -> None:
+        """Probe every upstream concurrently and replace the cached results"""
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            results = await asyncio.gather(
+                *(self._probe(client, name, target) for name, target in self._targets().items())
+            )
+        self.results = {result.name: result for result in results}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_once()
+            except Exception:
+                logger.exception("Upstream probe round failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cached probe results with staleness, and whether the process is ready"""
+        now = datetime.now(timezone.utc)
+        max_age = self.interval * 3
+        upstreams = {}
+        ready = bool(self.results)
+        for name, result in self.results.items():
+            age = (now - result.checked_at).total_seconds() if result.checked_at else None
+            stale = age is None or age > max_age
+            upstreams[name] = {
+                **result.model_dump(exclude={"name"}),
+                "age_seconds": round(age, 3) if age is not None else None,
+                "stale": stale,
+            }
+            if result.required and (result.status != "up" or stale):
+                ready = False
+        return {"ready": ready, "upstreams": upstreams}
+
+
+prober = UpstreamProber()
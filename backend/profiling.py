@@ -0,0 +1,214 @@
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+from .dependencies import ROOT_DIR
+
+SIGNATURE_HEADER = "x-profile-signature"
+PROFILE_ID_HEADER = "x-profile-id"
+DEFAULT_INTERVAL = 0.005
+MAX_STORED_PROFILES = 20
+
+
+def _short_path(filename: str) -> str:
+    if "site-packages" in filename:
+        return filename.split("site-packages", 1)[1].lstrip(os.sep)
+    if filename.startswith(str(ROOT_DIR)):
+        return os.path.relpath(filename, ROOT_DIR)
+    return filename
+
+
+@lru_cache(maxsize=8192)
+def _label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold(stacks: Counter) -> str:
+    """Collapsed-stack text ("root;child;leaf count" per line), as read by flamegraph.pl and speedscope"""
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+
+class StackSampler:
+    """Samples the Python stacks of every thread at a fixed interval.
+
+    Runs in its own thread only while started, so there is no cost when no
+    session is active. Stacks are aggregated by thread name and call path.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.stacks
+
+
+class ProfileStore:
+    """The most recent per-request profiles, for later download"""
+
+    def __init__(self, size: int = MAX_STORED_PROFILES):
+        self.size = size
+        self.profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile_id: str, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self.profiles[profile_id] = profile
+            while len(self.profiles) > self.size:
+                self.profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self.profiles.get(profile_id)
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        return [
+            {"id": profile_id, **{key: value for key, value in profile.items() if key != "stacks"}}
+            for profile_id, profile in reversed(self.profiles.items())
+        ]
+
+
+request_profiles = ProfileStore()
+_session_lock = threading.Lock()
+
+
+def sign(secret: str, method: str, path: str, ttl: int) -> str:
+    """Signature header value allowing one method+path to be profiled until it expires"""
+    expires = int(time.time()) + ttl
+    digest = hmac.new(secret.encode(), f"{expires}:{method.upper()}:{path}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}:{digest}"
+
+
+def verify(secret: str, method: str, path: str, value: str) -> bool:
+    expires, _, digest = value.partition(":")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    expected = hmac.new(secret.encode(), f"{expires}:{method.upper()}:{path}".encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry a valid X-Profile-Signature header.
+
+    Only installed when PROFILING_SECRET is set; for unsigned requests it is
+    a header scan. The sampler sees every thread, so concurrent requests on
+    the same worker show up in the profile too. The profile id is returned
+    in X-Profile-Id and the stacks are kept in `request_profiles`.
+    """
+
+    def __init__(self, app, secret: str, interval: float = DEFAULT_INTERVAL):
+        self.app = app
+        self.secret = secret
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        signature = next((value for name, value in scope["headers"] if name == SIGNATURE_HEADER.encode()), None)
+        if signature is None or not verify(self.secret, scope["method"], scope["path"], signature.decode("latin-1")):
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex
+        status = {}
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(PROFILE_ID_HEADER.encode(), profile_id.encode())]
+            await send(message)
+
+        sampler = StackSampler(self.interval).start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            stacks = sampler.stop()
+            request_profiles.add(profile_id, {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status.get("code"),
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "samples": sampler.samples,
+                "captured_at": time.time(),
+                "stacks": stacks,
+            })
+
+
+def profile_process(seconds: float, interval: float = DEFAULT_INTERVAL) -> Counter:
+    """Sample the whole process for `seconds` (blocking; run it in a thread)"""
+    if not _session_lock.acquire(blocking=False):
+        raise RuntimeError("A profiling session is already running")
+    try:
+        sampler = StackSampler(interval).start()
+        time.sleep(seconds)
+        return sampler.stop()
+    finally:
+        _session_lock.release()
+
+
+def memory_diff(seconds: float, limit: int = 25, group_by: str = "lineno") -> List[Any]:
+    """Trace allocations for `seconds` and return the largest growth since the start.
+
+    Tracing slows allocation-heavy code while it runs, so it is only on for
+    the window (unless the process was already started with tracemalloc).
+    """
+    if not _session_lock.acquire(blocking=False):
+        raise RuntimeError("A profiling session is already running")
+    already_tracing = tracemalloc.is_tracing()
+    try:
+        if not already_tracing:
+            tracemalloc.start(25 if group_by == "traceback" else 1)
+        baseline = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        snapshot = tracemalloc.take_snapshot()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diff = snapshot.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), group_by)
+        return [stat for stat in diff if stat.size_diff > 0][:limit]
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+        _session_lock.release()
+
+
+def fold_memory(stats) -> str:
+    """Allocation growth as collapsed stacks weighted by bytes"""
+    stacks: Counter = Counter()
+    for stat in stats:
+        stacks[";".join(f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback)] += stat.size_diff
+    return fold(stacks)
@@ -0,0 +1,81 @@
+import hashlib
+import time
+from http.cookies import SimpleCookie
+from typing import Optional
+
+from .dependencies import ReadRouting, read_routing
+from .presence import TimingWheelTTLMap
+
+PIN_COOKIE = "read_primary_until"
+READ_METHODS = ("GET", "HEAD")
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    return next((value for key, value in scope["headers"] if key == name), None)
+
+
+def _session_key(scope) -> Optional[str]:
+    authorization = _header(scope, b"authorization")
+    return hashlib.sha256(authorization).hexdigest() if authorization else None
+
+
+def _cookie_pin(scope) -> float:
+    cookie = _header(scope, b"cookie")
+    if cookie is None:
+        return 0.0
+    try:
+        morsel = SimpleCookie(cookie.decode("latin-1")).get(PIN_COOKIE)
+        return float(morsel.value) if morsel is not None else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+class ReadRoutingMiddleware:
+    """Sends the data-API queries of GET requests to the read replica and
+    keeps read-your-writes for the session that just wrote.
+
+    A request that isn't a GET and reached the primary's data API pins its
+    session (the bearer token) to the primary for `pin_seconds`, which
+    should cover the replica's lag. The pin is kept in this worker's memory
+    and, for the other workers, in a short-lived cookie. Only installed when
+    SUPABASE_READ_REPLICA_URL is set.
+    """
+
+    def __init__(self, app, pin_seconds: float):
+        self.app = app
+        self.pin_seconds = pin_seconds
+        self.pins = TimingWheelTTLMap(pin_seconds)
+
+    def _pinned(self, scope, session: Optional[str]) -> bool:
+        if _cookie_pin(scope) > time.time():
+            return True
+        return session is not None and self.pins.lookup([session])[session] is not None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        session = _session_key(scope)
+        if scope["method"] in READ_METHODS:
+            routing = ReadRouting(replica=not self._pinned(scope, session))
+            token = read_routing.set(routing)
+            try:
+                return await self.app(scope, receive, send)
+            finally:
+                read_routing.reset(token)
+
+        routing = ReadRouting(replica=False)
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400 and routing.used_primary:
+                now = time.time()
+                if session is not None:
+                    self.pins.touch(session, now)
+                cookie = f"{PIN_COOKIE}={now + self.pin_seconds:.3f}; Max-Age={int(self.pin_seconds) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        token = read_routing.set(routing)
+        try:
+            await self.app(scope, receive, send_with_pin)
+        finally:
+            read_routing.reset(token)
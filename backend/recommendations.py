@@ -0,0 +1,292 @@
+import math
+import re
+import threading
+import time
+import zlib
+from datetime import date
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .change_feed import fetch_changed, fetch_deleted, poll_since
+
+PROFILE_COLUMNS = "id, job_title, major, degree, bio, updated_at"
+# Text fields that describe a job or an alumnus, with their relative weights
+JOB_FIELDS = {"title": 3.0, "requirements": 2.0, "description": 1.0}
+PROFILE_FIELDS = {"job_title": 3.0, "major": 2.0, "degree": 1.5, "bio": 1.0}
+N_FEATURES = 2 ** 13
+TOP_N = 20
+BATCH_SIZE = 512
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to we will with you your".split()
+)
+
+Vector = Tuple[np.ndarray, np.ndarray]  # (feature indices, weights)
+
+
+def _is_open(job: Dict[str, Any]) -> bool:
+    return job.get("is_active") is not False and (not job.get("deadline") or job["deadline"] >= date.today().isoformat())
+
+
+class JobRecommender:
+    """Matches alumni profiles to job postings by TF-IDF similarity.
+
+    Jobs and profiles are turned into hashed term vectors (unigrams and
+    bigrams of their weighted text fields) and scored against each other
+    with matrix products, BATCH_SIZE profiles at a time. The best TOP_N jobs
+    of every profile are kept precomputed, so serving recommendations is a
+    lookup. New or changed jobs are scored against all profiles and merged
+    into those lists; changed profiles are rescored against all jobs.
+    Deleted jobs are retired from the jobs tombstone feed. IDF weights are
+    only recomputed on the periodic full rebuild.
+    """
+
+    def __init__(self, top_n: int = TOP_N, max_age: float = 300, full_rebuild_interval: float = 3600):
+        self.top_n = top_n
+        self.max_age = max_age
+        self.full_rebuild_interval = full_rebuild_interval
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._reset(np.ones(N_FEATURES, dtype=np.float32))
+        self.job_watermark: Optional[str] = None
+        self.deleted_job_watermark: Optional[str] = None
+        self.profile_watermark: Optional[str] = None
+        self.refreshed_at: Optional[float] = None
+        self.rebuilt_at: Optional[float] = None
+
+    def _reset(self, idf: np.ndarray) -> None:
+        self.idf = idf
+        self.jobs: List[Dict[str, Any]] = []
+        self.job_index: Dict[str, int] = {}
+        self.job_matrix = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self.profile_ids: List[str] = []
+        self.profile_index: Dict[str, int] = {}
+        self.profile_vectors: List[Vector] = []
+        self.top_jobs = np.full((0, self.top_n), -1, dtype=np.int32)
+        self.top_scores = np.full((0, self.top_n), -np.inf, dtype=np.float32)
+
+    @property
+    def built(self) -> bool:
+        return self.rebuilt_at is not None
+
+    def _fetch(self, table: str, columns: str, since: Optional[str], active_only: bool = False) -> List[Dict[str, Any]]:
+        """Rows changed at or after `since` (all rows when None)"""
+        return fetch_changed(table, columns, since, equals={"is_active": True} if active_only else None)
+
+    def _fetch_deleted_jobs(self, since: Optional[str]) -> List[Dict[str, Any]]:
+        return fetch_deleted("jobs", since)
+
+    def _bucket(self, term: str) -> Tuple[int, float]:
+        # A stable hash, so every worker maps terms to the same features
+        bucket = self._buckets.get(term)
+        if bucket is None:
+            digest = zlib.crc32(term.encode())
+            bucket = self._buckets[term] = (digest % N_FEATURES, 1.0 if digest & 0x80000000 else -1.0)
+        return bucket
+
+    def _terms(self, record: Dict[str, Any], fields: Dict[str, float]) -> Vector:
+        """Raw signed, sublinear term-frequency features of a record"""
+        counts: Dict[str, float] = {}
+        for field, weight in fields.items():
+            words = [w for w in TOKEN_PATTERN.findall(str(record.get(field) or "").lower()) if w not in STOP_WORDS]
+            for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                counts[term] = counts.get(term, 0.0) + weight
+        features: Dict[int, float] = {}
+        for term, count in counts.items():
+            bucket, sign = self._bucket(term)
+            features[bucket] = features.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+        return (
+            np.fromiter(features.keys(), dtype=np.int32, count=len(features)),
+            np.fromiter(features.values(), dtype=np.float32, count=len(features)),
+        )
+
+    def _weigh(self, terms: Vector) -> Vector:
+        """Apply IDF weights and L2-normalize"""
+        indices, values = terms
+        weights = values * self.idf[indices]
+        norm = float(np.sqrt(np.dot(weights, weights)))
+        return indices, weights / norm if norm else weights
+
+    @staticmethod
+    def _dense(vectors: List[Vector]) -> np.ndarray:
+        matrix = np.zeros((len(vectors), N_FEATURES), dtype=np.float32)
+        if vectors:
+            rows = np.repeat(np.arange(len(vectors)), [len(indices) for indices, _ in vectors])
+            matrix[rows, np.concatenate([indices for indices, _ in vectors])] = np.concatenate([w for _, w in vectors])
+        return matrix
+
+    def _score(self, profile_rows: np.ndarray, job_rows: np.ndarray) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (profile rows, scores against job_rows) one batch of profiles at a time"""
+        jobs_t = self.job_matrix[job_rows].T
+        for start in range(0, len(profile_rows), BATCH_SIZE):
+            batch = profile_rows[start:start + BATCH_SIZE]
+            yield batch, self._dense([self.profile_vectors[row] for row in batch]) @ jobs_t
+
+    def _merge_top(self, batch: np.ndarray, scores: np.ndarray, job_rows: np.ndarray) -> None:
+        """Merge candidate job scores into the precomputed top lists of `batch`"""
+        candidates = np.concatenate([self.top_jobs[batch], np.broadcast_to(job_rows, scores.shape)], axis=1)
+        candidate_scores = np.concatenate([self.top_scores[batch], scores], axis=1)
+        best = np.argpartition(-candidate_scores, self.top_n - 1, axis=1)[:, :self.top_n]
+        candidates = np.take_along_axis(candidates, best, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, best, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        self.top_jobs[batch] = np.take_along_axis(candidates, order, axis=1)
+        self.top_scores[batch] = np.take_along_axis(candidate_scores, order, axis=1)
+
+    def _open_job_rows(self) -> np.ndarray:
+        return np.array([row for row, job in enumerate(self.jobs) if _is_open(job)], dtype=np.int64)
+
+    def _upsert_jobs(self, jobs: List[Dict[str, Any]], terms: Optional[List[Vector]] = None) -> None:
+        """Index new or changed jobs and score them against every profile"""
+        terms = terms or [self._terms(job, JOB_FIELDS) for job in jobs]
+        # Closed jobs are only indexed if they already have a row (to retire it): a
+        # new one would never be recommended, yet hold a dense row until the next rebuild
+        kept = [(job, job_terms) for job, job_terms in zip(jobs, terms) if job["id"] in self.job_index or _is_open(job)]
+        if not kept:
+            return
+        jobs, terms = [job for job, _ in kept], [job_terms for _, job_terms in kept]
+        new_ids = {job["id"] for job in jobs} - self.job_index.keys()
+        if new_ids:
+            self.job_matrix = np.vstack([self.job_matrix, np.zeros((len(new_ids), N_FEATURES), dtype=np.float32)])
+        rows = []
+        for job, job_terms in zip(jobs, terms):
+            row = self.job_index.get(job["id"])
+            if row is None:
+                row = self.job_index[job["id"]] = len(self.jobs)
+                self.jobs.append(job)
+            self.jobs[row] = job
+            self.job_matrix[row] = self._dense([self._weigh(job_terms)])[0] if _is_open(job) else 0.0
+            rows.append(row)
+        changed = np.unique(np.array(rows, dtype=np.int64))
+
+        # Drop stale scores of changed jobs, then merge in fresh ones for those still open
+        stale = np.isin(self.top_jobs, changed)
+        self.top_jobs[stale] = -1
+        self.top_scores[stale] = -np.inf
+        job_rows = np.array([row for row in changed if _is_open(self.jobs[row])], dtype=np.int64)
+        if len(job_rows):
+            for batch, scores in self._score(np.arange(len(self.profile_ids)), job_rows):
+                self._merge_top(batch, scores, job_rows)
+
+    def _retire_jobs(self, job_ids: List[str]) -> None:
+        """Stop recommending deleted jobs; their rows are dropped on the next rebuild"""
+        retired = [
+            {**self.jobs[self.job_index[job_id]], "is_active": False}
+            for job_id in job_ids
+            if job_id in self.job_index and _is_open(self.jobs[self.job_index[job_id]])
+        ]
+        if retired:
+            self._upsert_jobs(retired)
+
+    def _upsert_profiles(self, profiles: List[Dict[str, Any]], terms: Optional[List[Vector]] = None) -> None:
+        """Index new or changed profiles and rescore them against every open job"""
+        terms = terms or [self._terms(profile, PROFILE_FIELDS) for profile in profiles]
+        rows = []
+        for profile, profile_terms in zip(profiles, terms):
+            row = self.profile_index.get(profile["id"])
+            if row is None:
+                row = self.profile_index[profile["id"]] = len(self.profile_ids)
+                self.profile_ids.append(profile["id"])
+                self.profile_vectors.append(None)
+            self.profile_vectors[row] = self._weigh(profile_terms)
+            rows.append(row)
+        missing = len(self.profile_ids) - len(self.top_jobs)
+        if missing:
+            self.top_jobs = np.vstack([self.top_jobs, np.full((missing, self.top_n), -1, dtype=np.int32)])
+            self.top_scores = np.vstack([self.top_scores, np.full((missing, self.top_n), -np.inf, dtype=np.float32)])
+        changed = np.unique(np.array(rows, dtype=np.int64))
+        self.top_jobs[changed] = -1
+        self.top_scores[changed] = -np.inf
+        job_rows = self._open_job_rows()
+        if len(job_rows):
+            for batch, scores in self._score(changed, job_rows):
+                self._merge_top(batch, scores, job_rows)
+
+    def rebuild(self) -> None:
+        """Recompute IDF weights, every vector and every top list from scratch"""
+        jobs = self._fetch("jobs", "*", None, active_only=True)
+        profiles = self._fetch("profiles", PROFILE_COLUMNS, None)
+        job_terms = [self._terms(job, JOB_FIELDS) for job in jobs]
+        profile_terms = [self._terms(profile, PROFILE_FIELDS) for profile in profiles]
+        all_indices = [indices for indices, _ in job_terms + profile_terms]
+        df = np.bincount(np.concatenate(all_indices), minlength=N_FEATURES) if all_indices else np.zeros(N_FEATURES)
+        n_docs = len(all_indices)
+        self._reset((np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32))
+        self._upsert_jobs(jobs, job_terms)
+        self._upsert_profiles(profiles, profile_terms)
+        self.job_watermark = max((job["updated_at"] for job in jobs if job.get("updated_at")), default=None)
+        # Jobs deleted after they were read here were deleted after this point
+        self.deleted_job_watermark = self.job_watermark
+        self.profile_watermark = max((p["updated_at"] for p in profiles if p.get("updated_at")), default=None)
+        self.refreshed_at = self.rebuilt_at = time.time()
+
+    def refresh(self, full: bool = False) -> None:
+        with self._lock:
+            due_for_rebuild = self.rebuilt_at is None or time.time() - self.rebuilt_at > self.full_rebuild_interval
+            if full or due_for_rebuild:
+                self.rebuild()
+                return
+            jobs = self._fetch("jobs", "*", poll_since(self.job_watermark))
+            if jobs:
+                self._upsert_jobs(jobs)
+                self.job_watermark = max([self.job_watermark or ""] + [j["updated_at"] for j in jobs if j.get("updated_at")])
+            deleted = self._fetch_deleted_jobs(poll_since(self.deleted_job_watermark))
+            if deleted:
+                self._retire_jobs([row["id"] for row in deleted])
+                self.deleted_job_watermark = max([self.deleted_job_watermark or ""] + [row["deleted_at"] for row in deleted])
+            profiles = self._fetch("profiles", PROFILE_COLUMNS, poll_since(self.profile_watermark))
+            if profiles:
+                self._upsert_profiles(profiles)
+                self.profile_watermark = max([self.profile_watermark or ""] + [p["updated_at"] for p in profiles if p.get("updated_at")])
+            self.refreshed_at = time.time()
+
+    def ensure_fresh(self) -> None:
+        if self.refreshed_at is None or time.time() - self.refreshed_at > self.max_age:
+            self.refresh()
+
+    def add_jobs(self, jobs: List[Dict[str, Any]]) -> None:
+        """Score freshly created jobs into the top lists without waiting for a refresh"""
+        with self._lock:
+            if self.built:
+                self._upsert_jobs(jobs)
+
+    def recommend(self, profile_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        row = self.profile_index.get(profile_id)
+        if row is None:
+            return []
+        results = []
+        for job_row, score in zip(self.top_jobs[row], self.top_scores[row]):
+            if job_row < 0 or score <= 0 or not _is_open(self.jobs[job_row]):
+                continue
+            results.append({**self.jobs[job_row], "match_score": round(float(score), 4)})
+            if len(results) == limit:
+                break
+        return results
+
+    def digest(self, since: str, per_profile: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """Best matches among jobs posted since `since`, for every profile in one pass"""
+        job_rows = np.array(
+            [row for row in self._open_job_rows() if (self.jobs[row].get("created_at") or "") >= since], dtype=np.int64,
+        )
+        if not len(job_rows) or not self.profile_ids:
+            return {}
+        k = min(per_profile, len(job_rows))
+        digests: Dict[str, List[Dict[str, Any]]] = {}
+        for batch, scores in self._score(np.arange(len(self.profile_ids)), job_rows):
+            best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, best, axis=1)
+            order = np.argsort(-best_scores, axis=1)
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            for row, columns, row_scores in zip(batch, best, best_scores):
+                matches = [
+                    {**self.jobs[job_rows[column]], "match_score": round(float(score), 4)}
+                    for column, score in zip(columns, row_scores) if score > 0
+                ]
+                if matches:
+                    digests[self.profile_ids[row]] = matches
+        return digests
+
+
+job_recommender = JobRecommender()
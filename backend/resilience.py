@@ -0,0 +1,277 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Any, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open"""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(f"{dependency} is unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class UpstreamPolicy:
+    """Timeout and breaker settings for one upstream dependency.
+
+    Every value can be overridden with UPSTREAM_<NAME>_<SETTING>, e.g.
+    UPSTREAM_POSTGREST_TIMEOUT=5.
+    """
+
+    def __init__(self, name: str, timeout: float, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 hedge: bool = False):
+        prefix = f"UPSTREAM_{name.upper()}_"
+        self.name = name
+        self.timeout = float(os.environ.get(prefix + "TIMEOUT", timeout))
+        self.failure_threshold = int(os.environ.get(prefix + "FAILURE_THRESHOLD", failure_threshold))
+        self.reset_timeout = float(os.environ.get(prefix + "RESET_TIMEOUT", reset_timeout))
+        # Hedged reads are opt-in per dependency and globally via UPSTREAM_HEDGING=1
+        self.hedge = hedge and os.environ.get("UPSTREAM_HEDGING", "0") == "1"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    fail fast with CircuitOpenError. Once `reset_timeout` has passed a single
+    trial call is let through (half-open); its outcome closes or re-opens
+    the circuit.
+    """
+
+    def __init__(self, policy: UpstreamPolicy):
+        self.policy = policy
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.counters = {"successes": 0, "failures": 0, "rejected": 0, "trips": 0}
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "open":
+                remaining = self.policy.reset_timeout - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    self.counters["rejected"] += 1
+                    raise CircuitOpenError(self.policy.name, remaining)
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self.trial_in_flight:
+                    self.counters["rejected"] += 1
+                    raise CircuitOpenError(self.policy.name, self.policy.reset_timeout)
+                self.trial_in_flight = True
+
+    def is_open(self) -> bool:
+        """Whether calls would currently be rejected without a trial"""
+        with self._lock:
+            return self.state == "open" and time.monotonic() - self.opened_at < self.policy.reset_timeout
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.counters["successes"] += 1
+            self.consecutive_failures = 0
+            self.trial_in_flight = False
+            self.state = "closed"
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.counters["failures"] += 1
+            self.consecutive_failures += 1
+            self.trial_in_flight = False
+            if self.state == "half_open" or (
+                self.state == "closed" and self.consecutive_failures >= self.policy.failure_threshold
+            ):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self.counters["trips"] += 1
+                logger.warning("Circuit for %s opened after %s consecutive failures",
+                               self.policy.name, self.consecutive_failures)
+
+    @contextmanager
+    def guard(self, is_failure: Callable[[Exception], bool] = lambda e: True):
+        """Run the block through the breaker; exceptions count as failures if `is_failure` says so"""
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "timeout": self.policy.timeout,
+                "hedging": self.policy.hedge,
+                **self.counters,
+            }
+
+
+class LatencyWindow:
+    """Recent call latencies of one dependency, for the p95 hedging threshold"""
+
+    def __init__(self, size: int = 500):
+        self.samples = deque(maxlen=size)
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        samples = sorted(self.samples)
+        if len(samples) < 20:
+            return None
+        return samples[min(int(len(samples) * q), len(samples) - 1)]
+
+
+POLICIES = {
+    "postgrest": UpstreamPolicy("postgrest", timeout=10.0, hedge=True),
+    "postgrest_replica": UpstreamPolicy("postgrest_replica", timeout=10.0, hedge=True),
+    "supabase_auth": UpstreamPolicy("supabase_auth", timeout=5.0),
+    "supabase_storage": UpstreamPolicy("supabase_storage", timeout=60.0),
+    "supabase": UpstreamPolicy("supabase", timeout=10.0),
+    "sendgrid": UpstreamPolicy("sendgrid", timeout=10.0),
+    "wati": UpstreamPolicy("wati", timeout=10.0),
+}
+breakers: Dict[str, CircuitBreaker] = {name: CircuitBreaker(policy) for name, policy in POLICIES.items()}
+latencies: Dict[str, LatencyWindow] = {name: LatencyWindow() for name in POLICIES}
+
+SUPABASE_SERVICES = {"rest": "postgrest", "auth": "supabase_auth", "storage": "supabase_storage"}
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+# Never hedge before this, however fast the dependency usually is
+MIN_HEDGE_DELAY = 0.05
+
+
+def is_server_error(error: Exception) -> bool:
+    """Whether an exception from an HTTP client means the upstream failed (not a 4xx)"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None and getattr(error, "response", None) is not None:
+        status_code = getattr(error.response, "status_code", None)
+    return status_code is None or status_code >= 500
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    return breakers[name]
+
+
+def timeout_for(name: str) -> float:
+    return POLICIES[name].timeout
+
+
+def supabase_dependency(url: httpx.URL) -> str:
+    """Map a Supabase URL (/rest/v1/..., /auth/v1/...) to its dependency name"""
+    segments = [segment for segment in urlparse(str(url)).path.split("/") if segment]
+    return SUPABASE_SERVICES.get(segments[0], "supabase") if segments else "supabase"
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """httpx transport for the Supabase clients adding per-service timeouts,
+    circuit breakers and, for idempotent reads, hedged requests.
+
+    A hedged read sends a second identical request once the first has been
+    outstanding longer than the dependency's recent p95 latency, and returns
+    whichever response arrives first.
+
+    PostgREST calls to `replica_host` are tracked as their own dependency,
+    so a failing read replica doesn't open the primary's circuit.
+    """
+
+    def __init__(self, limits: httpx.Limits, hedge_workers: int = 8, replica_host: Optional[str] = None):
+        self.transport = httpx.HTTPTransport(limits=limits)
+        self.replica_host = replica_host
+        # Threads are only started once a request is actually hedged
+        self._hedge_pool = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix="hedge")
+
+    def _send(self, name: str, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = self.transport.handle_request(request)
+        latencies[name].add(time.perf_counter() - start)
+        return response
+
+    def _send_hedged(self, name: str, request: httpx.Request, delay: float) -> httpx.Response:
+        primary = self._hedge_pool.submit(self._send, name, request)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        window = latencies[name]
+        window.hedges += 1
+        hedge = self._hedge_pool.submit(self._send, name, request)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        # Close the slower response when it arrives so its connection is released
+                        loser.add_done_callback(lambda f: f.exception() is None and f.result().close())
+                    if future is hedge:
+                        window.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        name = supabase_dependency(request.url)
+        if name == "postgrest" and self.replica_host is not None and request.url.host == self.replica_host:
+            name = "postgrest_replica"
+        policy = POLICIES[name]
+        breaker = breakers[name]
+        request.extensions["timeout"] = httpx.Timeout(policy.timeout).as_dict()
+
+        breaker.before_call()
+        try:
+            p95 = latencies[name].quantile(0.95) if policy.hedge and request.method in IDEMPOTENT_METHODS else None
+            if p95 is not None:
+                response = self._send_hedged(name, request, max(p95, MIN_HEDGE_DELAY))
+            else:
+                response = self._send(name, request)
+        except Exception:
+            breaker.record_failure()
+            raise
+        # Server errors count against the breaker; client errors are the caller's problem
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def close(self) -> None:
+        self._hedge_pool.shutdown(wait=False)
+        self.transport.close()
+
+
+def metrics() -> Dict[str, Any]:
+    """Breaker state, trip counts and latency percentiles per dependency"""
+    result = {}
+    for name, breaker in breakers.items():
+        window = latencies[name]
+        p50, p95, p99 = (window.quantile(q) for q in (0.5, 0.95, 0.99))
+        result[name] = {
+            **breaker.snapshot(),
+            "latency_ms": {
+                label: round(value * 1000, 2) if value is not None else None
+                for label, value in (("p50", p50), ("p95", p95), ("p99", p99))
+            },
+            "hedges": window.hedges,
+            "hedge_wins": window.hedge_wins,
+        }
+    return result
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any
+
+from ..dependencies import get_current_admin
+from ..resilience import CircuitOpenError
+
+router = APIRouter(
+    prefix="/admin/analytics",
+    tags=["analytics"],
+)
+
+
+def _rollups():
+    # pandas is imported on first use so it doesn't slow down worker startup
+    from ..analytics import alumni_rollups
+    return alumni_rollups
+
+
+@router.get("/alumni")
+async def get_alumni_analytics(
+    limit: int = 20,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Alumni counts per dimension and monthly growth, from the precomputed rollups."""
+    try:
+        rollups = _rollups()
+        await run_in_threadpool(rollups.ensure_fresh)
+        return rollups.summary(limit)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/alumni/crosstab")
+async def get_alumni_crosstab(
+    rows: str,
+    cols: str,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Two-dimensional alumni counts, e.g. rows=degree&cols=graduation_year."""
+    from ..analytics import DIMENSIONS
+    if rows not in DIMENSIONS or cols not in DIMENSIONS or rows == cols:
+        raise HTTPException(status_code=400, detail=f"rows and cols must be two different values of: {', '.join(DIMENSIONS)}")
+    try:
+        rollups = _rollups()
+        await run_in_threadpool(rollups.ensure_fresh)
+        return rollups.crosstab(rows, cols)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/alumni/refresh")
+async def refresh_alumni_analytics(
+    full: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Pull profile changes into the rollups now; full=true rebuilds from scratch."""
+    try:
+        rollups = _rollups()
+        await run_in_threadpool(rollups.refresh, full)
+        return {"message": "Alumni analytics refreshed", "total_profiles": int(len(rollups.snapshot))}
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,99 @@
+import os
+import re
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any
+
+from ..avatars import (
+    DISPLAY_VARIANT, THUMBNAIL_VARIANT, generate_variants, get_variant_cache, variant_key, variant_names,
+)
+from ..dependencies import get_current_user, supabase_admin
+from ..resilience import CircuitOpenError
+from ..storage import TempFileWriter, get_file_storage, stream_upload
+
+router = APIRouter(
+    tags=["avatars"],
+)
+
+MAX_AVATAR_SIZE = 10 * 1024 * 1024
+AVATAR_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+VARIANT_MEDIA_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def _variant_url(digest: str, variant: str) -> str:
+    return f"{os.environ.get('PUBLIC_API_URL', '').rstrip('/')}/api/avatars/{digest}/{variant}"
+
+
+@router.post("/profile/avatar")
+async def upload_avatar(
+    request: Request,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Upload a new avatar as multipart field `file` and store its resized variants."""
+    writer = TempFileWriter()
+    try:
+        await stream_upload(request, writer, max_size=MAX_AVATAR_SIZE, allowed_types=AVATAR_TYPES)
+        await writer.close()
+        digest = writer.content_hash
+        storage = get_file_storage()
+
+        # Variants are keyed by the original's hash, so a re-upload of the same image is free.
+        # The thumbnail is written last, which makes it a marker for a complete set.
+        if not await run_in_threadpool(storage.exists, variant_key(digest, THUMBNAIL_VARIANT)):
+            try:
+                variants = await generate_variants(str(writer.path))
+            except Exception:
+                raise HTTPException(status_code=400, detail="Could not read the uploaded image")
+            thumbnail = variants.pop(THUMBNAIL_VARIANT)
+            for name, data in variants.items():
+                await run_in_threadpool(storage.put_bytes, variant_key(digest, name), data)
+            await run_in_threadpool(storage.put_bytes, variant_key(digest, THUMBNAIL_VARIANT), thumbnail)
+
+        urls = {name: _variant_url(digest, name) for name in variant_names()}
+        avatar_data = {
+            "avatar_url": urls[DISPLAY_VARIANT],
+            "avatar_thumb_url": urls[THUMBNAIL_VARIANT],
+            "avatar_variants": urls,
+        }
+        response = supabase_admin.table("profiles").update(avatar_data).eq("id", current_user["id"]).execute()
+        if not response.data:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return avatar_data
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        writer.discard()
+
+
+@router.get("/avatars/{digest}/{variant}")
+async def get_avatar_variant(digest: str, variant: str, request: Request):
+    """Serve an avatar variant from the local disk cache, falling back to storage."""
+    if not DIGEST_PATTERN.fullmatch(digest) or variant not in variant_names():
+        raise HTTPException(status_code=404, detail="Avatar not found")
+
+    headers = {
+        # Variant URLs are content-addressed and never change
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{digest}-{variant}"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    key = variant_key(digest, variant)
+    cache = get_variant_cache()
+    path = cache.get(key)
+    if path is not None:
+        data = await run_in_threadpool(path.read_bytes)
+    else:
+        data = await run_in_threadpool(get_file_storage().get_bytes, key)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Avatar not found")
+        await run_in_threadpool(cache.put, key, data)
+
+    return Response(content=data, media_type=VARIANT_MEDIA_TYPES[variant.rsplit(".", 1)[1]], headers=headers)
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any
+from urllib.parse import urlsplit
+
+from ..dependencies import get_current_user
+
+router = APIRouter(
+    tags=["batch"],
+)
+
+MAX_BATCH_SIZE = 20
+
+
+class BatchSubRequest(BaseModel):
+    method: str = "GET"
+    path: str
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1)
+
+
+async def _dispatch(request: Request, sub: BatchSubRequest, current_user: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one sub-request through the ASGI app in-process and capture its response."""
+    url = urlsplit(sub.path)
+    scope = dict(request.scope)
+    scope.update({
+        "method": "GET",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "batch_user": current_user,
+    })
+    # Drop body-related headers from the outer POST; sub-requests are reads.
+    scope["headers"] = [
+        (name, value) for name, value in request.scope["headers"]
+        if name not in (b"content-length", b"content-type")
+    ]
+    scope.pop("route", None)
+    scope.pop("endpoint", None)
+    scope.pop("path_params", None)
+
+    status_code = 500
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await request.app(scope, receive, send)
+
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError:
+        payload = body.decode(errors="replace")
+    return {"path": sub.path, "status": status_code, "body": payload}
+
+
+@router.post("/batch")
+async def batch_requests(
+    batch: BatchRequest,
+    request: Request,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Execute several read requests in one call, authenticating only once."""
+    if len(batch.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {MAX_BATCH_SIZE} requests")
+
+    for sub in batch.requests:
+        if sub.method.upper() != "GET":
+            raise HTTPException(status_code=400, detail="Only GET requests can be batched")
+        path = urlsplit(sub.path).path
+        if not path.startswith("/api/") or path.rstrip("/") == "/api/batch":
+            raise HTTPException(status_code=400, detail=f"Invalid batch path: {sub.path}")
+
+    # The route handlers are async but make blocking Supabase calls, so on one
+    # event loop they would run one after another. Each sub-request gets its
+    # own loop on a threadpool thread instead, which lets them overlap.
+    results = await asyncio.gather(
+        *(run_in_threadpool(asyncio.run, _dispatch(request, sub, current_user)) for sub in batch.requests)
+    )
+    return {"responses": results}
@@ -0,0 +1,107 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any
+
+from ..broadcasts import UNFINISHED_STATUSES, count_recipients, create_broadcast, progress, run_broadcast
+from ..dependencies import BroadcastCreate, get_current_admin, supabase_admin
+from ..directory import DIRECTORY_FILTERS
+from ..resilience import CircuitOpenError
+
+router = APIRouter(
+    prefix="/admin/broadcasts",
+    tags=["broadcasts"],
+)
+
+
+@router.post("", status_code=202)
+async def create_message_broadcast(
+    broadcast: BroadcastCreate,
+    background_tasks: BackgroundTasks,
+    dry_run: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Message every alumnus matching a profile filter; dry_run=true only counts the recipients."""
+    filters = {name: getattr(broadcast, name) for name in DIRECTORY_FILTERS if getattr(broadcast, name) is not None}
+    if not filters:
+        raise HTTPException(status_code=400, detail=f"Give at least one filter: {', '.join(DIRECTORY_FILTERS)}")
+    try:
+        if dry_run:
+            total = await run_in_threadpool(count_recipients, current_user["id"], filters)
+            return {"filters": filters, "total_recipients": total}
+        created = await run_in_threadpool(
+            create_broadcast, current_user["id"], broadcast.subject, broadcast.content, filters, broadcast.notify,
+        )
+        # Sent after the response; GET /admin/broadcasts/{id} reports progress
+        background_tasks.add_task(run_broadcast, created["id"])
+        return progress(created)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("")
+async def list_message_broadcasts(
+    limit: int = 20,
+    offset: int = 0,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Recent broadcasts, newest first, with their progress."""
+    try:
+        limit = max(1, min(limit, 100))
+        response = (
+            supabase_admin.table("message_broadcasts")
+            .select("*")
+            .order("created_at", desc=True)
+            .range(max(offset, 0), max(offset, 0) + limit - 1)
+            .execute()
+        )
+        return [progress(row) for row in response.data or []]
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{broadcast_id}")
+async def get_message_broadcast(
+    broadcast_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """A broadcast's status and progress."""
+    try:
+        response = supabase_admin.table("message_broadcasts").select("*").eq("id", broadcast_id).execute()
+        if not response.data:
+            raise HTTPException(status_code=404, detail="Broadcast not found")
+        return progress(response.data[0])
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{broadcast_id}/cancel")
+async def cancel_message_broadcast(
+    broadcast_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Stop a broadcast after its current chunk; messages already written stay."""
+    try:
+        response = (
+            supabase_admin.table("message_broadcasts")
+            .update({"status": "canceled"})
+            .eq("id", broadcast_id)
+            .in_("status", list(UNFINISHED_STATUSES))
+            .execute()
+        )
+        if not response.data:
+            raise HTTPException(status_code=409, detail="Broadcast not found or already finished")
+        return progress(response.data[0])
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any
+
+from ..dependencies import DuplicateReview, get_current_admin, supabase_admin
+from ..resilience import CircuitOpenError
+
+router = APIRouter(
+    prefix="/admin/duplicates",
+    tags=["duplicates"],
+)
+
+REVIEW_STATUSES = ("pending", "dismissed", "merged")
+DUPLICATE_PROFILE_FIELDS = "id, full_name, email, graduation_year, company, avatar_url, created_at"
+
+
+@router.get("")
+async def list_duplicate_candidates(
+    status: str = "pending",
+    min_score: float = 0.0,
+    limit: int = 50,
+    offset: int = 0,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Likely duplicate profile pairs, highest similarity first, with both profiles attached."""
+    if status not in REVIEW_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(REVIEW_STATUSES)}")
+    try:
+        limit = max(1, min(limit, 100))
+        response = (
+            supabase_admin.table("profile_duplicate_candidates")
+            .select("*", count="exact")
+            .eq("status", status)
+            .gte("score", min_score)
+            .order("score", desc=True)
+            .range(offset, offset + limit - 1)
+            .execute()
+        )
+        candidates = response.data or []
+        profile_ids = list({pid for c in candidates for pid in (c["profile_id"], c["duplicate_id"])})
+        profiles = {}
+        if profile_ids:
+            rows = supabase_admin.table("profiles").select(DUPLICATE_PROFILE_FIELDS).in_("id", profile_ids).execute()
+            profiles = {row["id"]: row for row in rows.data or []}
+        for candidate in candidates:
+            candidate["profile"] = profiles.get(candidate["profile_id"])
+            candidate["duplicate"] = profiles.get(candidate["duplicate_id"])
+        return {"candidates": candidates, "total": response.count, "limit": limit, "offset": offset}
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/scan")
+async def scan_for_duplicates(
+    full: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Check new or changed profiles for duplicates; full=true rescans every profile."""
+    try:
+        # numpy is imported on first use so it doesn't slow down worker startup
+        from ..dedupe import duplicate_detector
+        found = await run_in_threadpool(duplicate_detector.scan_and_store, full)
+        return {"message": "Duplicate scan finished", "candidates_found": found}
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/{candidate_id}")
+async def review_duplicate_candidate(
+    candidate_id: str,
+    review: DuplicateReview,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Record an admin's decision on a candidate pair."""
+    if review.status not in REVIEW_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(REVIEW_STATUSES)}")
+    try:
+        response = supabase_admin.table("profile_duplicate_candidates").update({
+            "status": review.status,
+            "reviewed_by": current_user["id"],
+            "reviewed_at": datetime.now(timezone.utc).isoformat(),
+        }).eq("id", candidate_id).execute()
+        if not response.data:
+            raise HTTPException(status_code=404, detail="Duplicate candidate not found")
+        return response.data[0]
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+from typing import Dict, Any
+
+from ..dependencies import get_current_user, supabase_admin, EventFeedbackCreate
+from ..resilience import CircuitOpenError
+
+router = APIRouter(
+    prefix="/events",
+    tags=["event feedback"],
+)
+
+STATS_COLUMNS = (
+    "event_id, feedback_count, average_rating, recommend_ratio, recommend_yes, recommend_no, "
+    "rating_1, rating_2, rating_3, rating_4, rating_5, updated_at"
+)
+
+
+def _format_stats(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "event_id": row["event_id"],
+        "feedback_count": row["feedback_count"],
+        "average_rating": float(row["average_rating"]) if row["average_rating"] is not None else None,
+        "histogram": {str(rating): row[f"rating_{rating}"] for rating in range(1, 6)},
+        "would_recommend": {
+            "yes": row["recommend_yes"],
+            "no": row["recommend_no"],
+            "ratio": float(row["recommend_ratio"]) if row["recommend_ratio"] is not None else None,
+        },
+        "updated_at": row["updated_at"],
+    }
+
+
+@router.get("/feedback/leaderboard")
+async def get_feedback_leaderboard(
+    limit: int = 10,
+    min_responses: int = 5,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Top-rated events across the portal, read from the maintained feedback aggregates."""
+    try:
+        limit = max(1, min(limit, 100))
+        response = (
+            supabase_admin.table("event_feedback_stats")
+            .select(f"{STATS_COLUMNS}, events(title, event_date)")
+            .gte("feedback_count", max(min_responses, 1))
+            .order("average_rating", desc=True)
+            .order("feedback_count", desc=True)
+            .limit(limit)
+            .execute()
+        )
+        return [
+            {**_format_stats(row), "event": row.get("events")}
+            for row in response.data or []
+        ]
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{event_id}/feedback")
+async def submit_event_feedback(
+    event_id: str,
+    feedback: EventFeedbackCreate,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Submit or update current user's feedback for an event."""
+    try:
+        feedback_data = feedback.model_dump()
+        feedback_data.update({
+            "event_id": event_id,
+            "user_id": current_user["id"],
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        })
+        response = supabase_admin.table("event_feedback").upsert(feedback_data, on_conflict="event_id,user_id").execute()
+        if not response.data:
+            raise HTTPException(status_code=400, detail="Failed to submit feedback")
+        return response.data[0]
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{event_id}/feedback/summary")
+async def get_event_feedback_summary(
+    event_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Feedback count, mean rating, rating histogram and would-recommend ratio for an event."""
+    try:
+        response = supabase_admin.table("event_feedback_stats").select(STATS_COLUMNS).eq("event_id", event_id).execute()
+        if not response.data:
+            return _format_stats({
+                "event_id": event_id, "feedback_count": 0, "average_rating": None, "recommend_ratio": None,
+                "recommend_yes": 0, "recommend_no": 0, "updated_at": None,
+                **{f"rating_{rating}": 0 for rating in range(1, 6)},
+            })
+        return _format_stats(response.data[0])
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,7 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List, Dict, Any
 
 # To be replaced with imports from a dependencies.py file
-from ..dependencies import get_current_user, supabase_admin, Group, GroupCreate, GroupPost, GroupPostCreate
+from ..dependencies import (
+    get_current_user, supabase_admin, Group, GroupCreate, GroupNotificationSettings, GroupPage, GroupPost,
+    GroupPostCreate,
+)
+from ..group_notifications import NOTIFY_CHANNELS, NOTIFY_MODES
+from ..resilience import CircuitOpenError
 
 router = APIRouter(
     prefix="/groups",
@@ -10,6 +15,13 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# Directory sorts: (column, descending, nulls first); each has a partial index on public groups
+GROUP_SORTS = {
+    "members": ("member_count", True, None),
+    "activity": ("last_post_at", True, False),
+    "name": ("name", False, None),
+}
+
 
 @router.post("/", response_model=Group)
 async def create_group(
@@ -18,35 +30,50 @@ async def create_group(
 ):
     """Create a new group."""
     try:
-        user_id = current_user['id']
-        db_group = group_data.model_dump()
-        db_group['created_by'] = user_id
-
-        response = supabase_admin.table("groups").insert(db_group).execute()
+        # The creator becomes the first member, with the 'admin' role, in the same transaction
+        response = supabase_admin.rpc("create_group_with_owner", {
+            "p_name": group_data.name,
+            "p_description": group_data.description,
+            "p_is_private": group_data.is_private,
+            "p_created_by": current_user['id'],
+        }).execute()
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to create group")
-
-        new_group = response.data[0]
-        
-        # Automatically add the creator as the first member with the 'admin' role
-        membership_data = {
-            'group_id': new_group['id'],
-            'user_id': user_id,
-            'role': 'admin'
-        }
-        supabase_admin.table('group_members').insert(membership_data).execute()
-
-        return new_group
+        return response.data[0]
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/", response_model=List[Group])
-async def list_groups():
-    """List all public groups."""
+@router.get("/", response_model=GroupPage)
+async def list_groups(
+    sort: str = "members",
+    limit: int = 20,
+    offset: int = 0,
+):
+    """List public groups, sorted by members, recent activity or name."""
+    if sort not in GROUP_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(GROUP_SORTS)}")
+    limit = max(1, min(limit, 100))
+    offset = max(offset, 0)
+    column, desc, nullsfirst = GROUP_SORTS[sort]
     try:
-        response = supabase_admin.table("groups").select("*").eq('is_private', False).execute()
-        return response.data
+        response = (
+            supabase_admin.table("groups")
+            .select("*")
+            .eq('is_private', False)
+            .order(column, desc=desc, nullsfirst=nullsfirst)
+            .order("id")
+            .range(offset, offset + limit - 1)
+            .execute()
+        )
+        rows = response.data or []
+        return {"items": rows, "sort": sort, "limit": limit, "offset": offset, "has_more": len(rows) == limit}
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -64,6 +91,8 @@ async def get_group_details(
         if not response.data:
             raise HTTPException(status_code=404, detail="Group not found")
         return response.data
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -77,26 +106,59 @@ async def join_group(
     try:
         user_id = current_user['id']
         # First, check if group exists and is not private (or if private, if invites are supported - not implemented)
-        group_response = supabase_admin.table('groups').select('id, is_private').eq('id', group_id).single().execute()
+        group_response = supabase_admin.table('groups').select('id, is_private').eq('id', group_id).execute()
         if not group_response.data:
             raise HTTPException(status_code=404, detail="Group not found")
-        if group_response.data['is_private']:
+        if group_response.data[0]['is_private']:
             raise HTTPException(status_code=403, detail="Cannot join a private group without an invitation.")
 
-        # Check if user is already a member
-        member_response = supabase_admin.table('group_members').select('id').eq('group_id', group_id).eq('user_id', user_id).execute()
-        if member_response.data:
-            return {"message": "User is already a member of this group."}
-
         membership_data = {
             'group_id': group_id,
             'user_id': user_id,
             'role': 'member'
         }
-        response = supabase_admin.table('group_members').insert(membership_data).execute()
+        # Existing memberships are left untouched, so the member_count trigger only sees real joins
+        response = supabase_admin.table('group_members').upsert(
+            membership_data, on_conflict='group_id,user_id', ignore_duplicates=True
+        ).execute()
         if not response.data:
-            raise HTTPException(status_code=400, detail="Failed to join group")
+            return {"message": "User is already a member of this group."}
         return {"message": "Successfully joined group"}
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/{group_id}/notifications", response_model=GroupNotificationSettings)
+async def update_group_notifications(
+    group_id: str,
+    settings: GroupNotificationSettings,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Choose how you hear about new posts in a group: immediately, as an hourly or daily digest, or not at all."""
+    if settings.notify_mode not in NOTIFY_MODES:
+        raise HTTPException(status_code=400, detail=f"notify_mode must be one of: {', '.join(NOTIFY_MODES)}")
+    if settings.notify_channel not in NOTIFY_CHANNELS:
+        raise HTTPException(status_code=400, detail=f"notify_channel must be one of: {', '.join(NOTIFY_CHANNELS)}")
+    try:
+        # Applies to posts fanned out from now on; deliveries already filed keep their window
+        response = (
+            supabase_admin.table('group_members')
+            .update(settings.model_dump())
+            .eq('group_id', group_id)
+            .eq('user_id', current_user['id'])
+            .execute()
+        )
+        if not response.data:
+            raise HTTPException(status_code=403, detail="User is not a member of this group")
+        return response.data[0]
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -111,17 +173,23 @@ async def create_post_in_group(
     try:
         user_id = current_user['id']
         # Check if user is a member of the group
-        member_response = supabase_admin.table('group_members').select('id').eq('group_id', group_id).eq('user_id', user_id).execute()
+        member_response = supabase_admin.table('group_members').select('user_id').eq('group_id', group_id).eq('user_id', user_id).execute()
         if not member_response.data:
             raise HTTPException(status_code=403, detail="User is not a member of this group")
 
         db_post = post_data.model_dump()
         db_post['group_id'] = group_id
         db_post['user_id'] = user_id
+        # post_count and last_post_at on the group are bumped by trigger in the same transaction,
+        # which also queues the post for member notifications (backend/group_notifications.py)
         response = supabase_admin.table("group_posts").insert(db_post).execute()
         if not response.data:
             raise HTTPException(status_code=400, detail="Failed to create post")
         return response.data[0]
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -134,7 +202,7 @@ async def list_posts_in_group(
     """List all posts in a group."""
     try:
         # Check if user is a member of the group to view posts
-        member_response = supabase_admin.table('group_members').select('id').eq('group_id', group_id).eq('user_id', current_user['id']).execute()
+        member_response = supabase_admin.table('group_members').select('user_id').eq('group_id', group_id).eq('user_id', current_user['id']).execute()
         if not member_response.data:
             # Check if the group is public
             group_response = supabase_admin.table('groups').select('is_private').eq('id', group_id).single().execute()
@@ -143,5 +211,7 @@ async def list_posts_in_group(
 
         response = supabase_admin.table("group_posts").select("*").eq('group_id', group_id).order('created_at', desc=True).execute()
         return response.data
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
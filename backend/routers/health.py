@@ -0,0 +1,50 @@
+import time
+from fastapi import APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ..directory import directory
+from ..probes import prober
+from ..resilience import metrics
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+
+@router.get("")
+async def health_check():
+    """Health check endpoint, served from the cached upstream probes"""
+    postgrest = prober.results.get("postgrest")
+    if postgrest is not None and postgrest.status == "up":
+        return {"status": "healthy", "database": "connected"}
+    return {"status": "unhealthy", "error": postgrest.error if postgrest else "Upstream probes have not run yet"}
+
+
+@router.get("/live")
+async def liveness():
+    """Liveness probe: the event loop is serving requests. Performs no I/O."""
+    return {"status": "alive", "uptime_seconds": round(time.monotonic() - prober.started_at, 3)}
+
+
+@router.get("/ready")
+async def readiness():
+    """Readiness probe: required upstreams were reachable in a recent background probe"""
+    snapshot = prober.snapshot()
+    return JSONResponse(
+        status_code=200 if snapshot["ready"] else 503,
+        content=jsonable_encoder({"status": "ready" if snapshot["ready"] else "not_ready", **snapshot}),
+    )
+
+
+@router.get("/circuits")
+async def circuit_metrics():
+    """Per-upstream circuit breaker state, trip counts, latency percentiles and hedging stats"""
+    return metrics()
+
+
+@router.get("/directory")
+async def directory_replica():
+    """Size, watermark and staleness of this worker's in-memory profile directory"""
+    return directory.stats()
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from pydantic import BaseModel
-from typing import Dict
-from ..external_integrations.whatsapp import send_whatsapp_template_message
-from ..external_integrations.email import send_email
+from typing import Any, Dict, Optional
+from ..dependencies import get_current_admin, supabase_admin
+from ..outbox import enqueue_notification
+from ..resilience import CircuitOpenError
 
 router = APIRouter()
 
+OUTBOX_STATUS_FIELDS = "id, channel, status, attempts, next_attempt_at, last_error, sent_at, created_at"
+
 class WhatsAppTemplateMessage(BaseModel):
     to_number: str
     template_name: str
@@ -16,16 +19,33 @@ class EmailMessage(BaseModel):
     subject: str
     html_content: str
 
-@router.post("/notifications/whatsapp")
-def post_whatsapp_message(payload: WhatsAppTemplateMessage):
-    ticket_id = send_whatsapp_template_message(payload.to_number, payload.template_name, payload.parameters)
-    if ticket_id:
-        return {"status": "success", "ticket_id": ticket_id}
-    raise HTTPException(status_code=500, detail="Failed to send WhatsApp message.")
-
-@router.post("/notifications/email")
-def post_email_message(payload: EmailMessage):
-    status_code = send_email(payload.to_email, payload.subject, payload.html_content)
-    if status_code == 202: # SendGrid returns 202 Accepted
-        return {"status": "success"}
-    raise HTTPException(status_code=500, detail="Failed to send email.")
+def _queued(row):
+    return {"status": "queued", "id": row["id"], "delivery_status": row["status"]}
+
+# Both endpoints only write to the outbox; backend/outbox_worker.py delivers.
+# Send an Idempotency-Key header to make retried requests safe.
+@router.post("/notifications/whatsapp", status_code=202)
+def post_whatsapp_message(payload: WhatsAppTemplateMessage, idempotency_key: Optional[str] = Header(None)):
+    try:
+        return _queued(enqueue_notification("whatsapp", payload.model_dump(), idempotency_key))
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue WhatsApp message: {e}")
+
+@router.post("/notifications/email", status_code=202)
+def post_email_message(payload: EmailMessage, idempotency_key: Optional[str] = Header(None)):
+    try:
+        return _queued(enqueue_notification("email", payload.model_dump(), idempotency_key))
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue email: {e}")
+
+# Admins only: the row identifies the recipient
+@router.get("/notifications/outbox/{message_id}")
+def get_outbox_message(message_id: str, current_user: Dict[str, Any] = Depends(get_current_admin)):
+    response = supabase_admin.table("notification_outbox").select(OUTBOX_STATUS_FIELDS).eq("id", message_id).execute()
+    if response.data:
+        return response.data[0]
+    raise HTTPException(status_code=404, detail="Message not found")
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
+
+from ..dependencies import get_current_user
+from ..presence import get_presence_store
+from ..resilience import CircuitOpenError
+
+router = APIRouter(
+    prefix="/presence",
+    tags=["presence"],
+)
+
+MAX_LOOKUP_IDS = 200
+
+
+async def _call(store, method, *args):
+    # The Redis store does network I/O; the in-memory one is cheap enough to run inline
+    if store.blocking:
+        return await run_in_threadpool(method, *args)
+    return method(*args)
+
+
+@router.post("/heartbeat")
+async def heartbeat(current_user: Dict[str, Any] = Depends(get_current_user)):
+    """Mark the current user online for the presence TTL; clients ping at the returned interval"""
+    store = get_presence_store()
+    try:
+        await _call(store, store.touch, current_user["id"])
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"ttl_seconds": store.ttl, "interval_seconds": store.ttl / 2}
+
+
+@router.get("")
+async def get_presence(
+    ids: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Online status and last heartbeat for a comma-separated list of user ids"""
+    user_ids = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if not user_ids:
+        raise HTTPException(status_code=400, detail="ids must list at least one user id")
+    if len(user_ids) > MAX_LOOKUP_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LOOKUP_IDS} ids per lookup")
+    store = get_presence_store()
+    try:
+        seen: Dict[str, Optional[float]] = await _call(store, store.lookup, user_ids)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "presence": {
+            user_id: {"online": last_seen is not None, "last_seen": last_seen}
+            for user_id, last_seen in seen.items()
+        }
+    }
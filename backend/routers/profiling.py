@@ -0,0 +1,101 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any
+
+from ..dependencies import get_current_admin, get_settings
+from ..profiling import (
+    SIGNATURE_HEADER, fold, fold_memory, memory_diff, profile_process, request_profiles, sign,
+)
+
+router = APIRouter(
+    prefix="/admin/profiling",
+    tags=["profiling"],
+)
+
+MAX_SESSION_SECONDS = 60
+FOLDED_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+
+@router.post("/sign")
+async def sign_profile_request(
+    path: str,
+    method: str = "GET",
+    ttl: int = 300,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Issue a signature header that profiles requests to one method and path, e.g. path=/api/profiles."""
+    secret = get_settings().profiling_secret
+    if not secret:
+        raise HTTPException(status_code=404, detail="Request profiling is not enabled (PROFILING_SECRET is unset)")
+    ttl = max(1, min(ttl, 3600))
+    return {"header": SIGNATURE_HEADER, "value": sign(secret, method, path, ttl), "expires_in": ttl}
+
+
+@router.get("/requests")
+async def list_request_profiles(
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Recently captured per-request profiles, newest first."""
+    return request_profiles.summaries()
+
+
+@router.get("/requests/{profile_id}", response_class=PlainTextResponse)
+async def get_request_profile(
+    profile_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """One request's profile as collapsed stacks (flamegraph.pl / speedscope input)."""
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(fold(profile["stacks"]), media_type=FOLDED_MEDIA_TYPE)
+
+
+@router.post("/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = 10,
+    interval_ms: float = 5,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Sample every thread of this worker for a few seconds and return collapsed stacks."""
+    if not 0 < seconds <= MAX_SESSION_SECONDS or not 1 <= interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_SESSION_SECONDS}] and interval_ms in [1, 1000]")
+    try:
+        stacks = await run_in_threadpool(profile_process, seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(fold(stacks), media_type=FOLDED_MEDIA_TYPE)
+
+
+@router.post("/memory")
+async def profile_memory(
+    seconds: float = 10,
+    limit: int = 25,
+    group_by: str = "lineno",
+    format: str = "json",
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Trace allocations for a few seconds and return the top growth by line or traceback.
+
+    format=folded returns collapsed stacks weighted by bytes (use group_by=traceback).
+    """
+    if not 0 < seconds <= MAX_SESSION_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_SESSION_SECONDS}]")
+    if group_by not in ("lineno", "traceback") or format not in ("json", "folded"):
+        raise HTTPException(status_code=400, detail="group_by must be lineno or traceback, format json or folded")
+    try:
+        stats = await run_in_threadpool(memory_diff, seconds, max(1, min(limit, 200)), group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "folded":
+        return PlainTextResponse(fold_memory(stats), media_type=FOLDED_MEDIA_TYPE)
+    return [
+        {
+            "location": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            "size_diff_bytes": stat.size_diff,
+            "size_bytes": stat.size,
+            "count_diff": stat.count_diff,
+        }
+        for stat in stats
+    ]
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any
+
+from ..dependencies import get_current_admin, get_current_user
+from ..resilience import CircuitOpenError
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+)
+
+
+def _recommender():
+    # numpy is imported on first use so it doesn't slow down worker startup
+    from ..recommendations import job_recommender
+    return job_recommender
+
+
+def index_new_job(job: Dict[str, Any]) -> None:
+    """Background task for create_job: merge the posting into precomputed recommendations"""
+    _recommender().add_jobs([job])
+
+
+@router.get("/recommended", response_model=List[Dict[str, Any]])
+async def get_recommended_jobs(
+    limit: int = 10,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Open jobs best matching the current user's profile, best first."""
+    try:
+        recommender = _recommender()
+        await run_in_threadpool(recommender.ensure_fresh)
+        return recommender.recommend(current_user["id"], max(1, min(limit, recommender.top_n)))
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/recommended/refresh")
+async def refresh_job_recommendations(
+    full: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Pull job and profile changes into the recommender now; full=true rebuilds from scratch."""
+    try:
+        recommender = _recommender()
+        await run_in_threadpool(recommender.refresh, full)
+        return {
+            "message": "Job recommendations refreshed",
+            "jobs": len(recommender.jobs),
+            "profiles": len(recommender.profile_ids),
+        }
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,116 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Dict, Any
+
+from ..dependencies import get_current_user, supabase_admin
+from ..resilience import CircuitOpenError
+from ..storage import get_file_storage, stream_upload
+
+router = APIRouter(
+    prefix="/resumes",
+    tags=["resumes"],
+)
+
+MAX_RESUME_SIZE = 10 * 1024 * 1024
+RESUME_TYPES = {
+    "application/pdf": "pdf",
+    "application/msword": "doc",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+}
+
+
+def _set_primary(user_id: str, resume_id: str) -> bool:
+    response = supabase_admin.rpc("set_primary_resume", {"p_user_id": user_id, "p_resume_id": resume_id}).execute()
+    return bool(response.data)
+
+
+@router.post("", status_code=201)
+async def upload_resume(
+    request: Request,
+    is_primary: bool = False,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Upload a resume as multipart field `file`, streamed straight to storage.
+
+    Identical files are stored once (keyed by SHA-256) and re-uploading a file
+    the user already has returns the existing resume instead of a duplicate.
+    """
+    storage = get_file_storage()
+    writer = storage.open_writer()
+    upload = await stream_upload(
+        request, writer, max_size=MAX_RESUME_SIZE, allowed_types=RESUME_TYPES.keys(),
+    )
+    try:
+        key = f"resumes/{writer.content_hash}.{RESUME_TYPES[upload['content_type']]}"
+        await writer.finalize(key)
+
+        user_id = current_user["id"]
+        existing = supabase_admin.table("user_resumes").select("*").eq("user_id", user_id).eq("content_hash", writer.content_hash).limit(1).execute()
+        if existing.data:
+            resume = existing.data[0]
+        else:
+            has_resumes = supabase_admin.table("user_resumes").select("id").eq("user_id", user_id).limit(1).execute()
+            response = supabase_admin.table("user_resumes").insert({
+                "user_id": user_id,
+                "file_url": storage.url_for(key),
+                "filename": os.path.basename(upload["filename"]) or key,
+                "file_type": upload["content_type"],
+                "file_size": writer.size,
+                "content_hash": writer.content_hash,
+                "is_primary": False,
+            }).execute()
+            if not response.data:
+                raise HTTPException(status_code=400, detail="Failed to save resume")
+            resume = response.data[0]
+            # A user's first resume becomes their primary one
+            is_primary = is_primary or not has_resumes.data
+
+        if is_primary and not resume.get("is_primary"):
+            _set_primary(user_id, resume["id"])
+            resume["is_primary"] = True
+        return resume
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("", response_model=List[Dict[str, Any]])
+async def list_resumes(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """List current user's resumes, primary first."""
+    try:
+        response = (
+            supabase_admin.table("user_resumes")
+            .select("id, file_url, filename, file_type, file_size, is_primary, uploaded_at")
+            .eq("user_id", current_user["id"])
+            .order("is_primary", desc=True)
+            .order("uploaded_at", desc=True)
+            .execute()
+        )
+        return response.data
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/{resume_id}/primary")
+async def set_primary_resume(
+    resume_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Make a resume the current user's primary resume."""
+    try:
+        if not _set_primary(current_user["id"], resume_id):
+            raise HTTPException(status_code=404, detail="Resume not found")
+        return {"message": "Primary resume updated"}
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
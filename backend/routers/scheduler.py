@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, Any
+
+from ..dependencies import get_current_admin
+from ..scheduler import scheduler
+
+router = APIRouter(
+    prefix="/admin/scheduler",
+    tags=["scheduler"],
+)
+
+
+@router.get("")
+async def scheduler_status(current_user: Dict[str, Any] = Depends(get_current_admin)):
+    """This worker's leadership, the registered jobs and their recent runs"""
+    return scheduler.snapshot()
+
+
+@router.post("/jobs/{name}/run")
+async def run_job_now(
+    name: str,
+    current_user: Dict[str, Any] = Depends(get_current_admin)
+):
+    """Start a job on this worker now, regardless of its schedule or the leader lease"""
+    if name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not scheduler.run_now(name):
+        raise HTTPException(status_code=409, detail="Job is already running")
+    return {"message": f"Job {name} started"}
@@ -0,0 +1,123 @@
+import html
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from .broadcasts import resume_stalled_broadcasts
+from .dependencies import supabase_admin
+from .directory import directory
+from .group_notifications import send_group_post_notifications
+from .outbox import enqueue_notifications
+from .scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LEAD = timedelta(hours=24)
+# Runs hourly; the window is twice that so a late or skipped run misses nothing,
+# and the outbox idempotency keys stop the overlap from sending twice
+REMINDER_WINDOW = timedelta(hours=2)
+PROFILE_CHUNK_SIZE = 200
+PAGE_SIZE = 1000
+
+
+def _reminder_profiles(attendee_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    if directory.ready:
+        return directory.get_many(attendee_ids)
+    profiles = {}
+    for start in range(0, len(attendee_ids), PROFILE_CHUNK_SIZE):
+        chunk = attendee_ids[start:start + PROFILE_CHUNK_SIZE]
+        response = supabase_admin.table("profiles").select("*").in_("id", chunk).execute()
+        profiles.update({row["id"]: row for row in response.data or []})
+    return profiles
+
+
+def send_event_reminders() -> Dict[str, int]:
+    """Queue a reminder to everyone registered for an event starting in about a day"""
+    now = datetime.now(timezone.utc)
+    window_end = now + REMINDER_LEAD
+    events = (
+        supabase_admin.table("events").select("id, title, event_date, location")
+        .gte("event_date", (window_end - REMINDER_WINDOW).isoformat())
+        .lt("event_date", window_end.isoformat())
+        .execute().data or []
+    )
+    if not events:
+        return {"events": 0, "queued": 0}
+    attendees: List[Dict[str, Any]] = []
+    while True:
+        page = (
+            supabase_admin.table("event_attendees").select("event_id, attendee_id")
+            .in_("event_id", [event["id"] for event in events])
+            .eq("attendance_status", "registered")
+            .order("event_id").order("attendee_id")
+            .range(len(attendees), len(attendees) + PAGE_SIZE - 1)
+            .execute().data or []
+        )
+        attendees.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+    profiles = _reminder_profiles(list({row["attendee_id"] for row in attendees}))
+    events_by_id = {event["id"]: event for event in events}
+    whatsapp_template = os.environ.get("WATI_EVENT_REMINDER_TEMPLATE")
+
+    emails, whatsapps = [], []
+    for row in attendees:
+        event, profile = events_by_id[row["event_id"]], profiles.get(row["attendee_id"])
+        if profile is None:
+            continue
+        key = f"event-reminder:{event['id']}:{profile['id']}"
+        name = profile.get("full_name") or "there"
+        if profile.get("email"):
+            emails.append(({
+                "to_email": profile["email"],
+                "subject": f"Reminder: {event['title']} is tomorrow",
+                "html_content": (
+                    f"<p>Hi {html.escape(name)},</p><p>This is a reminder that "
+                    f"<strong>{html.escape(event['title'])}</strong> starts at {html.escape(event['event_date'])}"
+                    f"{' at ' + html.escape(event['location']) if event.get('location') else ''}.</p>"
+                ),
+            }, key + ":email"))
+        if whatsapp_template and profile.get("phone"):
+            whatsapps.append(({
+                "to_number": profile["phone"],
+                "template_name": whatsapp_template,
+                "parameters": {"name": name, "event": event["title"], "date": event["event_date"]},
+            }, key + ":whatsapp"))
+
+    queued = len(enqueue_notifications("email", emails)) + len(enqueue_notifications("whatsapp", whatsapps))
+    logger.info("Event reminders: %s events, %s notifications queued", len(events), queued)
+    return {"events": len(events), "queued": queued}
+
+
+def warm_in_memory_indexes() -> None:
+    """Refresh this worker's in-memory indexes ahead of their max age, so
+    requests never pay for the refresh. Indexes whose module was never
+    imported here (the feature hasn't been used) are left alone."""
+    for module, attribute in (
+        ("analytics", "alumni_rollups"), ("recommendations", "job_recommender"),
+    ):
+        loaded = sys.modules.get(f"{__package__}.{module}")
+        index = getattr(loaded, attribute, None)
+        if index is not None and index.refreshed_at is not None:
+            index.refresh()
+
+
+def scan_for_duplicates() -> int:
+    """Nightly full duplicate-profile scan; stores new candidate pairs for review"""
+    from .dedupe import duplicate_detector
+
+    return duplicate_detector.scan_and_store(full=True)
+
+
+def register_default_jobs(scheduler: Scheduler) -> None:
+    scheduler.register("event_reminders", send_event_reminders, cron="0 * * * *", timeout=600)
+    # Immediate-mode members hear about a post within a minute; hourly and daily digests come due on the hour
+    scheduler.register("group_post_notifications", send_group_post_notifications, every=60, timeout=300)
+    scheduler.register("resume_broadcasts", resume_stalled_broadcasts, every=60, timeout=1800)
+    scheduler.register("duplicate_scan", scan_for_duplicates, cron="30 2 * * *", timeout=1800)
+    # Every worker holds its own indexes; jitter keeps the workers from refreshing in lockstep
+    scheduler.register(
+        "warm_indexes", warm_in_memory_indexes, every=240, jitter=30, timeout=240, leader_only=False,
+    )
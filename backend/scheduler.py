@@ -0,0 +1,340 @@
+import asyncio
+import inspect
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from .dependencies import get_settings, supabase_admin
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "scheduler"
+LEASE_SECONDS = 30
+HISTORY_SIZE = 20
+# Bounds for cron fields: minute, hour, day of month, month, day of week (0 = Sunday)
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.split(","):
+        spec, _, step = part.partition("/")
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (int(bound) for bound in spec.split("-", 1))
+        else:
+            start = end = int(spec)
+            if step:
+                end = high
+        if not (low <= start <= end <= high):
+            raise ValueError(f"Cron field {field!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class CronSchedule:
+    """Standard five-field cron expression ("*/15 * * * *"), evaluated in UTC.
+
+    Supports *, lists, ranges and steps. As in cron, when both day of month
+    and day of week are restricted a day matching either one fires.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_cron_field(field, low, high) for field, (low, high) in zip(fields, CRON_FIELDS)
+        )
+        self.weekdays = {day % 7 for day in weekdays}
+        # A field starting with "*" ("*/2" too) counts as unrestricted, as in cron
+        self.any_day = fields[2].startswith("*")
+        self.any_weekday = fields[4].startswith("*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, now: float) -> float:
+        moment = datetime.fromtimestamp(now, timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment.year + 5
+        while moment.year <= limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __str__(self) -> str:
+        return f"cron {self.expression}"
+
+
+class IntervalSchedule:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def next_after(self, now: float) -> float:
+        return now + self.seconds
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+class Job:
+    """A registered job and its run history"""
+
+    def __init__(self, name: str, fn: Callable[[], Any], schedule, jitter: float, timeout: float, leader_only: bool):
+        self.name = name
+        self.fn = fn
+        self.schedule = schedule
+        self.jitter = jitter
+        self.timeout = timeout
+        self.leader_only = leader_only
+        self.next_run = 0.0
+        self.reschedule(time.time())
+        self.running = False
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=HISTORY_SIZE)
+        self.counters = {"runs": 0, "failures": 0, "timeouts": 0, "skipped_overlap": 0}
+
+    def reschedule(self, now: float) -> None:
+        self.next_run = self.schedule.next_after(now) + random.uniform(0, self.jitter)
+
+    def snapshot(self) -> Dict[str, Any]:
+        durations = [run["duration_ms"] for run in self.history]
+        return {
+            "schedule": str(self.schedule),
+            "leader_only": self.leader_only,
+            "timeout": self.timeout,
+            "running": self.running,
+            "next_run": datetime.fromtimestamp(self.next_run, timezone.utc).isoformat(),
+            **self.counters,
+            "mean_duration_ms": round(sum(durations) / len(durations), 2) if durations else None,
+            "max_duration_ms": max(durations) if durations else None,
+            "history": list(self.history),
+        }
+
+
+class DatabaseLease:
+    """Leader lease held as a row in scheduler_leases (see the scheduler_leases
+    migration), so it works across hosts. The holder renews it well before
+    it expires; a crashed leader is replaced once its lease runs out."""
+
+    def __init__(self, holder: str, name: str = LEASE_NAME, seconds: int = LEASE_SECONDS):
+        self.holder = holder
+        self.name = name
+        self.seconds = seconds
+
+    def acquire(self) -> bool:
+        response = supabase_admin.rpc("acquire_scheduler_lease", {
+            "p_name": self.name, "p_holder": self.holder, "p_lease_seconds": self.seconds,
+        }).execute()
+        return bool(response.data)
+
+    def release(self) -> None:
+        supabase_admin.rpc("release_scheduler_lease", {"p_name": self.name, "p_holder": self.holder}).execute()
+
+
+class FileLease:
+    """Stand-in for single-host deployments: an exclusive lock on a local
+    file, held for as long as this process is the leader."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        import fcntl
+
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)  # closing drops the flock
+            self._fd = None
+
+
+class Scheduler:
+    """Runs periodic jobs inside the API process.
+
+    Every worker runs the scheduler loop, but jobs registered with
+    leader_only=True (the default) only run on the worker holding the
+    leader lease, so they run once per deployment rather than once per
+    worker. Per-worker jobs (cache warmers for in-memory indexes) run
+    everywhere. A job that is still running when it comes due again is
+    skipped; jobs over their timeout are cancelled if async, and for
+    blocking jobs the run is recorded as timed out while the thread is left
+    to finish before the job runs again.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self.holder: Optional[str] = None
+        self.lease = None
+        self.leader_until = 0.0
+        self.lease_checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def register(self, name: str, fn: Callable[[], Any], *, cron: Optional[str] = None,
+                 every: Optional[float] = None, jitter: float = 0.0, timeout: float = 300.0,
+                 leader_only: bool = True) -> Job:
+        """Add (or replace) a job; give exactly one of cron= or every= (seconds)"""
+        if (cron is None) == (every is None):
+            raise ValueError("Give a job either a cron expression or an interval")
+        schedule = CronSchedule(cron) if cron is not None else IntervalSchedule(every)
+        job = self.jobs[name] = Job(name, fn, schedule, jitter, timeout, leader_only)
+        return job
+
+    @property
+    def is_leader(self) -> bool:
+        return time.monotonic() < self.leader_until
+
+    async def _check_lease(self) -> None:
+        if not any(job.leader_only for job in self.jobs.values()):
+            return
+        started = time.monotonic()
+        try:
+            held = await run_in_threadpool(self.lease.acquire)
+        except Exception:
+            logger.exception("Scheduler lease check failed")
+            held = False
+        if held and not self.is_leader:
+            logger.info("Scheduler leader lease acquired by %s", self.holder)
+        elif not held and self.is_leader:
+            logger.warning("Scheduler leader lease lost by %s", self.holder)
+        # Counted from before the call, so our view of the lease never outlives the real one
+        self.leader_until = started + LEASE_SECONDS if held else 0.0
+        self.lease_checked_at = started
+
+    async def _call(self, job: Job) -> None:
+        if inspect.iscoroutinefunction(job.fn):
+            await job.fn()
+        else:
+            await run_in_threadpool(job.fn)
+
+    async def _execute(self, job: Job) -> None:
+        job.running = True
+        started = time.time()
+        status, error = "ok", None
+        call = asyncio.ensure_future(self._call(job))
+        try:
+            await asyncio.wait_for(asyncio.shield(call), job.timeout)
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"Exceeded {job.timeout:g}s"
+            job.counters["timeouts"] += 1
+            if inspect.iscoroutinefunction(job.fn):
+                call.cancel()
+        except Exception as e:
+            status, error = "error", str(e) or type(e).__name__
+            job.counters["failures"] += 1
+            logger.exception("Scheduled job %s failed", job.name)
+        job.counters["runs"] += 1
+        job.history.append({
+            "started_at": datetime.fromtimestamp(started, timezone.utc).isoformat(),
+            "duration_ms": round((time.time() - started) * 1000, 2),
+            "status": status,
+            "error": error,
+        })
+        if status == "timeout":
+            # A blocking job can't be interrupted; don't start it again until its thread is done
+            await asyncio.gather(call, return_exceptions=True)
+        job.running = False
+
+    def _launch(self, job: Job) -> None:
+        task = asyncio.create_task(self._execute(job))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self) -> None:
+        while True:
+            if time.monotonic() - self.lease_checked_at >= LEASE_SECONDS / 3:
+                await self._check_lease()
+            now = time.time()
+            for job in self.jobs.values():
+                if job.next_run > now:
+                    continue
+                job.reschedule(now)
+                if job.leader_only and not self.is_leader:
+                    continue
+                if job.running:
+                    job.counters["skipped_overlap"] += 1
+                    continue
+                self._launch(job)
+            next_due = min((job.next_run for job in self.jobs.values()), default=now + LEASE_SECONDS)
+            await asyncio.sleep(max(0.05, min(next_due - time.time(), LEASE_SECONDS / 3)))
+
+    def run_now(self, name: str) -> bool:
+        """Start a job on this worker immediately; False if it is already running"""
+        job = self.jobs[name]
+        if job.running:
+            return False
+        self._launch(job)
+        return True
+
+    def start(self) -> None:
+        settings = get_settings()
+        if self._task is not None or not settings.scheduler_enabled:
+            return
+        # Set here rather than at import so forked workers get their own id
+        self.holder = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease = FileLease(settings.scheduler_lease_file) if settings.scheduler_lease_file else DatabaseLease(self.holder)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+        if self.is_leader:
+            self.leader_until = 0.0
+            try:
+                # Let another worker take over now instead of after the lease expires
+                await run_in_threadpool(self.lease.release)
+            except Exception:
+                logger.exception("Releasing the scheduler lease failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._task is not None,
+            "holder": self.holder,
+            "leader": self.is_leader,
+            "lease": type(self.lease).__name__ if self.lease else None,
+            "jobs": {name: job.snapshot() for name, job in self.jobs.items()},
+        }
+
+
+scheduler = Scheduler()
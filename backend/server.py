@@ -1,16 +1,40 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException
+from fastapi import FastAPI, APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+from contextlib import asynccontextmanager
+from datetime import datetime
+import base64
 import logging
+import uuid
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
+from postgrest.exceptions import APIError
 
-from .dependencies import get_current_user, supabase, supabase_admin, SUPABASE_URL
-from .routers import groups, notifications
+from .dependencies import (
+    get_current_user, get_settings, warm_clients, close_clients,
+    supabase, supabase_admin, ThreadReadRequest, CheckInBatch, ApplicationStatusUpdate, ADMIN_ROLES,
+)
+from .avatars import shutdown_process_pool
+from .directory import DIRECTORY_FILTERS, directory
+from .probes import prober
+from .profiling import ProfilingMiddleware
+from .read_routing import ReadRoutingMiddleware
+from .scheduled_jobs import register_default_jobs
+from .scheduler import scheduler
+from .resilience import CircuitOpenError
+from .routers import (
+    analytics, avatars, batch, broadcasts, duplicates, event_feedback, groups, health, notifications,
+    presence, profiling, recommendations, resumes, scheduler as scheduler_routes,
+)
 
-# Create the main app
-app = FastAPI(title="AMET Alumni Portal API", version="1.0.0")
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -18,22 +42,24 @@ api_router = APIRouter(prefix="/api")
 # Include routers
 api_router.include_router(groups.router)
 api_router.include_router(notifications.router)
+api_router.include_router(batch.router)
+api_router.include_router(health.router)
+api_router.include_router(analytics.router)
+api_router.include_router(event_feedback.router)
+api_router.include_router(resumes.router)
+api_router.include_router(avatars.router)
+api_router.include_router(recommendations.router)
+api_router.include_router(duplicates.router)
+api_router.include_router(profiling.router)
+api_router.include_router(presence.router)
+api_router.include_router(scheduler_routes.router)
+api_router.include_router(broadcasts.router)
 
 # Basic routes
 @api_router.get("/")
 async def root():
     return {"message": "AMET Alumni Portal API", "version": "1.0.0"}
 
-@api_router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    try:
-        # Test Supabase connection
-        response = supabase_admin.table("profiles").select("count").execute()
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
-
 class LoginRequest(BaseModel):
     email: str
     password: str
@@ -102,57 +128,14 @@ async def test_login(request: LoginRequest):
             return {"access_token": response.session.access_token, "token_type": "bearer"}
         else:
             raise HTTPException(status_code=401, detail="Invalid credentials")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/user", response_model=Dict[str, Any])
-async def get_user(current_user: Dict[str, Any] = Depends(get_current_user)):
-    """Verify JWT token and return user data"""
-    try:
-        token = credentials.credentials
-        
-        # Use Supabase to verify the token
-        user_response = supabase.auth.get_user(token)
-        
-        if user_response.user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        return user_response.user.model_dump()
-    
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-# Basic routes
-@api_router.get("/")
-async def root():
-    return {"message": "AMET Alumni Portal API", "version": "1.0.0"}
-
-@api_router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    try:
-        # Test Supabase connection
-        response = supabase_admin.table("profiles").select("count").execute()
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
-
-
-class LoginRequest(BaseModel):
-    email: str
-    password: str
-
 # Registration endpoint
 @api_router.post("/auth/register")
-async def register_user(request: dict):
+async def register_user_with_metadata(request: dict):
     """Register a new user"""
     try:
         email = request.get('email')
@@ -215,7 +198,7 @@ async def register_user(request: dict):
 
 # Authentication routes
 @api_router.post("/auth/test-login")
-async def test_login(request: LoginRequest):
+async def test_login_user_exists(request: LoginRequest):
     """Test login endpoint for debugging"""
     try:
         # Use admin client to check if user exists
@@ -251,6 +234,8 @@ async def get_user_profile(current_user: Dict[str, Any] = Depends(get_current_us
             return response.data[0]
         else:
             raise HTTPException(status_code=404, detail="Profile not found")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -263,22 +248,61 @@ async def update_user_profile(
     try:
         response = supabase.table("profiles").update(profile_data).eq("user_id", current_user["id"]).execute()
         if response.data:
+            # Visible in this worker's directory at once; the others pick it up on their next poll
+            if directory.ready:
+                directory.apply(response.data)
             return response.data[0]
         else:
             raise HTTPException(status_code=404, detail="Profile not found")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Profiles routes
+def _with_avatar_thumbnails(profiles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """List views render small avatars, so serve the thumbnail variant where one exists"""
+    for profile in profiles:
+        if profile.get("avatar_thumb_url"):
+            profile["avatar_url"] = profile["avatar_thumb_url"]
+    return profiles
+
+def _ilike_literal(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _directory_page(limit: int, offset: int, search: Optional[str], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A page of the alumni directory in name order, from the in-memory replica once it has synced"""
+    if directory.ready:
+        return _with_avatar_thumbnails(directory.page(limit, offset, search=search, **filters))
+    query = supabase.table("profiles").select("*")
+    for column, value in filters.items():
+        if value is None:
+            continue
+        # Text filters match case-insensitively, like the replica
+        query = query.ilike(column, _ilike_literal(value)) if isinstance(value, str) else query.eq(column, value)
+    if search:
+        query = query.ilike("full_name", f"%{_ilike_literal(search)}%")
+    response = query.order("full_name").order("id").range(offset, offset + limit - 1).execute()
+    return _with_avatar_thumbnails(response.data)
+
 @api_router.get("/profiles", response_model=List[Dict[str, Any]])
 async def get_profiles(
     limit: int = 1000,
-    offset: int = 0
+    offset: int = 0,
+    search: Optional[str] = None,
+    graduation_year: Optional[int] = None,
+    company: Optional[str] = None,
+    degree: Optional[str] = None,
+    major: Optional[str] = None,
+    location: Optional[str] = None,
+    is_mentor: Optional[bool] = None,
 ):
     """Get all alumni profiles - public endpoint for directory"""
     try:
-        response = supabase.table("profiles").select("*").range(offset, offset + limit - 1).execute()
-        return response.data
+        filters = dict(zip(DIRECTORY_FILTERS, (graduation_year, company, degree, major, location, is_mentor)))
+        return _directory_page(limit, offset, search, filters)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -286,27 +310,37 @@ async def get_profiles(
 async def get_profiles_protected(
     limit: int = 50,
     offset: int = 0,
+    search: Optional[str] = None,
+    graduation_year: Optional[int] = None,
+    company: Optional[str] = None,
+    degree: Optional[str] = None,
+    major: Optional[str] = None,
+    location: Optional[str] = None,
+    is_mentor: Optional[bool] = None,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Get all alumni profiles - protected endpoint"""
     try:
-        response = supabase.table("profiles").select("*").range(offset, offset + limit - 1).execute()
-        return response.data
+        filters = dict(zip(DIRECTORY_FILTERS, (graduation_year, company, degree, major, location, is_mentor)))
+        return _directory_page(limit, offset, search, filters)
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-from fastapi.responses import JSONResponse
-from fastapi.encoders import jsonable_encoder
-
 @api_router.get("/profiles/{profile_id}")
 async def get_profile_by_id(
     profile_id: str
 ):
     """Get specific profile by ID"""
     try:
-        response = supabase.table("profiles").select("*").eq("id", profile_id).execute()
-        if response.data:
-            content = jsonable_encoder(response.data[0])
+        profile = directory.get(profile_id)
+        if profile is None:
+            # Not synced yet (or the replica is still loading): read it from the database
+            response = supabase.table("profiles").select("*").eq("id", profile_id).execute()
+            profile = response.data[0] if response.data else None
+        if profile is not None:
+            content = jsonable_encoder(profile)
             return JSONResponse(
                 content=content,
                 headers={
@@ -318,6 +352,8 @@ async def get_profile_by_id(
             )
         else:
             raise HTTPException(status_code=404, detail="Profile not found")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -338,6 +374,8 @@ async def get_events(
         
         response = query.range(offset, offset + limit - 1).order("event_date").execute()
         return response.data
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -353,6 +391,8 @@ async def get_event_by_id(
             return response.data[0]
         else:
             raise HTTPException(status_code=404, detail="Event not found")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -369,6 +409,8 @@ async def create_event(
             return response.data[0]
         else:
             raise HTTPException(status_code=400, detail="Failed to create event")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -390,18 +432,121 @@ async def register_for_event(
             return {"message": "Successfully registered for event"}
         else:
             raise HTTPException(status_code=400, detail="Failed to register for event")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+ATTENDANCE_STATUSES = ("registered", "attended", "canceled")
+
+def _encode_cursor(sort_value: str, row_id: str) -> str:
+    """Opaque keyset cursor for a (timestamp, id) sort position"""
+    return base64.urlsafe_b64encode(f"{sort_value}|{row_id}".encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        registered, _, row_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().partition("|")
+        datetime.fromisoformat(registered)
+        uuid.UUID(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return registered, row_id
+
 @api_router.get("/events/{event_id}/attendees")
 async def get_event_attendees(
     event_id: str,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
-    """Get attendees for an event"""
+    """Get one page of an event's attendees in registration order, with name-list profile fields"""
     try:
-        response = supabase.table("event_attendees").select("*, profiles(*)").eq("event_id", event_id).execute()
-        return response.data
+        if status is not None and status not in ATTENDANCE_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        limit = max(1, min(limit, 200))
+        after_registered, after_id = _decode_cursor(cursor) if cursor else (None, None)
+
+        response = supabase_admin.rpc("event_attendees_page", {
+            "p_event_id": event_id,
+            "p_status": status,
+            "p_after_registered": after_registered,
+            "p_after_id": after_id,
+            "p_limit": limit,
+        }).execute()
+        rows = response.data or []
+        next_cursor = _encode_cursor(rows[-1]["registration_date"], rows[-1]["id"]) if len(rows) == limit else None
+        return {"items": rows, "limit": limit, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/events/{event_id}/attendees/summary")
+async def get_event_attendance_summary(
+    event_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Get registered/attended/canceled counts for an event from its maintained counters"""
+    try:
+        response = supabase_admin.table("event_attendance_stats").select("registered, attended, canceled").eq("event_id", event_id).execute()
+        counts = response.data[0] if response.data else {status: 0 for status in ATTENDANCE_STATUSES}
+        return {"event_id": event_id, **counts, "total": sum(counts[status] for status in ATTENDANCE_STATUSES)}
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+CHECK_IN_OUTCOMES = ("checked_in", "walk_in", "already_checked_in", "unknown")
+
+def _require_event_staff(event_id: str, user_id: str) -> None:
+    """Only the event's organizer or an admin may run its check-in"""
+    event = supabase_admin.table("events").select("organizer_id").eq("id", event_id).execute()
+    if not event.data:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.data[0].get("organizer_id") == user_id:
+        return
+    profile = supabase_admin.table("profiles").select("role").eq("id", user_id).execute()
+    if not profile.data or profile.data[0].get("role") not in ADMIN_ROLES:
+        raise HTTPException(status_code=403, detail="Only the organizer or an admin can check attendees in")
+
+@api_router.post("/events/{event_id}/check-in")
+async def check_in_attendees(
+    event_id: str,
+    batch: CheckInBatch,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Check in a batch of scanned attendees in one upsert; replayed batches are no-ops"""
+    try:
+        _require_event_staff(event_id, current_user["id"])
+        for scan in batch.scans:
+            try:
+                uuid.UUID(scan.attendee_id)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid attendee id: {scan.attendee_id}")
+
+        response = supabase_admin.rpc("check_in_attendees", {
+            "p_event_id": event_id,
+            "p_attendee_ids": [scan.attendee_id for scan in batch.scans],
+            "p_scanned_at": [scan.scanned_at.isoformat() if scan.scanned_at else None for scan in batch.scans],
+            "p_checked_in_by": current_user["id"],
+        }).execute()
+
+        result = {outcome: [] for outcome in CHECK_IN_OUTCOMES}
+        delta = {status: 0 for status in ATTENDANCE_STATUSES}
+        for row in response.data or []:
+            result[row["outcome"]].append(row["attendee_id"])
+            if row["outcome"] in ("checked_in", "walk_in"):
+                delta["attended"] += 1
+                if row["previous_status"] in delta:
+                    delta[row["previous_status"]] -= 1
+        return {"event_id": event_id, "scanned": len(batch.scans), "delta": delta, **result}
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -422,6 +567,8 @@ async def get_jobs(
         
         response = query.range(offset, offset + limit - 1).order("created_at", desc=True).execute()
         return response.data
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -437,12 +584,15 @@ async def get_job_by_id(
             return response.data[0]
         else:
             raise HTTPException(status_code=404, detail="Job not found")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/jobs")
 async def create_job(
     job_data: Dict[str, Any],
+    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """Create new job listing"""
@@ -450,9 +600,12 @@ async def create_job(
         job_data["posted_by"] = current_user["id"]
         response = supabase.table("jobs").insert(job_data).execute()
         if response.data:
+            background_tasks.add_task(recommendations.index_new_job, response.data[0])
             return response.data[0]
         else:
             raise HTTPException(status_code=400, detail="Failed to create job")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -465,6 +618,14 @@ async def apply_for_job(
 ):
     """Apply for a job"""
     try:
+        # An uploaded resume can be referenced by id instead of by URL
+        resume_id = application_data.pop("resume_id", None)
+        if resume_id:
+            resume = supabase_admin.table("user_resumes").select("file_url").eq("id", resume_id).eq("user_id", current_user["id"]).execute()
+            if not resume.data:
+                raise HTTPException(status_code=404, detail="Resume not found")
+            application_data["resume_url"] = resume.data[0]["file_url"]
+
         application_data.update({
             "job_id": job_id,
             "applicant_id": current_user["id"],
@@ -475,23 +636,100 @@ async def apply_for_job(
             return {"message": "Application submitted successfully"}
         else:
             raise HTTPException(status_code=400, detail="Failed to submit application")
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+APPLICATION_STATUSES = ("submitted", "reviewed", "interview", "accepted", "rejected")
+# SQLSTATEs raised by the job ownership check in the pipeline functions
+RPC_ERROR_STATUS = {"42501": 403, "P0002": 404}
+
+def _raise_for_rpc_error(error: APIError) -> None:
+    if error.code in RPC_ERROR_STATUS:
+        raise HTTPException(status_code=RPC_ERROR_STATUS[error.code], detail=error.message)
+
 @api_router.get("/jobs/{job_id}/applications")
 async def get_job_applications(
     job_id: str,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
-    """Get applications for a job (only for job poster)"""
+    """Get one page of a job's applications, newest first, with per-status counts (only for job poster)"""
     try:
-        # First verify the user posted this job
-        job_response = supabase.table("jobs").select("posted_by").eq("id", job_id).execute()
-        if not job_response.data or job_response.data[0]["posted_by"] != current_user["id"]:
-            raise HTTPException(status_code=403, detail="Access denied")
-        
-        response = supabase.table("job_applications").select("*, profiles(*)").eq("job_id", job_id).execute()
-        return response.data
+        if status is not None and status not in APPLICATION_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+        limit = max(1, min(limit, 200))
+        before_date, before_id = _decode_cursor(cursor) if cursor else (None, None)
+
+        # Ownership is checked inside the same call that reads the page
+        response = supabase_admin.rpc("job_applications_page", {
+            "p_job_id": job_id,
+            "p_owner_id": current_user["id"],
+            "p_status": status,
+            "p_before_date": before_date,
+            "p_before_id": before_id,
+            "p_limit": limit,
+        }).execute()
+        page = response.data or {}
+        rows = page.get("items") or []
+        counts = {status: 0 for status in APPLICATION_STATUSES}
+        counts.update(page.get("counts") or {})
+        next_cursor = _encode_cursor(rows[-1]["application_date"], rows[-1]["id"]) if len(rows) == limit else None
+        return {"items": rows, "counts": counts, "limit": limit, "next_cursor": next_cursor}
+    except APIError as e:
+        _raise_for_rpc_error(e)
+        raise HTTPException(status_code=500, detail=str(e))
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/jobs/{job_id}/applications/status")
+async def update_job_application_status(
+    job_id: str,
+    update: ApplicationStatusUpdate,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Move many applications of a job to a new status in one statement (only for job poster)"""
+    try:
+        if update.status not in APPLICATION_STATUSES:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {update.status}")
+        for application_id in update.application_ids:
+            try:
+                uuid.UUID(application_id)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid application id: {application_id}")
+
+        response = supabase_admin.rpc("set_job_application_status", {
+            "p_job_id": job_id,
+            "p_owner_id": current_user["id"],
+            "p_application_ids": update.application_ids,
+            "p_status": update.status,
+        }).execute()
+        updated = response.data or []
+        updated_ids = {row["application_id"] for row in updated}
+        # Ids not updated were already in the target status or don't belong to this job
+        return {
+            "status": update.status,
+            "updated": [row["application_id"] for row in updated],
+            "unchanged": [application_id for application_id in dict.fromkeys(update.application_ids)
+                          if application_id not in updated_ids],
+            "previous_status": {row["application_id"]: row["previous_status"] for row in updated},
+        }
+    except APIError as e:
+        _raise_for_rpc_error(e)
+        raise HTTPException(status_code=500, detail=str(e))
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -504,6 +742,8 @@ async def get_messages(
     try:
         response = supabase.table("messages").select("*, sender:sender_id(full_name), recipient:recipient_id(full_name)").or_(f"sender_id.eq.{current_user['id']},recipient_id.eq.{current_user['id']}").order("created_at", desc=True).execute()
         return response.data
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -520,6 +760,8 @@ async def send_message(
             return response.data[0]
         else:
             raise HTTPException(status_code=400, detail="Failed to send message")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -535,6 +777,41 @@ async def mark_message_as_read(
             return {"message": "Message marked as read"}
         else:
             raise HTTPException(status_code=404, detail="Message not found")
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.put("/messages/threads/{counterpart_id}/read")
+async def mark_thread_as_read(
+    counterpart_id: str,
+    read_data: ThreadReadRequest = ThreadReadRequest(),
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Mark every message received from a counterpart as read, optionally up to a timestamp or message id"""
+    try:
+        response = supabase_admin.rpc("mark_thread_read", {
+            "p_recipient_id": current_user["id"],
+            "p_sender_id": counterpart_id,
+            "p_up_to": read_data.up_to.isoformat() if read_data.up_to else None,
+            "p_up_to_id": read_data.up_to_id,
+        }).execute()
+        return {"message": "Messages marked as read", "updated": response.data or 0}
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/messages/unread-count")
+async def get_unread_message_count(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Get the maintained unread message counter for current user"""
+    try:
+        response = supabase_admin.table("message_unread_counts").select("unread_count").eq("user_id", current_user["id"]).execute()
+        return {"unread_count": response.data[0]["unread_count"] if response.data else 0}
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -547,6 +824,8 @@ async def get_mentors(
     try:
         response = supabase.table("mentors").select("*, profiles(*)").eq("is_available", True).execute()
         return response.data
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -558,6 +837,90 @@ async def get_mentorship_requests(
     try:
         response = supabase.table("mentorship_requests").select("*, mentor:mentor_id(profiles(*)), mentee:mentee_id(profiles(*))").or_(f"mentor_id.eq.{current_user['id']},mentee_id.eq.{current_user['id']}").execute()
         return response.data
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+MENTORSHIP_STATUSES = ("pending", "accepted", "rejected", "withdrawn", "completed")
+MENTORSHIP_PROFILE_FIELDS = "id, full_name, avatar_url, job_title, company"
+
+def _fetch_profiles_by_ids(profile_ids: List[str], fields: str) -> Dict[str, Dict[str, Any]]:
+    """Resolve a set of profiles with one deduplicated `in` lookup, keyed by id"""
+    unique_ids = sorted({profile_id for profile_id in profile_ids if profile_id})
+    if not unique_ids:
+        return {}
+    response = supabase.table("profiles").select(fields).in_("id", unique_ids).execute()
+    return {profile["id"]: profile for profile in response.data or []}
+
+def _list_mentorship_requests(role_column: str, counterpart_column: str, user_id: str,
+                              status: Optional[str], limit: int, offset: int) -> Dict[str, Any]:
+    if status is not None and status not in MENTORSHIP_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+    limit = max(1, min(limit, 100))
+
+    query = supabase.table("mentorship_requests").select("*").eq(role_column, user_id)
+    if status:
+        query = query.eq("status", status)
+    response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+    rows = response.data or []
+
+    profiles = _fetch_profiles_by_ids([row[counterpart_column] for row in rows], MENTORSHIP_PROFILE_FIELDS)
+    counterpart_key = counterpart_column.replace("_id", "")
+    for row in rows:
+        row[counterpart_key] = profiles.get(row[counterpart_column])
+    return {"items": rows, "limit": limit, "offset": offset, "has_more": len(rows) == limit}
+
+@api_router.get("/mentorship-requests/incoming")
+async def get_incoming_mentorship_requests(
+    status: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Get mentorship requests received by current user as mentor, with mentee summaries"""
+    try:
+        return _list_mentorship_requests("mentor_id", "mentee_id", current_user["id"], status, limit, offset)
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/mentorship-requests/outgoing")
+async def get_outgoing_mentorship_requests(
+    status: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Get mentorship requests sent by current user as mentee, with mentor summaries"""
+    try:
+        return _list_mentorship_requests("mentee_id", "mentor_id", current_user["id"], status, limit, offset)
+    except HTTPException:
+        raise
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/mentorship-requests/counts")
+async def get_mentorship_request_counts(
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """Get per-status counts of incoming and outgoing mentorship requests"""
+    try:
+        response = supabase_admin.rpc("mentorship_request_status_counts", {"p_user_id": current_user["id"]}).execute()
+        counts = {
+            "incoming": {status: 0 for status in MENTORSHIP_STATUSES},
+            "outgoing": {status: 0 for status in MENTORSHIP_STATUSES},
+        }
+        for row in response.data or []:
+            counts[row["direction"]][row["status"]] = row["request_count"]
+        return counts
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -574,32 +937,66 @@ async def create_mentorship_request(
             return response.data[0]
         else:
             raise HTTPException(status_code=400, detail="Failed to create mentorship request")
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Include the main router in the app
-app.include_router(api_router)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=["http://localhost:3000", "http://localhost:3001", "*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-@app.on_event("startup")
-async def startup_event():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm this worker's Supabase clients on startup and close them on shutdown"""
     logger.info("AMET Alumni Portal API is starting up...")
-    logger.info(f"Supabase URL: {SUPABASE_URL}")
+    await run_in_threadpool(warm_clients)
+    logger.info(f"Supabase URL: {get_settings().supabase_url}")
+    prober.start()
+    directory.start()
+    register_default_jobs(scheduler)
+    scheduler.start()
+    yield
+    await scheduler.stop()
+    await directory.stop()
+    await prober.stop()
+    shutdown_process_pool()
+    await run_in_threadpool(close_clients)
+    logger.info("AMET Alumni Portal API has shut down")
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application; Supabase clients are created per worker at startup"""
+    app = FastAPI(title="AMET Alumni Portal API", version="1.0.0", lifespan=lifespan)
+
+    # Include the main router in the app
+    app.include_router(api_router)
+
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+        # An upstream is known to be down: fail fast instead of queueing on it
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
+
+    # Per-request profiling is opt-in; without a secret the middleware isn't installed at all
+    profiling_secret = get_settings().profiling_secret
+    if profiling_secret:
+        app.add_middleware(ProfilingMiddleware, secret=profiling_secret)
+
+    # Reads go to the replica only when one is configured
+    settings = get_settings()
+    if settings.read_replica_url:
+        app.add_middleware(ReadRoutingMiddleware, pin_seconds=settings.read_replica_pin_seconds)
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=["http://localhost:3000", "http://localhost:3001", "*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return app
+
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
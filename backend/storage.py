@@ -0,0 +1,345 @@
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import tempfile
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Iterable
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+from .dependencies import ROOT_DIR
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+
+class UploadWriter(ABC):
+    """Receives an upload chunk by chunk, hashing and sizing it on the fly.
+
+    Data is flushed in parts of `part_size` bytes, so memory use per upload
+    is bounded by one part regardless of file size.
+    """
+
+    part_size = 1024 * 1024
+
+    def __init__(self):
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+
+    @property
+    def content_hash(self) -> str:
+        return self._sha256.hexdigest()
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        self._sha256.update(data)
+        self._buffer.extend(data)
+        if len(self._buffer) >= self.part_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if self._buffer:
+            part = bytes(self._buffer)
+            self._buffer.clear()
+            await run_in_threadpool(self._write_part, part)
+
+    async def abort(self) -> None:
+        self._buffer.clear()
+        await run_in_threadpool(self._abort)
+
+    @abstractmethod
+    def _write_part(self, part: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def _abort(self) -> None:
+        ...
+
+
+class StorageWriter(UploadWriter):
+    """An upload headed for a storage backend, stored under its key by finalize()."""
+
+    async def finalize(self, key: str) -> bool:
+        """Store the upload under `key`. Returns False when identical content was already stored."""
+        await self._flush()
+        return await run_in_threadpool(self._finalize, key)
+
+    @abstractmethod
+    def _finalize(self, key: str) -> bool:
+        ...
+
+
+class LocalStorageWriter(StorageWriter):
+    def __init__(self, backend: "LocalStorageBackend"):
+        super().__init__()
+        self.backend = backend
+        self.temp_path = backend.root / "tmp" / uuid.uuid4().hex
+        self.temp_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.temp_path, "wb")
+
+    def _write_part(self, part: bytes) -> None:
+        self._file.write(part)
+
+    def _finalize(self, key: str) -> bool:
+        self._file.close()
+        target = self.backend.path_for(key)
+        if target.exists():
+            self.temp_path.unlink()
+            return False
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.temp_path, target)
+        return True
+
+    def _abort(self) -> None:
+        self._file.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+class TempFileWriter(UploadWriter):
+    """Spools an upload to a local temporary file for post-processing."""
+
+    def __init__(self):
+        super().__init__()
+        fd, path = tempfile.mkstemp(prefix="upload-")
+        self.path = Path(path)
+        self._file = os.fdopen(fd, "wb")
+
+    async def close(self) -> None:
+        await self._flush()
+        self._file.close()
+
+    def discard(self) -> None:
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+    def _write_part(self, part: bytes) -> None:
+        self._file.write(part)
+
+    def _abort(self) -> None:
+        self.discard()
+
+
+class LocalStorageBackend:
+    """Filesystem storage for development and tests."""
+
+    def __init__(self, root: Path, public_url: Optional[str] = None):
+        self.root = Path(root)
+        self.public_url = public_url
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key
+
+    def open_writer(self) -> StorageWriter:
+        return LocalStorageWriter(self)
+
+    def exists(self, key: str) -> bool:
+        return self.path_for(key).exists()
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        target = self.path_for(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}")
+        temp.write_bytes(data)
+        os.replace(temp, target)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self.path_for(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def url_for(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url.rstrip('/')}/{key}"
+        return self.path_for(key).resolve().as_uri()
+
+
+class S3StorageWriter(StorageWriter):
+    # S3 requires every part except the last to be at least 5 MiB
+    part_size = 8 * 1024 * 1024
+
+    def __init__(self, backend: "S3StorageBackend"):
+        super().__init__()
+        self.backend = backend
+        self.temp_key = f"tmp/{uuid.uuid4().hex}"
+        self._upload_id: Optional[str] = None
+        self._parts = []
+
+    def _write_part(self, part: bytes) -> None:
+        client = self.backend.client
+        if self._upload_id is None:
+            self._upload_id = client.create_multipart_upload(Bucket=self.backend.bucket, Key=self.temp_key)["UploadId"]
+        number = len(self._parts) + 1
+        response = client.upload_part(
+            Bucket=self.backend.bucket, Key=self.temp_key, UploadId=self._upload_id,
+            PartNumber=number, Body=part,
+        )
+        self._parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def _finalize(self, key: str) -> bool:
+        client = self.backend.client
+        bucket = self.backend.bucket
+        if self._upload_id is None:
+            # Empty upload: nothing was flushed
+            self._write_part(b"")
+        client.complete_multipart_upload(
+            Bucket=bucket, Key=self.temp_key, UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+        try:
+            if self.backend.exists(key):
+                return False
+            # Server-side copy; the object never passes through this process again
+            client.copy_object(Bucket=bucket, Key=key, CopySource={"Bucket": bucket, "Key": self.temp_key})
+            return True
+        finally:
+            client.delete_object(Bucket=bucket, Key=self.temp_key)
+
+    def _abort(self) -> None:
+        if self._upload_id is not None:
+            self.backend.client.abort_multipart_upload(
+                Bucket=self.backend.bucket, Key=self.temp_key, UploadId=self._upload_id,
+            )
+
+
+class S3StorageBackend:
+    """S3-compatible object storage (AWS S3, or Supabase Storage's S3 endpoint)."""
+
+    def __init__(self, bucket: str, endpoint_url: Optional[str] = None, public_url: Optional[str] = None):
+        import boto3
+
+        self.bucket = bucket
+        self.public_url = public_url
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def open_writer(self) -> StorageWriter:
+        return S3StorageWriter(self)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError:
+            return False
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except ClientError:
+            return None
+
+    def url_for(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url.rstrip('/')}/{key}"
+        return f"s3://{self.bucket}/{key}"
+
+
+@lru_cache(maxsize=1)
+def get_file_storage():
+    """Storage backend selected by FILE_STORAGE_BACKEND (local or s3)"""
+    if os.environ.get("FILE_STORAGE_BACKEND", "local") == "s3":
+        return S3StorageBackend(
+            bucket=os.environ["FILE_STORAGE_BUCKET"],
+            endpoint_url=os.environ.get("FILE_STORAGE_ENDPOINT_URL"),
+            public_url=os.environ.get("FILE_STORAGE_PUBLIC_URL"),
+        )
+    return LocalStorageBackend(
+        root=Path(os.environ.get("FILE_STORAGE_PATH", ROOT_DIR / "uploads")),
+        public_url=os.environ.get("FILE_STORAGE_PUBLIC_URL"),
+    )
+
+
+async def stream_upload(
+    request: Request,
+    writer: UploadWriter,
+    field_name: str = "file",
+    max_size: int = 10 * 1024 * 1024,
+    allowed_types: Optional[Iterable[str]] = None,
+) -> Dict[str, str]:
+    """Parse a multipart request body incrementally, piping one file field into `writer`.
+
+    The body is never buffered as a whole: each network chunk is fed to the
+    multipart parser and the file bytes it yields go straight to the writer.
+    Returns the uploaded file's name and content type. On any error the
+    writer is aborted (including when the request isn't multipart at all, as
+    callers open the writer first) and an HTTPException is raised.
+    """
+    pending = []
+    headers: Dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    part = {"in_file": False, "found": False, "filename": None, "content_type": None}
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        is_file = options.get(b"name") == field_name.encode() and b"filename" in options
+        part["in_file"] = is_file and not part["found"]
+        if part["in_file"]:
+            part["found"] = True
+            part["filename"] = options[b"filename"].decode(errors="replace")
+            part["content_type"] = headers.get(b"content-type", b"application/octet-stream").decode()
+
+    def on_part_data(data, start, end):
+        if part["in_file"]:
+            pending.append(bytes(data[start:end]))
+
+    def on_part_end():
+        part["in_file"] = False
+
+    try:
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        })
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if part["found"] and allowed_types is not None and part["content_type"] not in allowed_types:
+                raise HTTPException(status_code=415, detail=f"Unsupported file type: {part['content_type']}")
+            for data in pending:
+                if writer.size + len(data) > max_size:
+                    raise HTTPException(status_code=413, detail=f"File exceeds the {max_size // (1024 * 1024)} MB limit")
+                await writer.write(data)
+            pending.clear()
+        parser.finalize()
+        if not part["found"]:
+            raise HTTPException(status_code=400, detail=f"Missing file field '{field_name}'")
+    except BaseException:
+        await writer.abort()
+        raise
+
+    return {"filename": part["filename"], "content_type": part["content_type"]}
@@ -6,14 +6,21 @@ cd /backend || { echo "Backend directory not found"; exit 1; }
 
 echo "Starting FastAPI backend"
 # Start Uvicorn with proper host binding
-uvicorn server:app --host 0.0.0.0 --port 8001 &
+# Each worker creates its own Supabase clients at startup, so workers can be scaled freely
+uvicorn server:app --host 0.0.0.0 --port 8001 --workers "${WEB_CONCURRENCY:-1}" &
 BACKEND_PID=$!
 
+# Notifications are queued by the API and delivered by a separate worker process
+echo "Starting notification outbox worker"
+(cd / && python3 -m backend.outbox_worker) &
+OUTBOX_PID=$!
+
 echo "Waiting for backend to start..."
 sleep 30
 
 if ! kill -0 $BACKEND_PID 2>/dev/null; then
     echo "Backend failed to start at initialization, exiting"
+    kill $OUTBOX_PID 2>/dev/null
     exit 1
 fi
 
@@ -22,20 +29,23 @@ nginx -g 'daemon off;' &
 NGINX_PID=$!
 
 # Handle termination signals
-trap 'kill $BACKEND_PID $NGINX_PID; exit 0' SIGTERM SIGINT
+trap 'kill $BACKEND_PID $OUTBOX_PID $NGINX_PID; exit 0' SIGTERM SIGINT
 
-# Check if processes are still running
-while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null; do
+# Check if processes are still running. Without the outbox worker nothing
+# would be delivered while the API kept accepting notifications, so its exit
+# also fails the container and lets the orchestrator restart everything.
+while kill -0 $BACKEND_PID 2>/dev/null && kill -0 $NGINX_PID 2>/dev/null && kill -0 $OUTBOX_PID 2>/dev/null; do
     sleep 1
 done
 
 # If we get here, one of the processes died
-if kill -0 $BACKEND_PID 2>/dev/null; then
-    echo "Nginx died, shutting down backend..."
-    kill $BACKEND_PID
+if ! kill -0 $OUTBOX_PID 2>/dev/null; then
+    echo "Outbox worker died, shutting down backend and nginx..."
+elif kill -0 $BACKEND_PID 2>/dev/null; then
+    echo "Nginx died, shutting down backend and outbox worker..."
 else
-    echo "Backend died, shutting down nginx..."
-    kill $NGINX_PID
+    echo "Backend died, shutting down nginx and outbox worker..."
 fi
+kill $BACKEND_PID $OUTBOX_PID $NGINX_PID 2>/dev/null
 
 exit 1
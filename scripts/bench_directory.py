@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Measure the in-memory profile directory (backend/directory.py).
+
+Reports memory per 100k profiles for the compact replica against the list
+of dicts PostgREST returns, how long a full load and a delta poll take, the
+resulting sync lag for the configured poll interval, and page/filter
+latency. By default the profiles are synthetic; with --live the replica is
+loaded from Supabase (needs valid .env values).
+
+Usage:
+    python scripts/bench_directory.py --profiles 100000 [--delta 500] [--interval 5]
+    python scripts/bench_directory.py --live
+"""
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from backend.directory import CompactDirectory  # noqa: E402
+
+COMPANIES = [f"Company {n}" for n in range(300)]
+LOCATIONS = ["Chennai", "Mumbai", "Singapore", "Dubai", "Rotterdam", "Houston", "London", "Kochi"]
+DEGREES = ["B.E.", "B.Tech", "M.E.", "MBA", "B.Sc", "Diploma"]
+MAJORS = ["Marine Engineering", "Nautical Science", "Naval Architecture", "Mechanical Engineering",
+          "Logistics", "Electrical Engineering"]
+TITLES = ["Chief Engineer", "Second Officer", "Master Mariner", "Surveyor", "Port Captain",
+          "Superintendent", "Naval Architect", "Operations Manager"]
+
+
+def synthetic_profiles(count: int, start: datetime):
+    rng = random.Random(42)
+    rows = []
+    for n in range(count):
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "email": f"alum{n}@example.com",
+            "full_name": f"Alum {rng.randrange(10 ** 6)} {n}",
+            "avatar_url": f"https://cdn.example.com/avatars/{n}.webp" if n % 3 else None,
+            "avatar_thumb_url": f"https://cdn.example.com/avatars/{n}_thumb.webp" if n % 3 else None,
+            "graduation_year": 1990 + n % 35,
+            "degree": rng.choice(DEGREES),
+            "major": rng.choice(MAJORS),
+            "location": rng.choice(LOCATIONS),
+            "company": rng.choice(COMPANIES),
+            "job_title": rng.choice(TITLES),
+            "linkedin_url": f"https://linkedin.com/in/alum{n}" if n % 2 else None,
+            "bio": None if n % 4 else f"Alumnus {n}, sailing since {1990 + n % 35}.",
+            "is_mentor": n % 20 == 0,
+            "role": "alumni",
+            "created_at": (start + timedelta(seconds=n)).isoformat(),
+            "updated_at": (start + timedelta(seconds=n)).isoformat(),
+        })
+    # As decoded from a PostgREST response: every value its own object
+    return json.loads(json.dumps(rows))
+
+
+class SyntheticDirectory(CompactDirectory):
+    """Serves _fetch from an in-memory table instead of Supabase"""
+
+    def __init__(self, table):
+        super().__init__()
+        self.table = table
+
+    def _fetch(self, since):
+        rows = [row for row in self.table.values() if since is None or row["updated_at"] >= since]
+        return json.loads(json.dumps(sorted(rows, key=lambda row: (row["updated_at"], row["id"]))))
+
+    def _fetch_deleted(self, since):
+        return []
+
+
+def retained_bytes(build):
+    """Bytes still allocated after build() returns, with its result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()  # noqa: F841
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used
+
+
+def timed(fn, runs: int = 20):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def first_page_after_poll(replica, runs: int = 20):
+    """Median time of the first page served after a poll, the one that would pay for a re-sort"""
+    samples = []
+    for _ in range(runs):
+        replica.sync()
+        started = time.perf_counter()
+        replica.page(50)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=100000, help="synthetic profiles to load")
+    parser.add_argument("--delta", type=int, default=500, help="profiles changed between two polls")
+    parser.add_argument("--interval", type=float, default=5.0, help="poll interval (DIRECTORY_SYNC_INTERVAL)")
+    parser.add_argument("--live", action="store_true", help="load the replica from Supabase instead")
+    args = parser.parse_args()
+
+    if args.live:
+        replica = CompactDirectory()
+        used = retained_bytes(lambda: replica.sync(full=True))
+        seconds = replica.sync(full=True)["seconds"]
+        count = len(replica)
+        delta = replica.sync()
+        poll_seconds, delta_rows = delta["seconds"], delta["rows"]
+    else:
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rows = synthetic_profiles(args.profiles, start)
+        count = len(rows)
+        dict_bytes = retained_bytes(lambda: json.loads(json.dumps(rows)))
+        replica = SyntheticDirectory({row["id"]: row for row in rows})
+        del rows
+        used = retained_bytes(lambda: replica.sync(full=True))
+        # Timed again without tracemalloc, which slows allocation-heavy code down severalfold
+        seconds = replica.sync(full=True)["seconds"]
+
+        # Change --delta profiles after the load, then poll once
+        now = datetime.now(timezone.utc)
+        for row in random.Random(7).sample(list(replica.table.values()), min(args.delta, count)):
+            replica.table[row["id"]] = {**row, "company": random.choice(COMPANIES), "updated_at": now.isoformat()}
+        delta = replica.sync()
+        poll_seconds, delta_rows = delta["seconds"], delta["rows"]
+        print(f"list of dicts:      {dict_bytes / count:8.0f} B/profile  "
+              f"{dict_bytes / count * 100000 / 2 ** 20:7.1f} MiB per 100k")
+
+    print(f"compact replica:    {used / count:8.0f} B/profile  {used / count * 100000 / 2 ** 20:7.1f} MiB per 100k "
+          f"({count} profiles, {len(replica.columns)} columns, {len(replica.strings)} interned values)")
+    print(f"full load:          {seconds * 1000:8.1f} ms (fetch, decode and build)")
+    print(f"delta poll:         {poll_seconds * 1000:8.1f} ms for {delta_rows} changed rows")
+    # A change lands uniformly within a poll interval and is visible once the next poll finishes
+    print(f"sync lag:           {(args.interval / 2 + poll_seconds) * 1000:8.1f} ms mean, "
+          f"{(args.interval + poll_seconds) * 1000:.1f} ms max at a {args.interval:g}s interval")
+
+    some_id = replica.ids[len(replica.ids) // 2]
+    print(f"first page after a poll:    {first_page_after_poll(replica):8.3f} ms")
+    print(f"page (50, offset 0):        {timed(lambda: replica.page(50)):8.3f} ms")
+    print(f"page (50, deep offset):     {timed(lambda: replica.page(50, offset=count // 2)):8.3f} ms")
+    print(f"filter company + year:      "
+          f"{timed(lambda: replica.page(50, company='Company 7', graduation_year=2001)):8.3f} ms")
+    print(f"name search:                {timed(lambda: replica.page(50, search='alum 12')):8.3f} ms")
+    print(f"lookup by id:               {timed(lambda: replica.get(some_id), runs=1000):8.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Measure backend cold-start time.
+
+Each run starts a fresh interpreter, imports backend.server and builds the app
+with create_app(). With --lifespan the startup hooks are run as well, which
+creates the Supabase clients and warms a connection (needs valid .env values).
+
+Usage:
+    python scripts/bench_startup.py --runs 10 [--lifespan]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+from backend.server import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+result = {"import": t1 - t0, "create_app": t2 - t1}
+if LIFESPAN:
+    async def run_lifespan():
+        async with app.router.lifespan_context(app):
+            result["lifespan_startup"] = time.perf_counter() - t2
+    asyncio.run(run_lifespan())
+result["total"] = time.perf_counter() - t0
+print(json.dumps(result))
+"""
+
+
+def run_once(lifespan: bool) -> dict:
+    code = CHILD.replace("LIFESPAN", repr(lifespan))
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT_DIR,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--lifespan", action="store_true", help="also run the startup hooks")
+    args = parser.parse_args()
+
+    runs = [run_once(args.lifespan) for _ in range(args.runs)]
+    print(f"Startup timings over {args.runs} runs (ms):")
+    for phase in runs[0]:
+        values = [run[phase] * 1000 for run in runs]
+        print(f"  {phase:<17} min {min(values):8.1f}  median {statistics.median(values):8.1f}  max {max(values):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
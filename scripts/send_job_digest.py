@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Email every alumnus the new jobs that best match their profile.
+
+Meant to run weekly from cron. The recommender index is built once and all
+profiles are scored against the jobs posted in the window in a single
+batched pass; only alumni with at least one match get an email.
+
+Usage:
+    python scripts/send_job_digest.py [--days 7] [--per-profile 5] [--dry-run]
+"""
+import argparse
+import html
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from backend.dependencies import supabase_admin  # noqa: E402
+from backend.external_integrations.email import send_email  # noqa: E402
+from backend.recommendations import job_recommender  # noqa: E402
+
+EMAIL_CHUNK_SIZE = 200
+
+
+def fetch_emails(profile_ids):
+    emails = {}
+    for start in range(0, len(profile_ids), EMAIL_CHUNK_SIZE):
+        chunk = profile_ids[start:start + EMAIL_CHUNK_SIZE]
+        response = supabase_admin.table("profiles").select("id, email, full_name").in_("id", chunk).execute()
+        emails.update({row["id"]: row for row in response.data or [] if row.get("email")})
+    return emails
+
+
+def render(profile, jobs):
+    items = "".join(
+        f"<li><strong>{html.escape(job['title'])}</strong> at {html.escape(job['company'])}"
+        f"{' - ' + html.escape(job['location']) if job.get('location') else ''}</li>"
+        for job in jobs
+    )
+    name = html.escape(profile.get("full_name") or "there")
+    return f"<p>Hi {name},</p><p>New jobs on the AMET Alumni Portal that match your profile:</p><ul>{items}</ul>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7, help="include jobs posted in the last N days")
+    parser.add_argument("--per-profile", type=int, default=5)
+    parser.add_argument("--dry-run", action="store_true", help="print recipients instead of sending")
+    args = parser.parse_args()
+
+    job_recommender.refresh(full=True)
+    since = (datetime.now(timezone.utc) - timedelta(days=args.days)).isoformat()
+    digests = job_recommender.digest(since, args.per_profile)
+    profiles = fetch_emails(list(digests))
+
+    sent = 0
+    for profile_id, jobs in digests.items():
+        profile = profiles.get(profile_id)
+        if profile is None:
+            continue
+        if args.dry_run:
+            print(f"{profile['email']}: {', '.join(job['title'] for job in jobs)}")
+        else:
+            try:
+                send_email(profile["email"], "New jobs matching your profile", render(profile, jobs))
+            except Exception as e:
+                print(f"{profile['email']}: not sent ({e})")
+                continue
+            sent += 1
+    print(f"{len(digests)} alumni matched, {sent} emails sent")
+
+
+if __name__ == "__main__":
+    main()
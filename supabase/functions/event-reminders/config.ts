@@ -1,4 +0,0 @@
-export const SUPABASE_URL = Deno.env.get('SUPABASE_URL') ?? ''
-export const SUPABASE_ANON_KEY = Deno.env.get('SUPABASE_ANON_KEY') ?? ''
-export const WHATSAPP_PHONE_NUMBER = Deno.env.get('WHATSAPP_PHONE_NUMBER') ?? ''
-export const WHATSAPP_API_KEY = Deno.env.get('WHATSAPP_API_KEY') ?? ''
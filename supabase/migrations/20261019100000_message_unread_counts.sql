@@ -0,0 +1,143 @@
+-- Per-user unread message counters and bulk read receipts.
+-- The counter table is maintained by statement-level triggers on messages,
+-- so the unread badge can be served with a single primary-key lookup.
+
+CREATE TABLE IF NOT EXISTS public.message_unread_counts (
+    user_id UUID PRIMARY KEY REFERENCES public.profiles(id) ON DELETE CASCADE,
+    unread_count INTEGER NOT NULL DEFAULT 0 CHECK (unread_count >= 0),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+ALTER TABLE public.message_unread_counts ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own unread count" ON public.message_unread_counts;
+CREATE POLICY "Users can view their own unread count" ON public.message_unread_counts FOR SELECT USING (auth.uid() = user_id);
+
+-- Serves the per-thread update in mark_thread_read as an index range scan.
+CREATE INDEX IF NOT EXISTS idx_messages_unread_thread
+ON public.messages (recipient_id, sender_id, created_at)
+WHERE is_read = FALSE;
+
+CREATE OR REPLACE FUNCTION public.messages_unread_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO public.message_unread_counts AS c (user_id, unread_count)
+  SELECT recipient_id, COUNT(*)
+  FROM new_rows
+  WHERE recipient_id IS NOT NULL AND is_read = FALSE
+  GROUP BY recipient_id
+  ON CONFLICT (user_id)
+  DO UPDATE SET unread_count = c.unread_count + EXCLUDED.unread_count, updated_at = NOW();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.messages_unread_after_update()
+RETURNS TRIGGER AS $$
+BEGIN
+  WITH deltas AS (
+    SELECT recipient_id AS user_id, SUM(delta)::int AS delta
+    FROM (
+      SELECT o.recipient_id, -1 AS delta FROM old_rows o WHERE o.is_read = FALSE AND o.recipient_id IS NOT NULL
+      UNION ALL
+      SELECT n.recipient_id, 1 AS delta FROM new_rows n WHERE n.is_read = FALSE AND n.recipient_id IS NOT NULL
+    ) changes
+    GROUP BY recipient_id
+    HAVING SUM(delta) <> 0
+  ),
+  updated AS (
+    UPDATE public.message_unread_counts c
+    SET unread_count = GREATEST(c.unread_count + d.delta, 0), updated_at = NOW()
+    FROM deltas d
+    WHERE c.user_id = d.user_id
+    RETURNING c.user_id
+  )
+  INSERT INTO public.message_unread_counts (user_id, unread_count)
+  SELECT user_id, delta FROM deltas
+  WHERE delta > 0 AND user_id NOT IN (SELECT user_id FROM updated);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.messages_unread_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE public.message_unread_counts c
+  SET unread_count = GREATEST(c.unread_count - d.removed, 0), updated_at = NOW()
+  FROM (
+    SELECT recipient_id, COUNT(*) AS removed
+    FROM old_rows
+    WHERE recipient_id IS NOT NULL AND is_read = FALSE
+    GROUP BY recipient_id
+  ) d
+  WHERE c.user_id = d.recipient_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_messages_unread_insert ON public.messages;
+CREATE TRIGGER on_messages_unread_insert
+AFTER INSERT ON public.messages
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.messages_unread_after_insert();
+
+DROP TRIGGER IF EXISTS on_messages_unread_update ON public.messages;
+CREATE TRIGGER on_messages_unread_update
+AFTER UPDATE ON public.messages
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.messages_unread_after_update();
+
+DROP TRIGGER IF EXISTS on_messages_unread_delete ON public.messages;
+CREATE TRIGGER on_messages_unread_delete
+AFTER DELETE ON public.messages
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.messages_unread_after_delete();
+
+-- Mark every unread message from p_sender_id to p_recipient_id as read in a
+-- single statement, optionally bounded by a timestamp or a message id.
+CREATE OR REPLACE FUNCTION public.mark_thread_read(
+  p_recipient_id UUID,
+  p_sender_id UUID,
+  p_up_to TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  p_up_to_id UUID DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+  v_up_to TIMESTAMP WITH TIME ZONE := p_up_to;
+  v_updated INTEGER;
+BEGIN
+  IF p_up_to_id IS NOT NULL THEN
+    SELECT created_at INTO v_up_to
+    FROM public.messages
+    WHERE id = p_up_to_id AND recipient_id = p_recipient_id AND sender_id = p_sender_id;
+
+    IF v_up_to IS NULL THEN
+      RETURN 0;
+    END IF;
+  END IF;
+
+  UPDATE public.messages
+  SET is_read = TRUE, updated_at = NOW()
+  WHERE recipient_id = p_recipient_id
+    AND sender_id = p_sender_id
+    AND is_read = FALSE
+    AND (v_up_to IS NULL OR created_at <= v_up_to);
+
+  GET DIAGNOSTICS v_updated = ROW_COUNT;
+  RETURN v_updated;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Only the backend (service role) may mark threads read on a user's behalf.
+REVOKE EXECUTE ON FUNCTION public.mark_thread_read(UUID, UUID, TIMESTAMP WITH TIME ZONE, UUID) FROM PUBLIC, anon, authenticated;
+
+-- Backfill counters from the current mailbox state.
+INSERT INTO public.message_unread_counts (user_id, unread_count)
+SELECT recipient_id, COUNT(*)
+FROM public.messages
+WHERE is_read = FALSE AND recipient_id IS NOT NULL
+GROUP BY recipient_id
+ON CONFLICT (user_id) DO UPDATE SET unread_count = EXCLUDED.unread_count, updated_at = NOW();
@@ -0,0 +1,25 @@
+-- Indexes and a status rollup for the paginated incoming/outgoing
+-- mentorship request views.
+
+CREATE INDEX IF NOT EXISTS idx_mentorship_requests_mentor_status_created
+ON public.mentorship_requests (mentor_id, status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_mentorship_requests_mentee_status_created
+ON public.mentorship_requests (mentee_id, status, created_at DESC);
+
+-- Per-status counts for a user's incoming and outgoing requests. Each half
+-- is answered from one of the indexes above without touching the heap.
+CREATE OR REPLACE FUNCTION public.mentorship_request_status_counts(p_user_id UUID)
+RETURNS TABLE (direction TEXT, status TEXT, request_count INTEGER) AS $$
+  SELECT 'incoming', r.status, COUNT(*)::int
+  FROM public.mentorship_requests r
+  WHERE r.mentor_id = p_user_id
+  GROUP BY r.status
+  UNION ALL
+  SELECT 'outgoing', r.status, COUNT(*)::int
+  FROM public.mentorship_requests r
+  WHERE r.mentee_id = p_user_id
+  GROUP BY r.status;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.mentorship_request_status_counts(UUID) FROM PUBLIC, anon, authenticated;
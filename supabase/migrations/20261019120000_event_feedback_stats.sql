@@ -0,0 +1,126 @@
+-- Running per-event feedback aggregates, maintained in O(1) per feedback row
+-- so summaries and leaderboards never scan event_feedback.
+
+CREATE TABLE IF NOT EXISTS public.event_feedback_stats (
+    event_id UUID PRIMARY KEY REFERENCES public.events(id) ON DELETE CASCADE,
+    feedback_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum BIGINT NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
+    recommend_yes INTEGER NOT NULL DEFAULT 0,
+    recommend_no INTEGER NOT NULL DEFAULT 0,
+    average_rating NUMERIC GENERATED ALWAYS AS (
+        CASE WHEN feedback_count > 0 THEN rating_sum::numeric / feedback_count END
+    ) STORED,
+    recommend_ratio NUMERIC GENERATED ALWAYS AS (
+        CASE WHEN recommend_yes + recommend_no > 0 THEN recommend_yes::numeric / (recommend_yes + recommend_no) END
+    ) STORED,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+ALTER TABLE public.event_feedback_stats ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Event feedback stats are viewable by everyone" ON public.event_feedback_stats;
+CREATE POLICY "Event feedback stats are viewable by everyone" ON public.event_feedback_stats FOR SELECT USING (true);
+
+CREATE INDEX IF NOT EXISTS idx_event_feedback_stats_leaderboard
+ON public.event_feedback_stats (average_rating DESC, feedback_count DESC)
+WHERE feedback_count > 0;
+
+-- would_recommend is free text; map it to 1 (yes), -1 (no) or 0 (unanswered).
+CREATE OR REPLACE FUNCTION public.feedback_recommend_flag(p_value TEXT)
+RETURNS INTEGER AS $$
+  SELECT CASE
+    WHEN lower(trim(p_value)) IN ('yes', 'y', 'true', 't', '1') THEN 1
+    WHEN lower(trim(p_value)) IN ('no', 'n', 'false', 'f', '0') THEN -1
+    ELSE 0
+  END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one feedback row's contribution.
+CREATE OR REPLACE FUNCTION public.apply_event_feedback_delta(
+  p_event_id UUID, p_sign INTEGER, p_rating INTEGER, p_would_recommend TEXT
+)
+RETURNS void AS $$
+DECLARE
+  v_flag INTEGER := public.feedback_recommend_flag(p_would_recommend);
+BEGIN
+  IF p_event_id IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO public.event_feedback_stats AS s (
+    event_id, feedback_count, rating_sum,
+    rating_1, rating_2, rating_3, rating_4, rating_5,
+    recommend_yes, recommend_no
+  )
+  VALUES (
+    p_event_id, p_sign, p_sign * p_rating,
+    CASE WHEN p_rating = 1 THEN p_sign ELSE 0 END,
+    CASE WHEN p_rating = 2 THEN p_sign ELSE 0 END,
+    CASE WHEN p_rating = 3 THEN p_sign ELSE 0 END,
+    CASE WHEN p_rating = 4 THEN p_sign ELSE 0 END,
+    CASE WHEN p_rating = 5 THEN p_sign ELSE 0 END,
+    CASE WHEN v_flag = 1 THEN p_sign ELSE 0 END,
+    CASE WHEN v_flag = -1 THEN p_sign ELSE 0 END
+  )
+  ON CONFLICT (event_id)
+  DO UPDATE SET
+    feedback_count = s.feedback_count + EXCLUDED.feedback_count,
+    rating_sum = s.rating_sum + EXCLUDED.rating_sum,
+    rating_1 = s.rating_1 + EXCLUDED.rating_1,
+    rating_2 = s.rating_2 + EXCLUDED.rating_2,
+    rating_3 = s.rating_3 + EXCLUDED.rating_3,
+    rating_4 = s.rating_4 + EXCLUDED.rating_4,
+    rating_5 = s.rating_5 + EXCLUDED.rating_5,
+    recommend_yes = s.recommend_yes + EXCLUDED.recommend_yes,
+    recommend_no = s.recommend_no + EXCLUDED.recommend_no,
+    updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.event_feedback_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.apply_event_feedback_delta(OLD.event_id, -1, OLD.rating, OLD.would_recommend);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.apply_event_feedback_delta(NEW.event_id, 1, NEW.rating, NEW.would_recommend);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.apply_event_feedback_delta(UUID, INTEGER, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS on_event_feedback_stats ON public.event_feedback;
+CREATE TRIGGER on_event_feedback_stats
+AFTER INSERT OR UPDATE OR DELETE ON public.event_feedback
+FOR EACH ROW
+EXECUTE FUNCTION public.event_feedback_stats_trigger();
+
+-- Backfill from existing feedback.
+INSERT INTO public.event_feedback_stats (
+  event_id, feedback_count, rating_sum,
+  rating_1, rating_2, rating_3, rating_4, rating_5,
+  recommend_yes, recommend_no
+)
+SELECT
+  event_id,
+  COUNT(*),
+  SUM(rating),
+  COUNT(*) FILTER (WHERE rating = 1),
+  COUNT(*) FILTER (WHERE rating = 2),
+  COUNT(*) FILTER (WHERE rating = 3),
+  COUNT(*) FILTER (WHERE rating = 4),
+  COUNT(*) FILTER (WHERE rating = 5),
+  COUNT(*) FILTER (WHERE public.feedback_recommend_flag(would_recommend) = 1),
+  COUNT(*) FILTER (WHERE public.feedback_recommend_flag(would_recommend) = -1)
+FROM public.event_feedback
+WHERE event_id IS NOT NULL
+GROUP BY event_id
+ON CONFLICT (event_id) DO NOTHING;
@@ -0,0 +1,52 @@
+-- Content-addressed resume uploads with a single primary resume per user.
+
+ALTER TABLE public.user_resumes ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_user_resumes_user_hash
+ON public.user_resumes (user_id, content_hash);
+
+-- The UI used to set primaries in two separate updates, so some users have
+-- more than one. Keep the most recently updated one.
+UPDATE public.user_resumes r
+SET is_primary = FALSE
+FROM (
+  SELECT id, ROW_NUMBER() OVER (
+    PARTITION BY user_id ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id DESC
+  ) AS position
+  FROM public.user_resumes
+  WHERE is_primary
+) ranked
+WHERE r.id = ranked.id AND ranked.position > 1;
+
+-- At most one primary resume per user.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_resumes_one_primary
+ON public.user_resumes (user_id)
+WHERE is_primary;
+
+-- Make p_resume_id the user's only primary resume. Both updates run in the
+-- function's transaction, so readers never see zero or two primaries. All of
+-- the user's resumes are locked first, so concurrent calls for different
+-- resumes run one after the other instead of colliding on the unique index.
+CREATE OR REPLACE FUNCTION public.set_primary_resume(p_user_id UUID, p_resume_id UUID)
+RETURNS BOOLEAN AS $$
+BEGIN
+  PERFORM 1 FROM public.user_resumes WHERE user_id = p_user_id ORDER BY id FOR UPDATE;
+
+  PERFORM 1 FROM public.user_resumes WHERE id = p_resume_id AND user_id = p_user_id;
+  IF NOT FOUND THEN
+    RETURN FALSE;
+  END IF;
+
+  UPDATE public.user_resumes
+  SET is_primary = FALSE, updated_at = NOW()
+  WHERE user_id = p_user_id AND is_primary AND id <> p_resume_id;
+
+  UPDATE public.user_resumes
+  SET is_primary = TRUE, updated_at = NOW()
+  WHERE id = p_resume_id AND NOT is_primary;
+
+  RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.set_primary_resume(UUID, UUID) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,5 @@
+-- Resized avatar variants generated by the backend avatar pipeline.
+-- avatar_url keeps pointing at a display-size variant; list views use the thumbnail.
+
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS avatar_thumb_url TEXT;
+ALTER TABLE public.profiles ADD COLUMN IF NOT EXISTS avatar_variants JSONB;
@@ -0,0 +1,22 @@
+-- Likely duplicate profile pairs found by the backend MinHash/LSH scan,
+-- queued for admin review. Each pair is stored once, lower id first.
+
+CREATE TABLE IF NOT EXISTS public.profile_duplicate_candidates (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    profile_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+    duplicate_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+    score REAL NOT NULL,
+    matched_fields TEXT[] NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'dismissed', 'merged')),
+    reviewed_by UUID REFERENCES public.profiles(id) ON DELETE SET NULL,
+    reviewed_at TIMESTAMP WITH TIME ZONE,
+    detected_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+    UNIQUE (profile_id, duplicate_id),
+    CHECK (profile_id < duplicate_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_profile_duplicate_candidates_review
+ON public.profile_duplicate_candidates (status, score DESC);
+
+-- Only the service role reads or writes candidates; admins go through the API.
+ALTER TABLE public.profile_duplicate_candidates ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,60 @@
+-- Durable outbox for outgoing email and WhatsApp notifications. The API only
+-- inserts rows; a separate worker process (backend/outbox_worker.py) claims
+-- due rows, calls the provider and records the outcome.
+
+CREATE TABLE IF NOT EXISTS public.notification_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    channel TEXT NOT NULL CHECK (channel IN ('email', 'whatsapp')),
+    payload JSONB NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sending', 'sent', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 8,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_by TEXT,
+    locked_until TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    provider_result TEXT,
+    sent_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+-- Only the service role touches the outbox.
+ALTER TABLE public.notification_outbox ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+ON public.notification_outbox (next_attempt_at)
+WHERE status = 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_leases
+ON public.notification_outbox (locked_until)
+WHERE status = 'sending';
+
+-- Claim up to p_limit due messages for p_worker. Rows whose worker died
+-- mid-delivery are reclaimed once their lease expires. SKIP LOCKED lets any
+-- number of workers claim concurrently without handing out a row twice.
+CREATE OR REPLACE FUNCTION public.claim_notification_outbox(
+  p_worker TEXT,
+  p_limit INTEGER,
+  p_lease_seconds INTEGER DEFAULT 120
+)
+RETURNS SETOF public.notification_outbox AS $$
+  UPDATE public.notification_outbox o
+  SET status = 'sending',
+      locked_by = p_worker,
+      locked_until = NOW() + make_interval(secs => p_lease_seconds),
+      attempts = o.attempts + 1,
+      updated_at = NOW()
+  WHERE o.id IN (
+    SELECT id FROM public.notification_outbox
+    WHERE (status = 'pending' AND next_attempt_at <= NOW())
+       OR (status = 'sending' AND locked_until < NOW())
+    ORDER BY next_attempt_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING o.*;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.claim_notification_outbox(TEXT, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
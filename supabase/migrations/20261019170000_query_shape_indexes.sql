@@ -0,0 +1,50 @@
+-- Secondary indexes for the filters and sort orders the backend issues
+-- (backend/server.py, backend/routers/groups.py). Each index is named after
+-- the query it serves; scripts/check_query_plans.py EXPLAINs those queries
+-- against a seeded database and fails if any of them falls back to a
+-- sequential scan.
+--
+-- Already covered elsewhere, so not repeated here:
+--   event_attendees.event_id        UNIQUE (event_id, attendee_id)
+--   job_applications.job_id         UNIQUE (job_id, applicant_id)
+--   group_members (group_id, user_id) primary key
+--   mentorship_requests by mentor/mentee  20261019110000_mentorship_request_views
+-- mentors.is_available is left unindexed: get_mentors returns every
+-- available mentor with their profile, and for an unpaginated listing of
+-- that size a scan plus hash join beats any index on the flag.
+
+-- get_messages: sender_id = me OR recipient_id = me ORDER BY created_at DESC.
+-- The two halves are answered by a BitmapOr over these indexes.
+CREATE INDEX IF NOT EXISTS idx_messages_sender_created
+ON public.messages (sender_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_messages_recipient_created
+ON public.messages (recipient_id, created_at DESC);
+
+-- get_group_posts: group_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_group_posts_group_created
+ON public.group_posts (group_id, created_at DESC);
+
+-- get_jobs: newest first, by default only active postings
+CREATE INDEX IF NOT EXISTS idx_jobs_active_created
+ON public.jobs (created_at DESC)
+WHERE is_active = TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_jobs_created
+ON public.jobs (created_at DESC);
+
+-- get_events: upcoming events ordered by date
+CREATE INDEX IF NOT EXISTS idx_events_event_date
+ON public.events (event_date);
+
+-- get_user_profile / update_user_profile filter on profiles.user_id, which
+-- some deployed databases have and supabase_schema.sql does not.
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = 'profiles' AND column_name = 'user_id'
+  ) THEN
+    CREATE INDEX IF NOT EXISTS idx_profiles_user_id ON public.profiles (user_id);
+  END IF;
+END $$;
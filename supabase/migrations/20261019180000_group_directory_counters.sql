@@ -0,0 +1,141 @@
+-- Denormalized member/post counters on groups, so the group directory is
+-- served by one indexed query instead of a count per group. Counters are
+-- maintained by statement-level triggers in the same transaction as the
+-- membership or post change.
+
+ALTER TABLE public.groups ADD COLUMN IF NOT EXISTS member_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE public.groups ADD COLUMN IF NOT EXISTS post_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE public.groups ADD COLUMN IF NOT EXISTS last_post_at TIMESTAMP WITH TIME ZONE;
+
+-- One index per directory sort (members, recent activity, name); only
+-- public groups are listed. id breaks ties so pages are stable.
+CREATE INDEX IF NOT EXISTS idx_groups_directory_members
+ON public.groups (member_count DESC, id)
+WHERE is_private = FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_groups_directory_activity
+ON public.groups (last_post_at DESC NULLS LAST, id)
+WHERE is_private = FALSE;
+
+CREATE INDEX IF NOT EXISTS idx_groups_directory_name
+ON public.groups (name, id)
+WHERE is_private = FALSE;
+
+CREATE OR REPLACE FUNCTION public.group_members_count_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE public.groups g
+  SET member_count = g.member_count + d.added
+  FROM (SELECT group_id, COUNT(*) AS added FROM new_rows GROUP BY group_id) d
+  WHERE g.id = d.group_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.group_members_count_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE public.groups g
+  SET member_count = GREATEST(g.member_count - d.removed, 0)
+  FROM (SELECT group_id, COUNT(*) AS removed FROM old_rows GROUP BY group_id) d
+  WHERE g.id = d.group_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.group_posts_count_after_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE public.groups g
+  SET post_count = g.post_count + d.added,
+      last_post_at = GREATEST(g.last_post_at, d.latest)
+  FROM (SELECT group_id, COUNT(*) AS added, MAX(created_at) AS latest FROM new_rows GROUP BY group_id) d
+  WHERE g.id = d.group_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- last_post_at is recomputed for the affected groups only, from
+-- idx_group_posts_group_created.
+CREATE OR REPLACE FUNCTION public.group_posts_count_after_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE public.groups g
+  SET post_count = GREATEST(g.post_count - d.removed, 0),
+      last_post_at = (
+        SELECT p.created_at FROM public.group_posts p
+        WHERE p.group_id = g.id
+        ORDER BY p.created_at DESC
+        LIMIT 1
+      )
+  FROM (SELECT group_id, COUNT(*) AS removed FROM old_rows GROUP BY group_id) d
+  WHERE g.id = d.group_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_group_members_count_insert ON public.group_members;
+CREATE TRIGGER on_group_members_count_insert
+AFTER INSERT ON public.group_members
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.group_members_count_after_insert();
+
+DROP TRIGGER IF EXISTS on_group_members_count_delete ON public.group_members;
+CREATE TRIGGER on_group_members_count_delete
+AFTER DELETE ON public.group_members
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.group_members_count_after_delete();
+
+DROP TRIGGER IF EXISTS on_group_posts_count_insert ON public.group_posts;
+CREATE TRIGGER on_group_posts_count_insert
+AFTER INSERT ON public.group_posts
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.group_posts_count_after_insert();
+
+DROP TRIGGER IF EXISTS on_group_posts_count_delete ON public.group_posts;
+CREATE TRIGGER on_group_posts_count_delete
+AFTER DELETE ON public.group_posts
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.group_posts_count_after_delete();
+
+-- Create a group and its creator's admin membership in one transaction.
+CREATE OR REPLACE FUNCTION public.create_group_with_owner(
+  p_name TEXT,
+  p_description TEXT,
+  p_is_private BOOLEAN,
+  p_created_by UUID
+)
+RETURNS SETOF public.groups AS $$
+DECLARE
+  v_group_id UUID;
+BEGIN
+  INSERT INTO public.groups (name, description, is_private, created_by)
+  VALUES (p_name, p_description, COALESCE(p_is_private, FALSE), p_created_by)
+  RETURNING id INTO v_group_id;
+
+  INSERT INTO public.group_members (group_id, user_id, role)
+  VALUES (v_group_id, p_created_by, 'admin');
+
+  RETURN QUERY SELECT * FROM public.groups WHERE id = v_group_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.create_group_with_owner(TEXT, TEXT, BOOLEAN, UUID) FROM PUBLIC, anon, authenticated;
+
+-- Backfill counters from existing memberships and posts.
+UPDATE public.groups g
+SET member_count = COALESCE(m.member_count, 0),
+    post_count = COALESCE(p.post_count, 0),
+    last_post_at = p.last_post_at
+FROM public.groups g2
+LEFT JOIN (
+  SELECT group_id, COUNT(*) AS member_count FROM public.group_members GROUP BY group_id
+) m ON m.group_id = g2.id
+LEFT JOIN (
+  SELECT group_id, COUNT(*) AS post_count, MAX(created_at) AS last_post_at FROM public.group_posts GROUP BY group_id
+) p ON p.group_id = g2.id
+WHERE g.id = g2.id;
@@ -0,0 +1,158 @@
+-- Keyset-paginated attendee lists and per-event attendance counters, so
+-- organizer and check-in pages cost the same for a 30- or 3,000-person event.
+
+-- Pagination orders by (registration_date, id), which needs a value on every row.
+UPDATE public.event_attendees
+SET registration_date = TIMEZONE('utc', NOW())
+WHERE registration_date IS NULL;
+
+ALTER TABLE public.event_attendees ALTER COLUMN registration_date SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_event_attendees_event_registered
+ON public.event_attendees (event_id, registration_date, id);
+
+CREATE INDEX IF NOT EXISTS idx_event_attendees_event_status_registered
+ON public.event_attendees (event_id, attendance_status, registration_date, id);
+
+CREATE TABLE IF NOT EXISTS public.event_attendance_stats (
+    event_id UUID PRIMARY KEY REFERENCES public.events(id) ON DELETE CASCADE,
+    registered INTEGER NOT NULL DEFAULT 0,
+    attended INTEGER NOT NULL DEFAULT 0,
+    canceled INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+ALTER TABLE public.event_attendance_stats ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Event attendance stats are viewable by everyone" ON public.event_attendance_stats;
+CREATE POLICY "Event attendance stats are viewable by everyone" ON public.event_attendance_stats FOR SELECT USING (true);
+
+-- Add (p_sign = 1) or remove (p_sign = -1) a batch of attendee rows' contribution.
+-- attendance_status is compared as text: some databases declare it as the
+-- rsvp_status enum used by rsvp_to_event.
+CREATE OR REPLACE FUNCTION public.apply_event_attendance_changes(
+  p_event_ids UUID[], p_statuses TEXT[], p_sign INTEGER
+)
+RETURNS void AS $$
+BEGIN
+  INSERT INTO public.event_attendance_stats AS s (event_id, registered, attended, canceled)
+  SELECT
+    c.event_id,
+    p_sign * COUNT(*) FILTER (WHERE c.status = 'registered'),
+    p_sign * COUNT(*) FILTER (WHERE c.status = 'attended'),
+    p_sign * COUNT(*) FILTER (WHERE c.status = 'canceled')
+  FROM unnest(p_event_ids, p_statuses) AS c(event_id, status)
+  WHERE c.event_id IS NOT NULL
+  GROUP BY c.event_id
+  ON CONFLICT (event_id)
+  DO UPDATE SET
+    registered = s.registered + EXCLUDED.registered,
+    attended = s.attended + EXCLUDED.attended,
+    canceled = s.canceled + EXCLUDED.canceled,
+    updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.event_attendance_stats_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.apply_event_attendance_changes(array_agg(event_id), array_agg(attendance_status::text), -1)
+    FROM old_rows;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.apply_event_attendance_changes(array_agg(event_id), array_agg(attendance_status::text), 1)
+    FROM new_rows;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.apply_event_attendance_changes(UUID[], TEXT[], INTEGER) FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS on_event_attendance_stats_insert ON public.event_attendees;
+CREATE TRIGGER on_event_attendance_stats_insert
+AFTER INSERT ON public.event_attendees
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.event_attendance_stats_trigger();
+
+DROP TRIGGER IF EXISTS on_event_attendance_stats_update ON public.event_attendees;
+CREATE TRIGGER on_event_attendance_stats_update
+AFTER UPDATE ON public.event_attendees
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.event_attendance_stats_trigger();
+
+DROP TRIGGER IF EXISTS on_event_attendance_stats_delete ON public.event_attendees;
+CREATE TRIGGER on_event_attendance_stats_delete
+AFTER DELETE ON public.event_attendees
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.event_attendance_stats_trigger();
+
+-- One page of an event's attendees in registration order, with only the
+-- profile fields a name list needs. Pass the last row's registration_date
+-- and id to get the next page; each page is an index seek.
+CREATE OR REPLACE FUNCTION public.event_attendees_page(
+  p_event_id UUID,
+  p_status TEXT DEFAULT NULL,
+  p_after_registered TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  p_after_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS TABLE (
+  id UUID,
+  attendee_id UUID,
+  attendance_status TEXT,
+  registration_date TIMESTAMP WITH TIME ZONE,
+  full_name TEXT,
+  avatar_url TEXT,
+  avatar_thumb_url TEXT,
+  graduation_year INTEGER,
+  company TEXT,
+  job_title TEXT
+) AS $$
+DECLARE
+  v_after_registered TIMESTAMP WITH TIME ZONE := COALESCE(p_after_registered, '-infinity');
+  v_after_id UUID := COALESCE(p_after_id, '00000000-0000-0000-0000-000000000000');
+BEGIN
+  -- Separate statements so each gets the plan for its own index
+  IF p_status IS NULL THEN
+    RETURN QUERY
+    SELECT a.id, a.attendee_id, a.attendance_status::text, a.registration_date,
+           p.full_name, p.avatar_url, p.avatar_thumb_url, p.graduation_year, p.company, p.job_title
+    FROM public.event_attendees a
+    LEFT JOIN public.profiles p ON p.id = a.attendee_id
+    WHERE a.event_id = p_event_id
+      AND (a.registration_date, a.id) > (v_after_registered, v_after_id)
+    ORDER BY a.registration_date, a.id
+    LIMIT p_limit;
+  ELSE
+    RETURN QUERY
+    SELECT a.id, a.attendee_id, a.attendance_status::text, a.registration_date,
+           p.full_name, p.avatar_url, p.avatar_thumb_url, p.graduation_year, p.company, p.job_title
+    FROM public.event_attendees a
+    LEFT JOIN public.profiles p ON p.id = a.attendee_id
+    WHERE a.event_id = p_event_id
+      AND a.attendance_status::text = p_status
+      AND (a.registration_date, a.id) > (v_after_registered, v_after_id)
+    ORDER BY a.registration_date, a.id
+    LIMIT p_limit;
+  END IF;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.event_attendees_page(UUID, TEXT, TIMESTAMP WITH TIME ZONE, UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+
+-- Backfill counters from existing registrations.
+INSERT INTO public.event_attendance_stats (event_id, registered, attended, canceled)
+SELECT
+  event_id,
+  COUNT(*) FILTER (WHERE attendance_status = 'registered'),
+  COUNT(*) FILTER (WHERE attendance_status = 'attended'),
+  COUNT(*) FILTER (WHERE attendance_status = 'canceled')
+FROM public.event_attendees
+WHERE event_id IS NOT NULL
+GROUP BY event_id
+ON CONFLICT (event_id) DO NOTHING;
@@ -0,0 +1,65 @@
+-- Bulk door check-in. A batch of scans is applied as one set-based upsert
+-- with the same insert-or-update semantics as rsvp_to_event (walk-ins get
+-- a row, registered or canceled attendees become 'attended'). Rows that are
+-- already 'attended' are left untouched, so replaying a batch after a
+-- dropped connection changes nothing and reports nothing new.
+
+ALTER TABLE public.event_attendees ADD COLUMN IF NOT EXISTS checked_in_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE public.event_attendees ADD COLUMN IF NOT EXISTS checked_in_by UUID REFERENCES public.profiles(id) ON DELETE SET NULL;
+
+-- Returns one row per distinct scanned id: outcome is 'checked_in',
+-- 'walk_in', 'already_checked_in' or 'unknown' (no such profile), and
+-- previous_status is the attendee's status before the batch.
+CREATE OR REPLACE FUNCTION public.check_in_attendees(
+  p_event_id UUID,
+  p_attendee_ids UUID[],
+  p_scanned_at TIMESTAMP WITH TIME ZONE[],
+  p_checked_in_by UUID
+)
+RETURNS TABLE (attendee_id UUID, outcome TEXT, previous_status TEXT) AS $$
+  WITH scans AS (
+    -- A batch may scan the same badge twice; the earliest scan wins
+    SELECT DISTINCT ON (s.attendee_id)
+           s.attendee_id, LEAST(COALESCE(s.scanned_at, NOW()), NOW()) AS scanned_at
+    FROM unnest(p_attendee_ids, p_scanned_at) AS s(attendee_id, scanned_at)
+    WHERE s.attendee_id IS NOT NULL
+    ORDER BY s.attendee_id, s.scanned_at
+  ),
+  known AS (
+    SELECT scans.* FROM scans
+    WHERE EXISTS (SELECT 1 FROM public.profiles p WHERE p.id = scans.attendee_id)
+  ),
+  previous AS (
+    SELECT a.attendee_id, a.attendance_status::text AS status
+    FROM public.event_attendees a
+    JOIN known k ON k.attendee_id = a.attendee_id
+    WHERE a.event_id = p_event_id
+  ),
+  applied AS (
+    INSERT INTO public.event_attendees AS a (event_id, attendee_id, attendance_status, checked_in_at, checked_in_by)
+    SELECT p_event_id, k.attendee_id, 'attended', k.scanned_at, p_checked_in_by
+    FROM known k
+    ON CONFLICT (event_id, attendee_id)
+    DO UPDATE SET
+      attendance_status = EXCLUDED.attendance_status,
+      checked_in_at = EXCLUDED.checked_in_at,
+      checked_in_by = EXCLUDED.checked_in_by
+    WHERE a.attendance_status::text IS DISTINCT FROM 'attended'
+    RETURNING a.attendee_id
+  )
+  SELECT
+    s.attendee_id,
+    CASE
+      WHEN k.attendee_id IS NULL THEN 'unknown'
+      WHEN ap.attendee_id IS NULL THEN 'already_checked_in'
+      WHEN pr.attendee_id IS NULL THEN 'walk_in'
+      ELSE 'checked_in'
+    END,
+    pr.status
+  FROM scans s
+  LEFT JOIN known k ON k.attendee_id = s.attendee_id
+  LEFT JOIN applied ap ON ap.attendee_id = s.attendee_id
+  LEFT JOIN previous pr ON pr.attendee_id = s.attendee_id;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.check_in_attendees(UUID, UUID[], TIMESTAMP WITH TIME ZONE[], UUID) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,158 @@
+-- Employer applicant pipeline: keyset-paginated applications with per-status
+-- counts, and bulk status transitions. Both functions check that the caller
+-- posted the job inside the same statement that reads or writes the rows.
+-- A non-owner gets SQLSTATE 42501 and a missing job P0002.
+
+UPDATE public.job_applications
+SET application_date = TIMEZONE('utc', NOW())
+WHERE application_date IS NULL;
+
+ALTER TABLE public.job_applications ALTER COLUMN application_date SET NOT NULL;
+
+-- The column default; rows from before it existed count as submitted
+UPDATE public.job_applications
+SET status = 'submitted'
+WHERE status IS NULL;
+
+ALTER TABLE public.job_applications ALTER COLUMN status SET NOT NULL;
+
+ALTER TABLE public.job_applications ADD COLUMN IF NOT EXISTS status_updated_at TIMESTAMP WITH TIME ZONE;
+
+-- Newest applications first, optionally within one status
+CREATE INDEX IF NOT EXISTS idx_job_applications_job_date
+ON public.job_applications (job_id, application_date DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_job_applications_job_status_date
+ON public.job_applications (job_id, status, application_date DESC, id DESC);
+
+CREATE OR REPLACE FUNCTION public.assert_job_owner(p_job_id UUID, p_owner_id UUID)
+RETURNS void AS $$
+DECLARE
+  v_posted_by UUID;
+BEGIN
+  SELECT posted_by INTO v_posted_by FROM public.jobs WHERE id = p_job_id;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Job not found' USING ERRCODE = 'P0002';
+  END IF;
+  IF v_posted_by IS DISTINCT FROM p_owner_id THEN
+    RAISE EXCEPTION 'Access denied' USING ERRCODE = '42501';
+  END IF;
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+-- One page of a job's applications (newest first) with applicant summaries,
+-- plus the per-status counts for the whole job. Pass the last row's
+-- application_date and id to get the next page.
+CREATE OR REPLACE FUNCTION public.job_applications_page(
+  p_job_id UUID,
+  p_owner_id UUID,
+  p_status TEXT DEFAULT NULL,
+  p_before_date TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  p_before_id UUID DEFAULT NULL,
+  p_limit INTEGER DEFAULT 50
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_before_date TIMESTAMP WITH TIME ZONE := COALESCE(p_before_date, 'infinity');
+  v_before_id UUID := COALESCE(p_before_id, 'ffffffff-ffff-ffff-ffff-ffffffffffff');
+  v_items JSONB;
+  v_counts JSONB;
+BEGIN
+  PERFORM public.assert_job_owner(p_job_id, p_owner_id);
+
+  -- Separate statements so each gets the plan for its own index
+  IF p_status IS NULL THEN
+    SELECT COALESCE(jsonb_agg(page ORDER BY page.application_date DESC, page.id DESC), '[]'::jsonb)
+    INTO v_items
+    FROM (
+      SELECT a.id, a.applicant_id, a.status, a.application_date, a.status_updated_at,
+             a.resume_url, a.cover_letter,
+             jsonb_build_object(
+               'full_name', p.full_name, 'email', p.email, 'avatar_url', p.avatar_url,
+               'avatar_thumb_url', p.avatar_thumb_url, 'graduation_year', p.graduation_year,
+               'company', p.company, 'job_title', p.job_title, 'linkedin_url', p.linkedin_url
+             ) AS applicant
+      FROM public.job_applications a
+      LEFT JOIN public.profiles p ON p.id = a.applicant_id
+      WHERE a.job_id = p_job_id
+        AND (a.application_date, a.id) < (v_before_date, v_before_id)
+      ORDER BY a.application_date DESC, a.id DESC
+      LIMIT p_limit
+    ) page;
+  ELSE
+    SELECT COALESCE(jsonb_agg(page ORDER BY page.application_date DESC, page.id DESC), '[]'::jsonb)
+    INTO v_items
+    FROM (
+      SELECT a.id, a.applicant_id, a.status, a.application_date, a.status_updated_at,
+             a.resume_url, a.cover_letter,
+             jsonb_build_object(
+               'full_name', p.full_name, 'email', p.email, 'avatar_url', p.avatar_url,
+               'avatar_thumb_url', p.avatar_thumb_url, 'graduation_year', p.graduation_year,
+               'company', p.company, 'job_title', p.job_title, 'linkedin_url', p.linkedin_url
+             ) AS applicant
+      FROM public.job_applications a
+      LEFT JOIN public.profiles p ON p.id = a.applicant_id
+      WHERE a.job_id = p_job_id
+        AND a.status = p_status
+        AND (a.application_date, a.id) < (v_before_date, v_before_id)
+      ORDER BY a.application_date DESC, a.id DESC
+      LIMIT p_limit
+    ) page;
+  END IF;
+
+  SELECT COALESCE(jsonb_object_agg(status, n), '{}'::jsonb)
+  INTO v_counts
+  FROM (
+    SELECT status, COUNT(*) AS n
+    FROM public.job_applications
+    WHERE job_id = p_job_id
+    GROUP BY 1
+  ) c;
+
+  RETURN jsonb_build_object('items', v_items, 'counts', v_counts);
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER;
+
+-- Move many applications of one job to p_status in a single UPDATE. The
+-- join on jobs.posted_by enforces ownership row by row; the explicit check
+-- only runs when nothing changed, to tell "not yours" from "no-op".
+CREATE OR REPLACE FUNCTION public.set_job_application_status(
+  p_job_id UUID,
+  p_owner_id UUID,
+  p_application_ids UUID[],
+  p_status TEXT
+)
+RETURNS TABLE (application_id UUID, previous_status TEXT) AS $$
+DECLARE
+  v_found BOOLEAN := FALSE;
+BEGIN
+  FOR application_id, previous_status IN
+    WITH targets AS (
+      SELECT a.id, a.status
+      FROM public.job_applications a
+      JOIN public.jobs j ON j.id = a.job_id
+      WHERE a.job_id = p_job_id
+        AND j.posted_by = p_owner_id
+        AND a.id = ANY(p_application_ids)
+        AND a.status IS DISTINCT FROM p_status
+      FOR UPDATE OF a
+    )
+    UPDATE public.job_applications a
+    SET status = p_status, status_updated_at = NOW()
+    FROM targets t
+    WHERE a.id = t.id
+    RETURNING a.id, t.status
+  LOOP
+    v_found := TRUE;
+    RETURN NEXT;
+  END LOOP;
+
+  IF NOT v_found THEN
+    PERFORM public.assert_job_owner(p_job_id, p_owner_id);
+  END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.assert_job_owner(UUID, UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.job_applications_page(UUID, UUID, TEXT, TIMESTAMP WITH TIME ZONE, UUID, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.set_job_application_status(UUID, UUID, UUID[], TEXT) FROM PUBLIC, anon, authenticated;
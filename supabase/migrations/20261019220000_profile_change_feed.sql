@@ -0,0 +1,31 @@
+-- Incremental profile sync for the in-process directory replicas
+-- (backend/directory.py) and the other profile indexes: every change bumps
+-- profiles.updated_at, and "changed since <watermark>" is an index range scan.
+-- Until a worker's replica has loaded, directory pages are read from the
+-- database in name order.
+
+CREATE OR REPLACE FUNCTION public.touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS on_profiles_touch_updated_at ON public.profiles;
+CREATE TRIGGER on_profiles_touch_updated_at
+BEFORE UPDATE ON public.profiles
+FOR EACH ROW
+WHEN (OLD.* IS DISTINCT FROM NEW.*)
+EXECUTE FUNCTION public.touch_updated_at();
+
+UPDATE public.profiles
+SET updated_at = COALESCE(created_at, TIMEZONE('utc', NOW()))
+WHERE updated_at IS NULL;
+
+-- Pollers page through changes ordered by (updated_at, id)
+CREATE INDEX IF NOT EXISTS idx_profiles_updated
+ON public.profiles (updated_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_profiles_directory_name
+ON public.profiles (full_name, id);
@@ -0,0 +1,45 @@
+-- Leader lease for the in-process job scheduler (backend/scheduler.py). Every
+-- API worker runs the scheduler; only the holder of the 'scheduler' lease
+-- runs leader-only jobs. The backend reaches Postgres through PostgREST, where
+-- each call may use a different connection, so a session advisory lock can't
+-- be held across calls: the lease is a row with an expiry instead.
+
+CREATE TABLE IF NOT EXISTS public.scheduler_leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    acquired_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Only the service role touches leases.
+ALTER TABLE public.scheduler_leases ENABLE ROW LEVEL SECURITY;
+
+-- Take or renew p_name for p_holder. Succeeds when the lease is free, expired
+-- or already ours; the row lock taken by ON CONFLICT makes concurrent
+-- attempts resolve to a single winner.
+CREATE OR REPLACE FUNCTION public.acquire_scheduler_lease(
+  p_name TEXT,
+  p_holder TEXT,
+  p_lease_seconds INTEGER
+)
+RETURNS BOOLEAN AS $$
+  WITH acquired AS (
+    INSERT INTO public.scheduler_leases AS l (name, holder, expires_at)
+    VALUES (p_name, p_holder, NOW() + make_interval(secs => p_lease_seconds))
+    ON CONFLICT (name) DO UPDATE
+    SET holder = EXCLUDED.holder,
+        expires_at = EXCLUDED.expires_at,
+        acquired_at = CASE WHEN l.holder = EXCLUDED.holder THEN l.acquired_at ELSE NOW() END
+    WHERE l.holder = EXCLUDED.holder OR l.expires_at < NOW()
+    RETURNING 1
+  )
+  SELECT EXISTS (SELECT 1 FROM acquired);
+$$ LANGUAGE sql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.release_scheduler_lease(p_name TEXT, p_holder TEXT)
+RETURNS void AS $$
+  DELETE FROM public.scheduler_leases WHERE name = p_name AND holder = p_holder;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.acquire_scheduler_lease(TEXT, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.release_scheduler_lease(TEXT, TEXT) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,177 @@
+-- Notifications for new group posts (backend/group_notifications.py). A new
+-- post is queued by trigger in the transaction that inserts it; the fan-out
+-- job resolves the group's members for a whole batch of queued posts in one
+-- statement and files a pending delivery per recipient, due at the end of
+-- that member's digest window. Due deliveries are claimed per recipient, so
+-- each recipient gets one message per window however busy their groups are.
+
+-- How each member wants to hear about new posts in a group
+ALTER TABLE public.group_members
+ADD COLUMN IF NOT EXISTS notify_mode TEXT NOT NULL DEFAULT 'daily'
+    CHECK (notify_mode IN ('immediate', 'hourly', 'daily', 'off')),
+ADD COLUMN IF NOT EXISTS notify_channel TEXT NOT NULL DEFAULT 'email'
+    CHECK (notify_channel IN ('email', 'whatsapp'));
+
+CREATE TABLE IF NOT EXISTS public.group_post_fanout_queue (
+    post_id UUID PRIMARY KEY REFERENCES public.group_posts(id) ON DELETE CASCADE,
+    group_id UUID NOT NULL,
+    author_id UUID,
+    enqueued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Pending notifications only: rows are deleted once their digest is queued in
+-- notification_outbox, which keeps the history.
+CREATE TABLE IF NOT EXISTS public.group_post_deliveries (
+    recipient_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+    post_id UUID NOT NULL REFERENCES public.group_posts(id) ON DELETE CASCADE,
+    group_id UUID NOT NULL,
+    channel TEXT NOT NULL CHECK (channel IN ('email', 'whatsapp')),
+    due_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    digest_key TEXT,
+    locked_until TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (recipient_id, post_id)
+);
+
+-- Only the service role touches the queue and deliveries.
+ALTER TABLE public.group_post_fanout_queue ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.group_post_deliveries ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_group_post_fanout_queue_enqueued
+ON public.group_post_fanout_queue (enqueued_at);
+
+CREATE INDEX IF NOT EXISTS idx_group_post_deliveries_due
+ON public.group_post_deliveries (due_at);
+
+CREATE INDEX IF NOT EXISTS idx_group_post_deliveries_digest
+ON public.group_post_deliveries (digest_key)
+WHERE digest_key IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION public.group_posts_enqueue_fanout()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO public.group_post_fanout_queue (post_id, group_id, author_id)
+  SELECT id, group_id, user_id FROM new_rows
+  WHERE group_id IS NOT NULL;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_group_posts_enqueue_fanout ON public.group_posts;
+CREATE TRIGGER on_group_posts_enqueue_fanout
+AFTER INSERT ON public.group_posts
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.group_posts_enqueue_fanout();
+
+-- Take up to p_limit queued posts (oldest first) and file a delivery for every
+-- member of their groups except the author and members who turned
+-- notifications off. Immediate deliveries are due now, hourly ones at the top
+-- of the next hour and daily ones at the next midnight UTC; deliveries
+-- sharing a window are sent as one digest. SKIP LOCKED keeps concurrent runs
+-- from fanning out a post twice.
+CREATE OR REPLACE FUNCTION public.fan_out_group_posts(p_limit INTEGER DEFAULT 200)
+RETURNS TABLE (posts INTEGER, deliveries INTEGER) AS $$
+  WITH taken AS (
+    DELETE FROM public.group_post_fanout_queue q
+    WHERE q.post_id IN (
+      SELECT post_id FROM public.group_post_fanout_queue
+      ORDER BY enqueued_at
+      LIMIT p_limit
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING q.post_id, q.group_id, q.author_id
+  ), filed AS (
+    INSERT INTO public.group_post_deliveries (recipient_id, post_id, group_id, channel, due_at)
+    SELECT m.user_id, t.post_id, t.group_id, m.notify_channel,
+           CASE m.notify_mode
+             WHEN 'immediate' THEN NOW()
+             WHEN 'hourly' THEN date_trunc('hour', NOW(), 'UTC') + INTERVAL '1 hour'
+             ELSE date_trunc('day', NOW(), 'UTC') + INTERVAL '1 day'
+           END
+    FROM taken t
+    JOIN public.group_members m ON m.group_id = t.group_id
+    WHERE m.notify_mode <> 'off'
+      AND m.user_id IS DISTINCT FROM t.author_id
+    ON CONFLICT DO NOTHING
+    RETURNING 1
+  )
+  SELECT (SELECT COUNT(*)::INTEGER FROM taken), (SELECT COUNT(*)::INTEGER FROM filed);
+$$ LANGUAGE sql SECURITY DEFINER;
+
+-- Claim the due deliveries of up to p_recipients recipients, longest waiting
+-- first, one digest per recipient and channel. A digest gets its key on first
+-- claim and keeps it: if the caller dies before completing, the lease runs
+-- out and the rows are handed out again under the same key, together with
+-- any deliveries that came due since, so the recipient still gets a single
+-- message. Deliveries whose digest already reached the outbox (the caller
+-- died between queueing and completing) are dropped first rather than
+-- folded into a key the outbox would ignore. Posts are returned newest
+-- first with what the message needs, so the caller makes no further reads.
+CREATE OR REPLACE FUNCTION public.claim_group_post_digests(
+  p_recipients INTEGER,
+  p_lease_seconds INTEGER DEFAULT 300
+)
+RETURNS TABLE (
+  digest_key TEXT,
+  recipient_id UUID,
+  channel TEXT,
+  email TEXT,
+  phone TEXT,
+  full_name TEXT,
+  post_id UUID,
+  group_id UUID,
+  group_name TEXT,
+  author_name TEXT,
+  content TEXT,
+  posted_at TIMESTAMP WITH TIME ZONE
+) AS $$
+  DELETE FROM public.group_post_deliveries d
+  USING public.notification_outbox o
+  WHERE o.idempotency_key = 'group-digest:' || d.digest_key
+    AND d.due_at <= NOW()
+    AND (d.locked_until IS NULL OR d.locked_until < NOW());
+
+  WITH recipients AS (
+    SELECT d.recipient_id, d.channel, COALESCE(MAX(d.digest_key), uuid_generate_v4()::text) AS digest_key
+    FROM public.group_post_deliveries d
+    WHERE d.due_at <= NOW()
+      AND (d.locked_until IS NULL OR d.locked_until < NOW())
+    GROUP BY d.recipient_id, d.channel
+    ORDER BY MIN(d.due_at)
+    LIMIT p_recipients
+  ), claimed AS (
+    UPDATE public.group_post_deliveries d
+    SET digest_key = r.digest_key,
+        locked_until = NOW() + make_interval(secs => p_lease_seconds)
+    FROM recipients r
+    WHERE d.recipient_id = r.recipient_id
+      AND d.channel = r.channel
+      AND d.due_at <= NOW()
+      AND (d.locked_until IS NULL OR d.locked_until < NOW())
+    RETURNING d.digest_key, d.recipient_id, d.channel, d.post_id, d.group_id
+  )
+  SELECT c.digest_key, c.recipient_id, c.channel,
+         p.email, to_jsonb(p) ->> 'phone', p.full_name,
+         c.post_id, c.group_id, g.name, a.full_name, left(gp.content, 280), gp.created_at
+  FROM claimed c
+  JOIN public.profiles p ON p.id = c.recipient_id
+  JOIN public.group_posts gp ON gp.id = c.post_id
+  JOIN public.groups g ON g.id = c.group_id
+  LEFT JOIN public.profiles a ON a.id = gp.user_id
+  ORDER BY c.digest_key, gp.created_at DESC;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+-- Drop the deliveries of digests now queued in notification_outbox
+CREATE OR REPLACE FUNCTION public.complete_group_post_digests(p_digest_keys TEXT[])
+RETURNS INTEGER AS $$
+  WITH done AS (
+    DELETE FROM public.group_post_deliveries
+    WHERE digest_key = ANY(p_digest_keys)
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM done;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.fan_out_group_posts(INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.claim_group_post_digests(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.complete_group_post_digests(TEXT[]) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,168 @@
+-- Admin broadcasts to a cohort of alumni (backend/broadcasts.py). Recipients
+-- are the profiles matching a directory filter; their messages rows are
+-- written set-based, a chunk of recipients per call, walking profiles in id
+-- order. Each chunk also queues the optional email/WhatsApp notifications in
+-- notification_outbox and advances the broadcast's position and counters, all
+-- in one transaction, so a broadcast interrupted at any point resumes from
+-- the last committed chunk without skipping or repeating anyone.
+
+CREATE TABLE IF NOT EXISTS public.message_broadcasts (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    sender_id UUID REFERENCES public.profiles(id) ON DELETE SET NULL,
+    subject TEXT,
+    content TEXT NOT NULL,
+    filters JSONB NOT NULL DEFAULT '{}'::jsonb,
+    -- Pre-rendered notification email body; NULL sends no email
+    email_html TEXT,
+    -- WhatsApp template for the notification; NULL sends no WhatsApp message
+    whatsapp_template TEXT,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'completed', 'canceled')),
+    total_recipients INTEGER NOT NULL DEFAULT 0,
+    messages_sent INTEGER NOT NULL DEFAULT 0,
+    notifications_queued INTEGER NOT NULL DEFAULT 0,
+    -- Last recipient id written; the next chunk starts after it
+    last_recipient_id UUID,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW())
+);
+
+-- Only the service role touches broadcasts.
+ALTER TABLE public.message_broadcasts ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_message_broadcasts_created
+ON public.message_broadcasts (created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_message_broadcasts_unfinished
+ON public.message_broadcasts (updated_at)
+WHERE status IN ('queued', 'running');
+
+-- Profiles matching a broadcast filter, other than the sender. Text filters
+-- match case-insensitively, like the directory. Plain SQL and not SECURITY
+-- DEFINER, so it is inlined into its callers and the id-ordered walk in
+-- send_message_broadcast_chunk stays a primary-key index scan.
+CREATE OR REPLACE FUNCTION public.broadcast_recipients(p_filters JSONB, p_sender_id UUID)
+RETURNS SETOF public.profiles AS $$
+  SELECT p.*
+  FROM public.profiles p
+  WHERE p.id IS DISTINCT FROM p_sender_id
+    AND (p_filters->>'graduation_year' IS NULL OR p.graduation_year = (p_filters->>'graduation_year')::INTEGER)
+    AND (p_filters->>'company' IS NULL OR lower(p.company) = lower(p_filters->>'company'))
+    AND (p_filters->>'degree' IS NULL OR lower(p.degree) = lower(p_filters->>'degree'))
+    AND (p_filters->>'major' IS NULL OR lower(p.major) = lower(p_filters->>'major'))
+    AND (p_filters->>'location' IS NULL OR lower(p.location) = lower(p_filters->>'location'))
+    AND (p_filters->>'is_mentor' IS NULL OR p.is_mentor = (p_filters->>'is_mentor')::BOOLEAN);
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION public.count_broadcast_recipients(p_filters JSONB, p_sender_id UUID)
+RETURNS INTEGER AS $$
+  SELECT COUNT(*)::INTEGER FROM public.broadcast_recipients(p_filters, p_sender_id);
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.create_message_broadcast(
+  p_sender_id UUID,
+  p_subject TEXT,
+  p_content TEXT,
+  p_filters JSONB,
+  p_email_html TEXT DEFAULT NULL,
+  p_whatsapp_template TEXT DEFAULT NULL
+)
+RETURNS SETOF public.message_broadcasts AS $$
+  INSERT INTO public.message_broadcasts (
+    sender_id, subject, content, filters, email_html, whatsapp_template, total_recipients
+  )
+  VALUES (
+    p_sender_id, p_subject, p_content, p_filters, p_email_html, p_whatsapp_template,
+    public.count_broadcast_recipients(p_filters, p_sender_id)
+  )
+  RETURNING *;
+$$ LANGUAGE sql SECURITY DEFINER;
+
+-- Write the next p_limit recipients' messages and notifications and return
+-- the updated broadcast; it is 'completed' once a chunk comes up short. The
+-- broadcast row is locked for the whole chunk, so concurrent runners (the
+-- request that started the broadcast and the resume job) take turns
+-- instead of writing the same chunk twice.
+CREATE OR REPLACE FUNCTION public.send_message_broadcast_chunk(p_broadcast_id UUID, p_limit INTEGER)
+RETURNS SETOF public.message_broadcasts AS $$
+DECLARE
+  b public.message_broadcasts;
+  v_recipients INTEGER;
+  v_last UUID;
+  v_notifications INTEGER;
+BEGIN
+  SELECT * INTO b FROM public.message_broadcasts WHERE id = p_broadcast_id FOR UPDATE;
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Broadcast not found' USING ERRCODE = 'P0002';
+  END IF;
+  IF b.status NOT IN ('queued', 'running') THEN
+    RETURN NEXT b;
+    RETURN;
+  END IF;
+
+  WITH chunk AS (
+    SELECT r.id, r.email, r.full_name, to_jsonb(r) ->> 'phone' AS phone
+    FROM public.broadcast_recipients(b.filters, b.sender_id) r
+    WHERE b.last_recipient_id IS NULL OR r.id > b.last_recipient_id
+    ORDER BY r.id
+    LIMIT p_limit
+  ), sent AS (
+    INSERT INTO public.messages (sender_id, recipient_id, subject, content)
+    SELECT b.sender_id, c.id, b.subject, b.content FROM chunk c
+    RETURNING 1
+  ), emailed AS (
+    INSERT INTO public.notification_outbox (channel, payload, idempotency_key)
+    SELECT 'email',
+           jsonb_build_object(
+             'to_email', c.email,
+             'subject', COALESCE(b.subject, 'New message from the alumni office'),
+             'html_content', b.email_html
+           ),
+           'broadcast:' || b.id || ':' || c.id || ':email'
+    FROM chunk c
+    WHERE b.email_html IS NOT NULL AND c.email IS NOT NULL
+    ON CONFLICT (idempotency_key) DO NOTHING
+    RETURNING 1
+  ), texted AS (
+    INSERT INTO public.notification_outbox (channel, payload, idempotency_key)
+    SELECT 'whatsapp',
+           jsonb_build_object(
+             'to_number', c.phone,
+             'template_name', b.whatsapp_template,
+             'parameters', jsonb_build_object(
+               'name', COALESCE(c.full_name, 'there'),
+               'subject', COALESCE(b.subject, '')
+             )
+           ),
+           'broadcast:' || b.id || ':' || c.id || ':whatsapp'
+    FROM chunk c
+    WHERE b.whatsapp_template IS NOT NULL AND c.phone IS NOT NULL AND c.phone <> ''
+    ON CONFLICT (idempotency_key) DO NOTHING
+    RETURNING 1
+  )
+  SELECT (SELECT COUNT(*) FROM sent),
+         (SELECT id FROM chunk ORDER BY id DESC LIMIT 1),
+         (SELECT COUNT(*) FROM emailed) + (SELECT COUNT(*) FROM texted)
+  INTO v_recipients, v_last, v_notifications;
+
+  RETURN QUERY
+  UPDATE public.message_broadcasts
+  SET last_recipient_id = COALESCE(v_last, last_recipient_id),
+      messages_sent = messages_sent + v_recipients,
+      notifications_queued = notifications_queued + v_notifications,
+      status = CASE WHEN v_recipients < p_limit THEN 'completed' ELSE 'running' END,
+      started_at = COALESCE(started_at, NOW()),
+      completed_at = CASE WHEN v_recipients < p_limit THEN NOW() END,
+      last_error = NULL,
+      updated_at = NOW()
+  WHERE id = p_broadcast_id
+  RETURNING *;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE EXECUTE ON FUNCTION public.broadcast_recipients(JSONB, UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.count_broadcast_recipients(JSONB, UUID) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.create_message_broadcast(UUID, TEXT, TEXT, JSONB, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.send_message_broadcast_chunk(UUID, INTEGER) FROM PUBLIC, anon, authenticated;
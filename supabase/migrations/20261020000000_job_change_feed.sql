@@ -0,0 +1,56 @@
+-- Incremental job sync for the recommender (backend/recommendations.py), as
+-- 20261019220000_profile_change_feed.sql does for profiles: every change
+-- bumps jobs.updated_at, including edits and closures made directly through
+-- Supabase by the admin panel. Deleted rows leave a tombstone in
+-- row_tombstones, polled with the same watermark rule, so a deleted posting
+-- stops being recommended without waiting for the full rebuild.
+
+DROP TRIGGER IF EXISTS on_jobs_touch_updated_at ON public.jobs;
+CREATE TRIGGER on_jobs_touch_updated_at
+BEFORE UPDATE ON public.jobs
+FOR EACH ROW
+WHEN (OLD.* IS DISTINCT FROM NEW.*)
+EXECUTE FUNCTION public.touch_updated_at();
+
+UPDATE public.jobs
+SET updated_at = COALESCE(created_at, TIMEZONE('utc', NOW()))
+WHERE updated_at IS NULL;
+
+-- Pollers page through changes ordered by (updated_at, id)
+CREATE INDEX IF NOT EXISTS idx_jobs_updated
+ON public.jobs (updated_at, id);
+
+-- Ids of deleted rows, per table. In-process replicas only need them until
+-- their next full rebuild (hourly), so a week of history is kept.
+CREATE TABLE IF NOT EXISTS public.row_tombstones (
+    table_name TEXT NOT NULL,
+    id UUID NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (table_name, id)
+);
+
+-- Only the service role touches tombstones.
+ALTER TABLE public.row_tombstones ENABLE ROW LEVEL SECURITY;
+
+CREATE INDEX IF NOT EXISTS idx_row_tombstones_deleted
+ON public.row_tombstones (table_name, deleted_at, id);
+
+CREATE OR REPLACE FUNCTION public.record_row_tombstones()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO public.row_tombstones (table_name, id)
+  SELECT TG_TABLE_NAME, id FROM old_rows
+  ON CONFLICT (table_name, id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+
+  DELETE FROM public.row_tombstones
+  WHERE table_name = TG_TABLE_NAME AND deleted_at < NOW() - INTERVAL '7 days';
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_jobs_record_tombstones ON public.jobs;
+CREATE TRIGGER on_jobs_record_tombstones
+AFTER DELETE ON public.jobs
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.record_row_tombstones();
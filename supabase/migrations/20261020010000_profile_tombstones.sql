@@ -0,0 +1,12 @@
+-- Deleted profiles for the in-process directory replicas (backend/directory.py):
+-- each delete leaves a tombstone in row_tombstones (see
+-- 20261020000000_job_change_feed.sql), polled with the profile watermark, so
+-- a deleted profile leaves every worker's replica within one poll instead of
+-- at the next full resync.
+
+DROP TRIGGER IF EXISTS on_profiles_record_tombstones ON public.profiles;
+CREATE TRIGGER on_profiles_record_tombstones
+AFTER DELETE ON public.profiles
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.record_row_tombstones();
@@ -0,0 +1,28 @@
+import glob
+import os
+import tempfile
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.dependencies import get_current_user
+from backend.routers import avatars
+
+
+def spooled_uploads():
+    return set(glob.glob(os.path.join(tempfile.gettempdir(), "upload-*")))
+
+
+def test_rejected_upload_leaves_no_temp_file():
+    app = FastAPI()
+    app.include_router(avatars.router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    client = TestClient(app)
+    before = spooled_uploads()
+
+    response = client.post("/profile/avatar", json={"file": "not multipart"})
+    assert response.status_code == 400
+    response = client.post("/profile/avatar", files={"file": ("a.txt", b"hello", "text/plain")})
+    assert response.status_code == 415
+
+    assert spooled_uploads() - before == set()
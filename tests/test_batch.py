@@ -0,0 +1,43 @@
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from backend.dependencies import get_current_user
+from backend.routers import batch
+
+SLOW_SECONDS = 0.3
+
+
+def make_app():
+    app = FastAPI()
+    api_router = APIRouter(prefix="/api")
+
+    @api_router.get("/slow/{n}")
+    async def slow(n: int):
+        # Blocks the loop, like the handlers' synchronous supabase-py calls
+        time.sleep(SLOW_SECONDS)
+        return {"n": n}
+
+    api_router.include_router(batch.router)
+    app.include_router(api_router)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    return app
+
+
+def test_sub_requests_overlap():
+    client = TestClient(make_app())
+    started = time.perf_counter()
+    response = client.post("/api/batch", json={"requests": [{"path": f"/api/slow/{n}"} for n in range(4)]})
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert [item["body"] for item in response.json()["responses"]] == [{"n": n} for n in range(4)]
+    # Run one after another the four would take 4 * SLOW_SECONDS
+    assert elapsed < 2 * SLOW_SECONDS
+
+
+def test_rejects_non_get_and_nested_batches():
+    client = TestClient(make_app())
+    assert client.post("/api/batch", json={"requests": [{"method": "POST", "path": "/api/slow/1"}]}).status_code == 400
+    assert client.post("/api/batch", json={"requests": [{"path": "/api/batch"}]}).status_code == 400
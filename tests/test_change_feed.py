@@ -0,0 +1,86 @@
+import re
+
+from backend import change_feed
+
+
+def profile(n, updated_at="2026-01-01T00:00:00+00:00"):
+    return {"id": f"id-{n:04d}", "full_name": f"Alum {n:04d}", "updated_at": updated_at}
+
+
+class ProfilesQuery:
+    """Enough of the PostgREST builder for fetch_changed, over a list of rows"""
+
+    KEYSET = re.compile(r'updated_at\.gt\."(.+)",and\(updated_at\.eq\."(.+)",id\.gt\.(.+)\)')
+
+    def __init__(self, table):
+        self.table = table
+        self.predicates = []
+        self.count = None
+
+    def select(self, columns):
+        return self
+
+    def gte(self, column, value):
+        self.predicates.append(lambda row: row[column] >= value)
+        return self
+
+    def eq(self, column, value):
+        self.predicates.append(lambda row: row.get(column) == value)
+        return self
+
+    def or_(self, filters):
+        updated_at, _, profile_id = self.KEYSET.fullmatch(filters).groups()
+        self.predicates.append(lambda row: (row["updated_at"], row["id"]) > (updated_at, profile_id))
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    def execute(self):
+        rows = sorted((row for row in self.table.rows if all(p(row) for p in self.predicates)),
+                      key=lambda row: (row["updated_at"], row["id"]))[:self.count]
+        self.table.pages_read += 1
+        if self.table.pages_read == 1:
+            # A profile on the first page is updated while the rest are read
+            self.table.rows[0] = {**self.table.rows[0], "updated_at": "2026-01-02T00:00:00+00:00"}
+        return type("Response", (), {"data": [dict(row) for row in rows]})()
+
+
+class ProfilesTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pages_read = 0
+
+    def table(self, name):
+        return ProfilesQuery(self)
+
+
+def test_fetch_does_not_skip_rows_updated_while_paging(monkeypatch):
+    monkeypatch.setattr(change_feed, "PAGE_SIZE", 10)
+    rows = [profile(n) for n in range(35)]
+    monkeypatch.setattr(change_feed, "supabase_admin", ProfilesTable(rows))
+
+    fetched = change_feed.fetch_changed("profiles")
+
+    assert {row["id"] for row in fetched} == {row["id"] for row in rows}
+    # The updated profile is read again with its new timestamp
+    assert fetched[-1] == {**profile(0), "updated_at": "2026-01-02T00:00:00+00:00"}
+
+
+def test_fetch_applies_equality_filters_on_every_page(monkeypatch):
+    monkeypatch.setattr(change_feed, "PAGE_SIZE", 10)
+    rows = [{**profile(n), "is_active": n % 3 != 0} for n in range(35)]
+    monkeypatch.setattr(change_feed, "supabase_admin", ProfilesTable(rows))
+
+    fetched = change_feed.fetch_changed("jobs", equals={"is_active": True})
+
+    assert sorted(row["id"] for row in fetched) == [f"id-{n:04d}" for n in range(35) if n % 3]
+
+
+def test_polls_start_an_overlap_before_the_watermark():
+    assert change_feed.poll_since(None) is None
+    assert change_feed.poll_since("2026-01-01T00:00:10.5+00:00") == "2025-12-31T23:59:40.500000+00:00"
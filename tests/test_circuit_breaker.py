@@ -0,0 +1,21 @@
+from fastapi.testclient import TestClient
+
+from backend import server
+from backend.resilience import CircuitOpenError
+from backend.routers import groups
+
+
+class DownClient:
+    def table(self, name):
+        raise CircuitOpenError("postgrest", 12.4)
+
+
+def test_open_breaker_is_a_503_not_a_500(monkeypatch):
+    monkeypatch.setattr(groups, "supabase_admin", DownClient())
+    client = TestClient(server.create_app())
+
+    response = client.get("/api/groups/")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "12"
+    assert "postgrest is unavailable" in response.json()["detail"]
@@ -0,0 +1,32 @@
+import pytest
+from fastapi import HTTPException
+
+from backend.server import _decode_cursor, _encode_cursor
+
+ROW_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+
+
+@pytest.mark.parametrize("sort_value", [
+    "2026-03-04T10:15:00+00:00",
+    "2026-03-04T10:15:00.123456+00:00",
+    "2026-03-04T10:15:00",
+])
+def test_cursor_round_trip(sort_value):
+    cursor = _encode_cursor(sort_value, ROW_ID)
+
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert _decode_cursor(cursor) == (sort_value, ROW_ID)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    _encode_cursor("yesterday", ROW_ID),
+    _encode_cursor("2026-03-04T10:15:00+00:00", "42"),
+    _encode_cursor("2026-03-04T10:15:00+00:00", ROW_ID)[:-3],
+    "été",
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        _decode_cursor(cursor)
+    assert raised.value.status_code == 400
@@ -0,0 +1,74 @@
+import numpy as np
+
+from backend.dedupe import BANDS, NUM_PERM, DuplicateDetector, band_keys, minhash, shingles
+
+
+def jaccard_pair(rng, size, similarity):
+    """Two random feature sets with the given Jaccard similarity"""
+    shared = round(size * 2 * similarity / (1 + similarity))
+    features = [f"f{rng.integers(1 << 40)}" for _ in range(2 * size - shared)]
+    return set(features[:size]), set(features[:shared] + features[size:])
+
+
+def test_identical_and_empty_sets():
+    signatures = minhash([{"a", "b", "c"}, {"c", "b", "a"}, set()])
+    assert signatures.shape == (3, NUM_PERM)
+    assert (signatures[0] == signatures[1]).all()
+    assert (signatures[2] == np.iinfo(np.uint64).max).all()
+
+
+def test_signature_agreement_estimates_jaccard():
+    rng = np.random.default_rng(1)
+    for similarity in (0.3, 0.6, 0.9):
+        first, second = jaccard_pair(rng, 40, similarity)
+        true = len(first & second) / len(first | second)
+        signatures = minhash([first, second])
+        estimate = (signatures[0] == signatures[1]).mean()
+        assert abs(estimate - true) < 0.15
+
+
+def test_pairs_at_min_score_share_a_bucket():
+    rng = np.random.default_rng(2)
+    pairs = [jaccard_pair(rng, 30, 0.7) for _ in range(200)]
+    signatures = minhash([features for pair in pairs for features in pair])
+    keys = band_keys(signatures)
+    assert keys.shape == (400, BANDS)
+    shared = [(keys[2 * n] == keys[2 * n + 1]).any() for n in range(len(pairs))]
+    assert np.mean(shared) > 0.95
+
+
+def test_shingles_ignore_name_order_titles_and_company_suffixes():
+    first = {"full_name": "Capt. Ravi Kumar", "email": "ravi.kumar@example.com", "company": "Acme Shipping Pvt Ltd"}
+    second = {"full_name": "Kumar Ravi", "email": "ravikumar+alumni@example.org", "company": "acme shipping"}
+    assert shingles(first) == shingles(second)
+
+
+def test_scan_reports_fields_that_match_after_normalization():
+    profiles = [
+        {"id": "a", "full_name": "Capt. Ravi Kumar", "email": "ravi.kumar@example.com", "graduation_year": 2015,
+         "company": "Acme Shipping Pvt Ltd", "updated_at": "2026-01-01"},
+        {"id": "b", "full_name": "Ravi Kumar", "email": "ravikumar@example.org", "graduation_year": 2015,
+         "company": "Acme Shipping", "updated_at": "2026-01-02"},
+        {"id": "c", "full_name": "Meera Nair", "email": "meera@example.com", "graduation_year": 2009,
+         "company": "Blue Ocean Lines", "updated_at": "2026-01-03"},
+    ]
+    detector = DuplicateDetector()
+    detector._fetch = lambda since: profiles
+    pairs = detector.scan(full=True)
+    assert [(pair["profile_id"], pair["duplicate_id"]) for pair in pairs] == [("a", "b")]
+    assert pairs[0]["score"] == 1.0
+    assert pairs[0]["matched_fields"] == ["full_name", "email", "graduation_year", "company"]
+
+
+def test_incremental_scan_rereads_an_overlap_before_the_watermark():
+    profile = {"id": "a", "full_name": "Ravi Kumar", "email": "ravi@example.com", "graduation_year": 2015,
+               "company": "Acme", "updated_at": "2026-01-01T00:10:00+00:00"}
+    requested = []
+    detector = DuplicateDetector()
+    detector._fetch = lambda since: requested.append(since) or [profile]
+
+    detector.scan()
+    detector.scan()
+
+    assert requested == [None, "2026-01-01T00:09:30+00:00"]
+    assert len(detector.profiles) == 1
@@ -0,0 +1,60 @@
+from backend.directory import CompactDirectory
+
+
+def profile(n, name=None, updated_at="2026-01-01T00:00:00+00:00"):
+    return {"id": f"id-{n:04d}", "full_name": name or f"Alum {n:04d}", "company": "Acme", "updated_at": updated_at}
+
+
+class FakeDirectory(CompactDirectory):
+    def __init__(self, rows):
+        super().__init__()
+        self.table = {row["id"]: row for row in rows}
+        self.deleted = []
+
+    def _fetch(self, since):
+        return sorted((row for row in self.table.values() if since is None or row["updated_at"] >= since),
+                      key=lambda row: (row["updated_at"], row["id"]))
+
+    def _fetch_deleted(self, since):
+        return [row for row in self.deleted if since is None or row["deleted_at"] >= since]
+
+
+def test_poll_without_renames_keeps_the_order():
+    replica = FakeDirectory([profile(n) for n in range(100)])
+    replica.sync(full=True)
+    order = replica._sorted()[0]
+
+    replica.table["id-0005"] = {**replica.table["id-0005"], "company": "Other"}
+    replica.sync()
+
+    assert replica._sorted()[0] is order
+
+
+def test_sync_rebuilds_the_order_after_a_rename():
+    replica = FakeDirectory([profile(n) for n in range(100)])
+    replica.sync(full=True)
+
+    replica.table["id-0050"] = profile(50, name="Aaron", updated_at="2026-01-01T00:00:01+00:00")
+    replica.sync()
+
+    # Rebuilt by the sync itself, not by the next page
+    assert replica._order is not None
+    assert replica.page(1)[0]["full_name"] == "Aaron"
+    replica.table["id-0100"] = profile(100, name="Aardvark", updated_at="2026-01-01T00:00:02+00:00")
+    replica.sync()
+    assert [row["full_name"] for row in replica.page(2)] == ["Aardvark", "Aaron"]
+
+
+def test_poll_drops_deleted_profiles():
+    replica = FakeDirectory([profile(n) for n in range(10)])
+    replica.sync(full=True)
+
+    for profile_id in ("id-0003", "id-0009"):
+        del replica.table[profile_id]
+        replica.deleted.append({"id": profile_id, "deleted_at": "2026-01-01T00:00:05+00:00"})
+    replica.sync()
+
+    assert replica.get("id-0003") is None and replica.get("id-0009") is None
+    assert list(replica.get_many(["id-0003", "id-0004"])) == ["id-0004"]
+    assert replica.get("id-0005")["full_name"] == "Alum 0005"
+    assert replica.stats()["profiles"] == 8
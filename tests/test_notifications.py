@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.dependencies import get_current_admin
+from backend.routers import notifications
+
+
+class OutboxTable:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return type("Response", (), {"data": self.rows})()
+
+
+def make_client(monkeypatch, rows, admin=True):
+    monkeypatch.setattr(notifications, "supabase_admin", type("Client", (), {"table": lambda self, name: OutboxTable(rows)})())
+    app = FastAPI()
+    app.include_router(notifications.router)
+    if admin:
+        app.dependency_overrides[get_current_admin] = lambda: {"id": "admin-1"}
+    return TestClient(app)
+
+
+def test_outbox_lookup_requires_credentials(monkeypatch):
+    client = make_client(monkeypatch, [{"id": "m1", "status": "sent"}], admin=False)
+    assert client.get("/notifications/outbox/m1").status_code == 403
+
+
+def test_outbox_lookup_for_admins(monkeypatch):
+    client = make_client(monkeypatch, [{"id": "m1", "status": "sent"}])
+    assert client.get("/notifications/outbox/m1").json() == {"id": "m1", "status": "sent"}
+    client = make_client(monkeypatch, [])
+    assert client.get("/notifications/outbox/m2").status_code == 404
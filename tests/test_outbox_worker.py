@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from python_http_client.exceptions import HTTPError
+
+from backend import outbox_worker
+from backend.external_integrations import ProviderError
+from backend.external_integrations import email
+from backend.resilience import CircuitOpenError
+
+
+def deliver(monkeypatch, outcome, attempts=1):
+    def send(payload):
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setitem(outbox_worker.SENDERS, "email", send)
+    worker = outbox_worker.OutboxWorker(concurrency=2)
+    recorded = {}
+    worker._record = lambda message_id, update: recorded.update(update)
+    message = {"id": "m1", "channel": "email", "payload": {}, "attempts": attempts, "max_attempts": 8}
+    asyncio.run(worker.deliver(message))
+    worker.executor.shutdown()
+    return recorded
+
+
+def test_sent(monkeypatch):
+    update = deliver(monkeypatch, "202")
+    assert update["status"] == "sent" and update["provider_result"] == "202"
+
+
+def test_open_circuit_defers_without_using_an_attempt(monkeypatch):
+    before = datetime.now(timezone.utc)
+    update = deliver(monkeypatch, CircuitOpenError("sendgrid", 20.0), attempts=8)
+
+    assert update["status"] == "pending"
+    assert update["attempts"] == 7
+    assert datetime.fromisoformat(update["next_attempt_at"]) >= before + timedelta(seconds=20)
+    assert "sendgrid is unavailable" in update["last_error"]
+
+
+def test_client_errors_are_dead_lettered_at_once(monkeypatch):
+    update = deliver(monkeypatch, ProviderError("SendGrid returned 400: invalid email", 400))
+    assert update == {"status": "dead", "last_error": "SendGrid returned 400: invalid email"}
+
+
+@pytest.mark.parametrize("status_code", [429, 503, None])
+def test_other_failures_are_retried(monkeypatch, status_code):
+    update = deliver(monkeypatch, ProviderError("SendGrid returned something", status_code), attempts=2)
+    assert update["status"] == "pending"
+    assert "attempts" not in update
+    assert update["last_error"] == "SendGrid returned something"
+
+
+def test_sendgrid_refusal_carries_status_and_body(monkeypatch):
+    monkeypatch.setenv("SENDGRID_API_KEY", "key")
+    monkeypatch.setenv("SENDER_EMAIL", "alumni@example.com")
+
+    def refuse(self, message):
+        raise HTTPError(400, "Bad Request", b'{"errors": [{"message": "Invalid to address"}]}', {})
+
+    monkeypatch.setattr(email.SendGridAPIClient, "send", refuse)
+    with pytest.raises(ProviderError) as raised:
+        email.send_email("not-an-address", "Hi", "<p>Hi</p>")
+
+    assert raised.value.status_code == 400 and raised.value.permanent
+    assert "Invalid to address" in str(raised.value)
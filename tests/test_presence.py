@@ -0,0 +1,69 @@
+from backend.presence import TimingWheelTTLMap
+
+
+def test_entry_expires_at_ttl():
+    entries = TimingWheelTTLMap(ttl=10, tick=1)
+    entries.touch("a", now=100.0)
+
+    assert entries.lookup(["a"], now=109.99) == {"a": 100.0}
+    assert entries.lookup(["a"], now=110.0) == {"a": None}
+    # The wheel drops it on the tick after expiry
+    assert len(entries) == 1
+    entries.lookup([], now=111.0)
+    assert len(entries) == 0
+
+
+def test_retouch_moves_the_entry_to_its_new_slot():
+    entries = TimingWheelTTLMap(ttl=10, tick=1)
+    entries.touch("a", now=100.0)
+    first_slot = entries.slot_of["a"]
+    entries.touch("a", now=105.0)
+
+    assert entries.slot_of["a"] != first_slot
+    assert "a" not in entries.slots[first_slot]
+    # Past the first expiry the later touch keeps it alive
+    assert entries.lookup(["a"], now=112.0) == {"a": 105.0}
+    assert len(entries) == 1
+    assert entries.lookup(["a"], now=116.0) == {"a": None}
+    assert len(entries) == 0
+
+
+def test_clock_jump_of_more_than_a_lap_clears_everything():
+    entries = TimingWheelTTLMap(ttl=10, tick=1)
+    for offset, user_id in enumerate("abcde"):
+        entries.touch(user_id, now=100.0 + offset * 2)
+
+    assert entries.lookup(list("abcde"), now=1000.0) == dict.fromkeys("abcde")
+    assert len(entries) == 0
+    assert not any(entries.slots)
+
+    entries.touch("a", now=1000.5)
+    assert entries.lookup(["a"], now=1010.0) == {"a": 1000.5}
+    entries.lookup([], now=1012.0)
+    assert len(entries) == 0
+
+
+def test_non_integer_ttl():
+    entries = TimingWheelTTLMap(ttl=2.5, tick=1)
+    entries.touch("a", now=0.0)
+    entries.touch("b", now=0.9)
+    # b expires at 3.4, on the tick exactly one lap ahead: the slot the wheel is on
+    assert entries.slot_of["b"] == entries.current_tick % len(entries.slots)
+
+    assert entries.lookup(["a", "b"], now=2.4) == {"a": 0.0, "b": 0.9}
+    assert entries.lookup(["a", "b"], now=3.3) == {"a": None, "b": 0.9}
+    assert entries.slot_of.keys() == {"b"}
+    assert entries.lookup(["b"], now=3.4) == {"b": None}
+    entries.lookup([], now=4.0)
+    assert len(entries) == 0
+
+
+def test_fractional_tick():
+    entries = TimingWheelTTLMap(ttl=1, tick=0.25)
+    entries.touch("a", now=10.25)
+
+    assert entries.lookup(["a"], now=11.125) == {"a": 10.25}
+    assert entries.lookup(["a"], now=11.25) == {"a": None}
+    assert len(entries) == 1
+    entries.lookup([], now=11.5)
+    assert len(entries) == 0
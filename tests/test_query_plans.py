@@ -0,0 +1,38 @@
+"""Runs scripts/check_query_plans.py against DATABASE_URL; skipped without one.
+
+The database only needs to accept the schema: everything is rolled back.
+PSQL points at the client when it isn't on PATH.
+"""
+import importlib.util
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "check_query_plans.py"
+DATABASE_URL = os.environ.get("DATABASE_URL")
+PSQL = os.environ.get("PSQL", "psql")
+
+pytestmark = [
+    pytest.mark.skipif(not DATABASE_URL, reason="DATABASE_URL not set"),
+    pytest.mark.skipif(shutil.which(PSQL) is None, reason="psql client not found"),
+]
+
+spec = importlib.util.spec_from_file_location("check_query_plans", SCRIPT)
+check_query_plans = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(check_query_plans)
+
+
+@pytest.fixture(scope="module")
+def plans():
+    return check_query_plans.run_psql(PSQL, DATABASE_URL, check_query_plans.build_script(1.0))
+
+
+@pytest.mark.parametrize("name,requires", [(name, requires) for name, _, requires in check_query_plans.CHECKS])
+def test_query_uses_indexes(plans, name, requires):
+    if name not in plans:
+        pytest.skip(f"schema lacks {', '.join(f'{table}.{column}' for table, column in requires)}")
+    nodes = check_query_plans.walk(plans[name][0]["Plan"])
+    seq_scans = sorted({node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"})
+    assert not seq_scans, f"sequential scan on {', '.join(seq_scans)}"
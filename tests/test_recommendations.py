@@ -0,0 +1,56 @@
+from backend.recommendations import JobRecommender
+
+PROFILES = [
+    {"id": "p1", "job_title": "Chief Engineer", "major": "Marine Engineering", "updated_at": "2026-01-01T00:00:00"},
+    {"id": "p2", "job_title": "Naval Architect", "major": "Naval Architecture", "updated_at": "2026-01-01T00:00:00"},
+]
+
+
+def job(job_id, title, is_active=True):
+    return {"id": job_id, "title": title, "description": title, "is_active": is_active,
+            "updated_at": "2026-01-02T00:00:00", "created_at": "2026-01-02T00:00:00"}
+
+
+def build(jobs, deleted=()):
+    recommender = JobRecommender()
+    recommender._fetch = lambda table, columns, since, active_only=False: (
+        [j for j in jobs if j["is_active"] or not active_only] if table == "jobs" else PROFILES
+    )
+    recommender._fetch_deleted_jobs = lambda since: list(deleted)
+    recommender.refresh(full=True)
+    return recommender
+
+
+def test_recommends_best_matching_open_job():
+    recommender = build([job("j1", "Chief Engineer wanted"), job("j2", "Naval Architect for hull design")])
+    assert [match["id"] for match in recommender.recommend("p1")][0] == "j1"
+    assert [match["id"] for match in recommender.recommend("p2")][0] == "j2"
+
+
+def test_closed_jobs_do_not_grow_the_matrix():
+    recommender = build([job("j1", "Chief Engineer wanted")])
+    recommender.add_jobs([job("j9", "Chief Engineer, closed", is_active=False)])
+    assert recommender.job_matrix.shape[0] == 1
+    assert "j9" not in recommender.job_index
+
+
+def test_closing_a_job_retires_its_row():
+    recommender = build([job("j1", "Chief Engineer wanted"), job("j2", "Naval Architect for hull design")])
+    recommender.add_jobs([job("j1", "Chief Engineer wanted", is_active=False)])
+    row = recommender.job_index["j1"]
+    assert recommender.job_matrix.shape[0] == 2
+    assert not recommender.job_matrix[row].any()
+    assert "j1" not in [match["id"] for match in recommender.recommend("p1")]
+
+
+def test_deleted_jobs_are_retired_on_refresh():
+    jobs = [job("j1", "Chief Engineer wanted"), job("j2", "Naval Architect for hull design")]
+    deleted = []
+    recommender = build(jobs, deleted)
+    jobs.remove(jobs[0])
+    deleted.append({"id": "j1", "deleted_at": "2026-01-03T00:00:00"})
+
+    recommender.refresh()
+
+    assert "j1" not in [match["id"] for match in recommender.recommend("p1")]
+    assert recommender.deleted_job_watermark == "2026-01-03T00:00:00"
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.scheduler import CronSchedule, Job, Scheduler, _parse_cron_field
+
+
+def at(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def fires(expression, *start):
+    return datetime.fromtimestamp(CronSchedule(expression).next_after(at(*start)), timezone.utc)
+
+
+def test_parse_cron_fields():
+    assert _parse_cron_field("*", 0, 6) == set(range(7))
+    assert _parse_cron_field("*/15", 0, 59) == {0, 15, 30, 45}
+    assert _parse_cron_field("5/20", 0, 59) == {5, 25, 45}
+    assert _parse_cron_field("1-5", 0, 7) == {1, 2, 3, 4, 5}
+    assert _parse_cron_field("10-20/5", 0, 59) == {10, 15, 20}
+    assert _parse_cron_field("1,15,30-31", 1, 31) == {1, 15, 30, 31}
+    for field in ("60", "5-3", "0", "a"):
+        with pytest.raises(ValueError):
+            _parse_cron_field(field, 1, 59)
+
+
+def test_cron_steps_ranges_and_lists():
+    assert fires("*/15 * * * *", 2026, 3, 4, 10, 7) == datetime(2026, 3, 4, 10, 15, tzinfo=timezone.utc)
+    assert fires("0 9-17/4 * * *", 2026, 3, 4, 13, 0) == datetime(2026, 3, 4, 17, 0, tzinfo=timezone.utc)
+    assert fires("30 8,20 * * *", 2026, 3, 4, 20, 30) == datetime(2026, 3, 5, 8, 30, tzinfo=timezone.utc)
+    # Strictly after now, even on a matching minute
+    assert fires("0 0 * * *", 2026, 3, 4, 0, 0) == datetime(2026, 3, 5, 0, 0, tzinfo=timezone.utc)
+
+
+def test_day_of_month_and_weekday_match_either_when_both_restricted():
+    # 2026-03-06 is a Friday; "on the 13th or any Friday"
+    assert fires("0 0 13 * 5", 2026, 3, 4) == datetime(2026, 3, 6, tzinfo=timezone.utc)
+    assert fires("0 0 13 * 5", 2026, 3, 11) == datetime(2026, 3, 13, tzinfo=timezone.utc)
+    # With either field unrestricted only the other one counts
+    assert fires("0 0 13 * *", 2026, 3, 4) == datetime(2026, 3, 13, tzinfo=timezone.utc)
+    assert fires("0 0 * * 5", 2026, 3, 7) == datetime(2026, 3, 13, tzinfo=timezone.utc)
+    assert fires("0 0 */2 * 5", 2026, 3, 6) == datetime(2026, 3, 13, tzinfo=timezone.utc)
+    # 7 is Sunday too
+    assert fires("0 0 * * 7", 2026, 3, 4) == datetime(2026, 3, 8, tzinfo=timezone.utc)
+
+
+def test_month_and_year_rollover():
+    assert fires("0 0 1 * *", 2026, 1, 31, 12) == datetime(2026, 2, 1, tzinfo=timezone.utc)
+    assert fires("0 0 31 * *", 2026, 4, 1) == datetime(2026, 5, 31, tzinfo=timezone.utc)
+    assert fires("59 23 31 12 *", 2026, 12, 31, 23, 59) == datetime(2027, 12, 31, 23, 59, tzinfo=timezone.utc)
+    assert fires("0 0 29 2 *", 2026, 3, 1) == datetime(2028, 2, 29, tzinfo=timezone.utc)
+
+
+def test_cron_that_never_fires():
+    with pytest.raises(ValueError, match="never fires"):
+        CronSchedule("0 0 30 2 *").next_after(at(2026, 1, 1))
+    with pytest.raises(ValueError):
+        CronSchedule("* * * *")
+
+
+def make_job(fn, timeout=5.0):
+    return Job("job", fn, CronSchedule("0 0 1 1 *"), jitter=0.0, timeout=timeout, leader_only=False)
+
+
+def test_failures_are_recorded():
+    def fail():
+        raise RuntimeError("boom")
+
+    job = make_job(fail)
+    asyncio.run(Scheduler()._execute(job))
+
+    assert job.counters["failures"] == 1 and job.counters["runs"] == 1
+    assert job.history[-1]["status"] == "error" and job.history[-1]["error"] == "boom"
+    assert not job.running
+
+
+def test_async_job_over_its_timeout_is_cancelled():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    job = make_job(slow, timeout=0.05)
+    started = time.monotonic()
+    asyncio.run(Scheduler()._execute(job))
+
+    assert time.monotonic() - started < 1
+    assert cancelled and job.counters["timeouts"] == 1
+    assert job.history[-1]["status"] == "timeout"
+    assert not job.running
+
+
+def test_blocking_job_over_its_timeout_stays_running_until_its_thread_ends():
+    seen = {}
+
+    async def scenario():
+        job = make_job(lambda: time.sleep(0.3), timeout=0.05)
+        execution = asyncio.create_task(Scheduler()._execute(job))
+        await asyncio.sleep(0.15)
+        # Timed out and recorded, but the thread is still busy
+        seen["status"], seen["running"] = job.history[-1]["status"], job.running
+        await execution
+        seen["running_after"] = job.running
+
+    asyncio.run(scenario())
+
+    assert seen == {"status": "timeout", "running": True, "running_after": False}
+
+
+def test_a_job_still_running_when_due_is_skipped():
+    scheduler = Scheduler()
+    runs = []
+
+    async def slow():
+        runs.append(time.monotonic())
+        await asyncio.sleep(0.3)
+
+    job = scheduler.register("slow", slow, every=0.05, leader_only=False)
+    job.next_run = 0.0
+
+    async def scenario():
+        scheduler._task = asyncio.create_task(scheduler._run())
+        await asyncio.sleep(0.5)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    # Due every 0.05s but 0.3s long: the dues in between are skipped, not queued
+    assert 2 <= len(runs) <= 3
+    assert job.counters["skipped_overlap"] > 0
+
+
+def test_run_now_refuses_a_running_job():
+    scheduler = Scheduler()
+    release = []
+
+    async def blocked():
+        while not release:
+            await asyncio.sleep(0.01)
+
+    scheduler.register("blocked", blocked, every=3600, leader_only=False)
+
+    async def scenario():
+        assert scheduler.run_now("blocked")
+        await asyncio.sleep(0.02)
+        second = scheduler.run_now("blocked")
+        release.append(True)
+        await asyncio.gather(*scheduler._running)
+        return second
+
+    assert asyncio.run(scenario()) is False
+    assert scheduler.jobs["blocked"].counters["runs"] == 1
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from backend.storage import LocalStorageBackend, StorageWriter, TempFileWriter, UploadWriter, stream_upload
+
+BOUNDARY = "testboundary"
+
+
+def make_request(body: bytes, content_type: str) -> Request:
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/upload",
+        "headers": [(b"content-type", content_type.encode())],
+    }
+    return Request(scope, receive)
+
+
+def multipart(data: bytes, file_type: str = "application/pdf") -> bytes:
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="cv.pdf"\r\n'
+        f"Content-Type: {file_type}\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def test_writers_are_abstract():
+    with pytest.raises(TypeError):
+        UploadWriter()
+    with pytest.raises(TypeError):
+        StorageWriter()
+    assert not hasattr(TempFileWriter, "finalize")
+
+
+def test_non_multipart_request_aborts_the_writer(tmp_path):
+    writer = LocalStorageBackend(tmp_path).open_writer()
+    request = make_request(b'{"file": "x"}', "application/json")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(stream_upload(request, writer))
+
+    assert error.value.status_code == 400
+    assert writer._file.closed
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_rejected_type_discards_the_temp_file():
+    writer = TempFileWriter()
+    request = make_request(multipart(b"GIF89a"), f"multipart/form-data; boundary={BOUNDARY}")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(stream_upload(request, writer, allowed_types={"image/png"}))
+
+    assert error.value.status_code == 415
+    assert not writer.path.exists()
+
+
+def test_upload_is_stored_under_its_key(tmp_path):
+    backend = LocalStorageBackend(tmp_path)
+    writer = backend.open_writer()
+    request = make_request(multipart(b"%PDF-1.7 resume"), f"multipart/form-data; boundary={BOUNDARY}")
+
+    upload = asyncio.run(stream_upload(request, writer))
+    assert upload == {"filename": "cv.pdf", "content_type": "application/pdf"}
+    assert asyncio.run(writer.finalize("resumes/cv.pdf")) is True
+    assert backend.get_bytes("resumes/cv.pdf") == b"%PDF-1.7 resume"